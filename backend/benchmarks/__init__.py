@@ -0,0 +1,14 @@
+"""
+In-process benchmarks. Run from backend/ against a local database, e.g.
+
+    python -m benchmarks --output results.json
+    python -m benchmarks --baseline results.json   # exit 1 on regressions
+"""
+import os
+
+
+def setup_django():
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")
+    import django
+
+    django.setup()
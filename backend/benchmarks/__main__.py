@@ -0,0 +1,137 @@
+"""
+Run the benchmark suite against a throwaway test database.
+
+    python -m benchmarks [--groups middleware,serialization,serializers,views]
+                         [--sizes 10,1000,100000] [--repeat 5]
+                         [--output results.json] [--baseline baseline.json]
+
+Prints a table, optionally writes the results as JSON, and with --baseline
+exits 1 if any benchmark got slower by more than --tolerance or runs more
+queries than before.
+"""
+import argparse
+import datetime
+import json
+import platform
+import sys
+
+from . import setup_django
+
+GROUPS = ("middleware", "serialization", "serializers", "views")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks", description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--groups", default=",".join(GROUPS), help="comma-separated subset of %(default)s")
+    parser.add_argument("--sizes", default="10,1000,100000", help="row counts for the serializer benchmarks")
+    parser.add_argument("--repeat", type=int, default=5, help="timing samples per benchmark")
+    parser.add_argument("--output", help="write results to this JSON file")
+    parser.add_argument("--baseline", help="compare against results previously written with --output")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown before flagging (0.25 = 25%%)")
+    parser.add_argument("--redis-db", type=int, default=14, help="Redis database to use (flushed first)")
+    parser.add_argument("--keepdb", action="store_true", help="reuse and keep the test database")
+    args = parser.parse_args(argv)
+    args.groups = [g for g in args.groups.split(",") if g]
+    unknown = set(args.groups) - set(GROUPS)
+    if unknown:
+        parser.error(f"unknown groups: {', '.join(sorted(unknown))}")
+    args.sizes = sorted(int(s) for s in args.sizes.split(","))
+    return args
+
+
+def run(args):
+    import logging
+
+    from django.conf import settings
+    from django.core.cache import cache
+    from django.test.utils import override_settings
+
+    from . import fixtures, middleware, serialization, serializers, views
+
+    cache_settings = dict(settings.CACHES["default"])
+    cache_settings["LOCATION"] = f"redis://{settings.REDIS_HOST}:{settings.REDIS_PORT}/{args.redis_db}"
+    with override_settings(
+        CACHES={**settings.CACHES, "default": cache_settings},
+        AUTH_THROTTLE_ENABLED=False,
+        BANNED_IPS_PUBSUB=False,
+    ):
+        cache.clear()
+        # Deliberate 4xx responses (e.g. admin setup when already configured).
+        logging.getLogger("django.request").setLevel(logging.ERROR)
+        author, admin = fixtures.create_accounts()
+        fixtures.create_rows(author, max(args.sizes))
+        modules = {"middleware": middleware, "serialization": serialization, "serializers": serializers, "views": views}
+        results = []
+        for group in args.groups:
+            print(f"Running {group} benchmarks...", file=sys.stderr)
+            results.extend(modules[group].run(repeat=args.repeat, sizes=args.sizes, author=author, admin=admin))
+        cache.clear()
+    return results
+
+
+def report(results, baseline, tolerance):
+    from .harness import compare, format_seconds
+
+    if baseline is None:
+        print(f"{'benchmark':<58} {'best':>10} {'median':>10} {'per row':>10} {'queries':>7}")
+        for r in results:
+            per_row = format_seconds(r.get("per_row"))
+            print(
+                f"{r['name']:<58} {format_seconds(r['best']):>10} {format_seconds(r['median']):>10} "
+                f"{per_row:>10} {r['queries']:>7}"
+            )
+        return []
+    rows, regressions = compare(results, baseline["results"], tolerance)
+    print(f"{'benchmark':<58} {'baseline':>10} {'current':>10} {'change':>8} {'queries':>7}  status")
+    for name, before, after, change, queries, status in rows:
+        change = f"{change:+.0%}" if change is not None else "-"
+        print(f"{name:<58} {format_seconds(before):>10} {format_seconds(after):>10} {change:>8} {queries:>7}  {status}")
+    return regressions
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    setup_django()
+    import django
+    from django.db import connection
+    from django.test.utils import setup_test_environment, teardown_test_environment
+
+    from core.log_buffer import shutdown_all
+
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, keepdb=args.keepdb)
+    try:
+        results = run(args)
+    finally:
+        # Write queued log rows while their database still exists.
+        shutdown_all()
+        connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=args.keepdb)
+        teardown_test_environment()
+
+    if args.output:
+        document = {
+            "created_at": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "django": django.get_version(),
+            "sizes": args.sizes,
+            "repeat": args.repeat,
+            "results": results,
+        }
+        with open(args.output, "w") as f:
+            json.dump(document, f, indent=2)
+    regressions = report(results, baseline, args.tolerance)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s): {', '.join(regressions)}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
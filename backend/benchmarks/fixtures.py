@@ -0,0 +1,75 @@
+"""Bulk-created data for the benchmark database."""
+import datetime
+
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+
+PASSWORD = "bench-pass-123"
+
+
+def create_accounts():
+    """A regular author and a superuser, both with PASSWORD; marks admin setup done."""
+    from blog.models import AdminSetup, Profile
+
+    User = get_user_model()
+    author = User.objects.create_user(username="bench-author", email="author@example.com", password=PASSWORD)
+    Profile.objects.create(user=author, display_name="Bench Author")
+    admin = User.objects.create_superuser(username="bench-admin", email="", password=PASSWORD)
+    AdminSetup.objects.create(configured=True)
+    return author, admin
+
+
+def create_rows(author, rows):
+    """`rows` of each listed model: posts, users, audit/traffic logs and unauthorized attempts."""
+    from blog.models import AuditLog, Post, TrafficLog, UnauthorizedAttempt
+
+    User = get_user_model()
+    now = timezone.now()
+    # Spread over the last hour so every row lands in an existing log partition.
+    step = datetime.timedelta(seconds=3600 / rows)
+    Post.objects.bulk_create(
+        (
+            Post(
+                author=author, title=f"Post {i}", content="word " * 300, excerpt="word " * 40,
+                word_count=300, published=i % 10 != 0,
+            )
+            for i in range(rows)
+        ),
+        batch_size=2000,
+    )
+    User.objects.bulk_create(
+        (User(username=f"bench-user-{i}", email=f"user{i}@example.com", password="!") for i in range(rows)),
+        batch_size=2000,
+    )
+    AuditLog.objects.bulk_create(
+        (
+            AuditLog(
+                user=author, ip_address=f"10.0.{i // 250 % 250}.{i % 250}", path="/api/auth/login/",
+                method="POST", action="login", details={},
+            )
+            for i in range(rows)
+        ),
+        batch_size=2000,
+    )
+    TrafficLog.objects.bulk_create(
+        (
+            TrafficLog(
+                ip_address="10.0.0.1", path=f"/api/posts/{i}/", method="GET", status_code=200,
+                user_agent="Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) " * 2,
+                created_at=now - i * step,
+            )
+            for i in range(rows)
+        ),
+        batch_size=2000,
+    )
+    UnauthorizedAttempt.objects.bulk_create(
+        (
+            UnauthorizedAttempt(
+                ip_address=f"10.1.{i // 250 % 250}.{i % 250}", path="/api/admin/users/", method="GET",
+                hits=i % 50 + 1, first_seen=now - (i + 1) * step, last_seen=now - i * step,
+                user_agents=["scanner/1.0"],
+            )
+            for i in range(rows)
+        ),
+        batch_size=2000,
+    )
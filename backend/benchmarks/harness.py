@@ -0,0 +1,100 @@
+"""Timing, query counting and baseline comparison for the benchmark suite."""
+import statistics
+import time
+
+from core.query_budget import QueryBudget
+
+
+def autorange(func, min_time=0.05, max_number=10000):
+    """Calls per timing sample so one sample takes at least `min_time` (like timeit)."""
+    number = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(number):
+            func()
+        if time.perf_counter() - started >= min_time or number >= max_number:
+            return number
+        number *= 2 if number < 8 else 5
+
+
+def count_queries(func):
+    # Not CaptureQueriesContext: connection.queries_log stops growing at 9000
+    # entries, after which it reports 0 for everything.
+    budget = QueryBudget(float("inf"), max_repeats=float("inf"))
+    with budget:
+        func()
+    return len(budget)
+
+
+def measure(name, func, repeat=5, rows=None, setup=None):
+    """
+    Time `func` (seconds per call: best and median of `repeat` samples) and
+    count the queries one call runs. `setup` runs untimed before every call.
+    """
+    if setup is None:
+        number = autorange(func)
+    else:
+        number = 1
+    queries = _call(func, setup, count=True)
+    samples = []
+    for _ in range(repeat):
+        elapsed = 0.0
+        for _ in range(number):
+            elapsed += _call(func, setup)
+        samples.append(elapsed / number)
+    result = {
+        "name": name,
+        "best": min(samples),
+        "median": statistics.median(samples),
+        "calls": number * repeat,
+        "queries": queries,
+    }
+    if rows:
+        result["rows"] = rows
+        result["per_row"] = result["best"] / rows
+    return result
+
+
+def _call(func, setup, count=False):
+    if setup is not None:
+        setup()
+    if count:
+        return count_queries(func)
+    started = time.perf_counter()
+    func()
+    return time.perf_counter() - started
+
+
+def compare(results, baseline, tolerance=0.25, min_delta=20e-6):
+    """
+    (rows, regressions) of current vs baseline results, matched by name.
+    A benchmark regresses when it is more than `tolerance` (and `min_delta`
+    seconds) slower than its baseline, or when it runs more queries.
+    """
+    previous = {r["name"]: r for r in baseline}
+    rows, regressions = [], []
+    for result in results:
+        before = previous.get(result["name"])
+        if before is None:
+            rows.append((result["name"], None, result["best"], None, result["queries"], "new"))
+            continue
+        change = result["best"] / before["best"] - 1 if before["best"] else 0.0
+        slower = change > tolerance and result["best"] - before["best"] > min_delta
+        more_queries = result["queries"] > before["queries"]
+        status = "REGRESSION" if slower or more_queries else "ok"
+        if more_queries:
+            status += f" (queries {before['queries']} -> {result['queries']})"
+        rows.append((result["name"], before["best"], result["best"], change, result["queries"], status))
+        if slower or more_queries:
+            regressions.append(result["name"])
+    return rows, regressions
+
+
+def format_seconds(value):
+    if value is None:
+        return "-"
+    if value >= 1:
+        return f"{value:.2f}s"
+    if value >= 1e-3:
+        return f"{value * 1e3:.2f}ms"
+    return f"{value * 1e6:.1f}us"
@@ -0,0 +1,47 @@
+"""Each middleware in core.middleware on its own, around a trivial view."""
+from django.contrib.auth.models import AnonymousUser
+from django.http import HttpResponse
+from django.test import RequestFactory
+from django.utils.deprecation import MiddlewareMixin
+
+from core import middleware
+
+# (label, path): a public read and an anonymous hit on a protected path.
+SCENARIOS = [("public", "/api/posts/"), ("protected", "/api/admin/users/")]
+
+
+def middleware_classes():
+    return [
+        obj
+        for obj in vars(middleware).values()
+        if isinstance(obj, type)
+        and issubclass(obj, MiddlewareMixin)
+        and obj.__module__ == middleware.__name__
+        and obj is not middleware.NonBlockingMiddlewareMixin
+    ]
+
+
+def run(repeat, **options):
+    from .harness import measure
+
+    factory = RequestFactory()
+
+    def view(request):
+        return HttpResponse(b"{}", content_type="application/json")
+
+    def request_for(path):
+        def build():
+            request = factory.get(path, HTTP_USER_AGENT="bench/1.0", REMOTE_ADDR="10.2.0.1")
+            request.user = AnonymousUser()
+            return request
+        return build
+
+    results = []
+    for label, path in SCENARIOS:
+        build = request_for(path)
+        # The cost of building the request and response, for reference.
+        results.append(measure(f"middleware.none.{label}", lambda: view(build()), repeat))
+        for cls in middleware_classes():
+            instance = cls(view)
+            results.append(measure(f"middleware.{cls.__name__}.{label}", lambda: instance(build()), repeat))
+    return results
@@ -0,0 +1,59 @@
+"""
+The standard JSON path (model instances, serializer or dict builder, DRF's
+JSONRenderer) against the fast one (values() rows, ORJSONRenderer) for the
+public feed and the audit log, at increasing row counts.
+"""
+from django.db.models import F
+from rest_framework.renderers import JSONRenderer
+
+from blog.admin_views import AUDIT_LOG_FIELDS
+from blog.models import AuditLog, Post
+from blog.serializers import PostSummarySerializer, post_summary_values
+from core.renderers import ORJSONRenderer
+
+json_renderer, orjson_renderer = JSONRenderer(), ORJSONRenderer()
+
+
+def cases(size):
+    """{name: (standard, fast)} callables rendering `size` rows both ways."""
+    posts = Post.objects.filter(published=True).order_by("-created_at", "-id")[:size]
+    logs = AuditLog.objects.order_by("-created_at", "-id")[:size]
+
+    def feed_standard():
+        page = posts.select_related("author").defer("content", "search_vector")
+        json_renderer.render(PostSummarySerializer(list(page), many=True).data)
+
+    def feed_fast():
+        orjson_renderer.render(list(post_summary_values(posts)))
+
+    def audit_standard():
+        json_renderer.render([
+            {
+                "id": log.id,
+                "user": log.user_id,
+                "username": log.user.username if log.user else None,
+                "ip_address": log.ip_address,
+                "path": log.path,
+                "method": log.method,
+                "action": log.action,
+                "details": log.details,
+                "created_at": log.created_at.isoformat(),
+            }
+            for log in logs.select_related("user")
+        ])
+
+    def audit_fast():
+        orjson_renderer.render(list(logs.values(*AUDIT_LOG_FIELDS, "user_id", username=F("user__username"))))
+
+    return {"public_feed": (feed_standard, feed_fast), "audit_logs": (audit_standard, audit_fast)}
+
+
+def run(repeat, sizes, **options):
+    from .harness import measure
+
+    results = []
+    for size in sizes:
+        for name, (standard, fast) in cases(size).items():
+            results.append(measure(f"serialization.{name}.standard.{size}", standard, repeat, rows=size))
+            results.append(measure(f"serialization.{name}.fast.{size}", fast, repeat, rows=size))
+    return results
@@ -0,0 +1,54 @@
+"""PostSerializer and the admin list builders at increasing row counts."""
+from django.db.models import F
+
+from blog.admin_views import ATTEMPT_FIELDS, AUDIT_LOG_FIELDS, USER_FIELDS, shorten_user_agents
+from blog.models import AuditLog, Post, TrafficLog, UnauthorizedAttempt
+from blog.serializers import PostSerializer
+from core.renderers import ORJSONRenderer
+
+renderer = ORJSONRenderer()
+
+
+def builders(size):
+    """{name: callable} fetching and rendering `size` rows the way each admin view does."""
+    from django.contrib.auth import get_user_model
+
+    User = get_user_model()
+
+    def audit_logs():
+        rows = list(AuditLog.objects.values(*AUDIT_LOG_FIELDS, "user_id", username=F("user__username"))[:size])
+        for row in rows:
+            row["user"] = row.pop("user_id")
+        renderer.render(rows)
+
+    def traffic():
+        rows = list(TrafficLog.objects.values(
+            "id", "ip_address", "path", "method", "status_code", "user_agent", "created_at"
+        )[:size])
+        renderer.render(shorten_user_agents(rows))
+
+    def users():
+        renderer.render(list(
+            User.objects.filter(is_superuser=False)
+            .order_by("-date_joined", "-id")
+            .values(*USER_FIELDS)[:size]
+        ))
+
+    def attacks():
+        renderer.render(list(UnauthorizedAttempt.objects.values(*ATTEMPT_FIELDS)[:size]))
+
+    return {"audit_logs": audit_logs, "traffic": traffic, "users": users, "attacks": attacks}
+
+
+def run(repeat, sizes, **options):
+    from .harness import measure
+
+    results = []
+    for size in sizes:
+        posts = list(Post.objects.select_related("author").order_by("-created_at", "-id")[:size])
+        results.append(measure(
+            f"serializers.PostSerializer.{size}", lambda: PostSerializer(posts, many=True).data, repeat, rows=size,
+        ))
+        for name, build in builders(size).items():
+            results.append(measure(f"serializers.admin.{name}.{size}", build, repeat, rows=size))
+    return results
@@ -0,0 +1,103 @@
+"""A full request cycle through the Django test client for every URL in blog/urls.py."""
+import itertools
+
+from django.test import Client
+
+from blog import urls
+from blog.models import BannedIP, Post
+
+from .fixtures import PASSWORD
+
+
+def logged_in(user):
+    client = Client()
+    client.force_login(user)
+    return client
+
+
+def requests(author, admin):
+    """{route: (method, client, path or callable returning one, data, setup)} for every blog URL."""
+    anonymous, as_author, as_admin = Client(), logged_in(author), logged_in(admin)
+    post = Post.objects.filter(author=author, published=True).order_by("-created_at").first()
+    usernames = (f"bench-new-{n}" for n in itertools.count())
+    logout_client, admin_logout_client = Client(), Client()
+    ban = {}
+
+    def new_ban():
+        ban["id"] = BannedIP.objects.create(ip_address="192.0.2.1", reason="benchmark").pk
+
+    bulk_bans = [f"198.18.{n // 256}.{n % 256}" for n in range(100)]
+
+    def clear_bulk_bans():
+        BannedIP.objects.filter(ip_address__in=bulk_bans).delete()
+
+    def register_data():
+        return {"username": next(usernames), "email": "new@example.com", "password": PASSWORD}
+
+    return {
+        "auth/register/": ("post", anonymous, "/api/auth/register/", register_data, None),
+        "auth/login/": ("post", anonymous, "/api/auth/login/", {"username": author.username, "password": PASSWORD}, None),
+        "auth/logout/": ("post", logout_client, "/api/auth/logout/", None, lambda: logout_client.force_login(author)),
+        "auth/me/": ("get", as_author, "/api/auth/me/", None, None),
+        "posts/": ("get", anonymous, "/api/posts/", None, None),
+        "posts/search/": ("get", anonymous, "/api/posts/search/", {"q": "word"}, None),
+        "posts/<int:pk>/": ("get", anonymous, f"/api/posts/{post.pk}/", None, None),
+        "my-posts/": ("get", as_author, "/api/my-posts/", None, None),
+        "my-posts/<int:pk>/": ("get", as_author, f"/api/my-posts/{post.pk}/", None, None),
+        "admin/status/": ("get", anonymous, "/api/admin/status/", None, None),
+        "admin/setup/": ("post", anonymous, "/api/admin/setup/", {"username": "x", "password": PASSWORD}, None),
+        "admin/login/": ("post", Client(), "/api/admin/login/", {"username": admin.username, "password": PASSWORD}, None),
+        "admin/logout/": (
+            "post", admin_logout_client, "/api/admin/logout/", None, lambda: admin_logout_client.force_login(admin)
+        ),
+        "admin/me/": ("get", as_admin, "/api/admin/me/", None, None),
+        "admin/system/": ("get", as_admin, "/api/admin/system/", None, None),
+        "admin/users/": ("get", as_admin, "/api/admin/users/", None, None),
+        "admin/users/bulk/": ("post", as_admin, "/api/admin/users/bulk/", {"action": "unban", "ids": [author.pk]}, None),
+        "admin/users/<int:user_id>/": ("get", as_admin, f"/api/admin/users/{author.pk}/", None, None),
+        "admin/users/<int:user_id>/ban/": ("post", as_admin, f"/api/admin/users/{author.pk}/ban/", None, None),
+        "admin/users/<int:user_id>/unban/": ("post", as_admin, f"/api/admin/users/{author.pk}/unban/", None, None),
+        "admin/audit/": ("get", as_admin, "/api/admin/audit/", None, None),
+        "admin/audit/export/": ("get", as_admin, "/api/admin/audit/export/", None, None),
+        "admin/traffic/": ("get", as_admin, "/api/admin/traffic/", None, None),
+        "admin/traffic/stats/": ("get", as_admin, "/api/admin/traffic/stats/", None, None),
+        "admin/traffic/export/": ("get", as_admin, "/api/admin/traffic/export/", {"format": "csv"}, None),
+        "admin/attacks/": ("get", as_admin, "/api/admin/attacks/", None, None),
+        "admin/banned-ips/": ("get", as_admin, "/api/admin/banned-ips/", None, None),
+        "admin/banned-ips/bulk/": (
+            "post", as_admin, "/api/admin/banned-ips/bulk/", {"action": "ban", "ip_addresses": bulk_bans}, clear_bulk_bans
+        ),
+        "admin/banned-ips/<int:ban_id>/": (
+            "delete", as_admin, lambda: f"/api/admin/banned-ips/{ban['id']}/", None, new_ban
+        ),
+    }
+
+
+def run(repeat, author, admin, **options):
+    from .harness import measure
+
+    specs = requests(author, admin)
+    missing = [str(p.pattern) for p in urls.urlpatterns if str(p.pattern) not in specs]
+    if missing:
+        raise LookupError(f"No benchmark request for: {', '.join(missing)}")
+
+    results = []
+    for pattern in urls.urlpatterns:
+        route = str(pattern.pattern)
+        method, client, path, data, setup = specs[route]
+
+        def call(method=method, client=client, path=path, data=data, route=route):
+            target = path() if callable(path) else path
+            payload = data() if callable(data) else data
+            if method == "get":
+                response = client.get(target, payload)
+            else:
+                response = getattr(client, method)(target, payload, content_type="application/json")
+            if response.status_code >= 500:
+                raise RuntimeError(f"{route}: HTTP {response.status_code}")
+            if response.streaming:
+                # Exports do their work while the body is read.
+                b"".join(response.streaming_content)
+
+        results.append(measure(f"views.{method.upper()} /api/{route}", call, repeat, setup=setup))
+    return results
@@ -1,6 +1,8 @@
 from django.contrib import admin
+from django.db.models import Q
 
 from .models import Post, Profile
+from .search import search_query
 
 
 @admin.register(Post)
@@ -9,6 +11,16 @@ class PostAdmin(admin.ModelAdmin):
     list_filter = ("published", "created_at")
     search_fields = ("title", "content", "author__username")
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).defer("search_vector")
+
+    def get_search_results(self, request, queryset, search_term):
+        # Use the GIN-indexed search_vector instead of icontains scans.
+        if not search_term.strip():
+            return queryset, False
+        matches = Q(search_vector=search_query(search_term)) | Q(author__username=search_term.strip())
+        return queryset.filter(matches), False
+
 
 @admin.register(Profile)
 class ProfileAdmin(admin.ModelAdmin):
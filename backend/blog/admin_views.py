@@ -2,17 +2,50 @@
 Admin portal API. One-time setup (no preset credentials), then session-based admin auth.
 All admin endpoints require is_staff except status and setup.
 """
+import collections
+import csv
+import datetime
+import hashlib
+import io
+import ipaddress
+import logging
+import re
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
 from django.contrib.auth import get_user_model, login, logout
 from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 from rest_framework import status
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, permission_classes, throttle_classes
+from rest_framework.exceptions import ParseError
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.response import Response
 
+from core.async_api import async_api_view
+from core.cache_fill import cache_fill
+from core.db_pool import pool_stats
+from core.ip_bans import banned_ips, normalize_network
+from core.log_buffer import all_stats
 from core.middleware import get_client_ip
-from .models import AdminSetup, AuditLog, BannedIP, TrafficLog
+from core.throttling import LoginThrottle
+from .attacks import flush as flush_attempts
+from .exports import export_response
+from .models import AdminSetup, AuditLog, BannedIP, TrafficLog, UnauthorizedAttempt
+from .pagination import AdminLogPagination, AttemptPagination, UserPagination
+from .rollups import traffic_stats
 
 User = get_user_model()
+logger = logging.getLogger(__name__)
+
+# Read-only admin lists return values() rows as-is (no model instances); the
+# renderer (core.renderers.ORJSONRenderer) formats datetimes.
+TRAFFIC_LOG_FIELDS = ("id", "ip_address", "path", "method", "status_code", "user_agent", "created_at")
+AUDIT_LOG_FIELDS = ("id", "ip_address", "path", "method", "action", "details", "created_at")
+USER_FIELDS = ("id", "username", "email", "is_active", "date_joined")
+ATTEMPT_FIELDS = ("id", "ip_address", "path", "method", "hits", "first_seen", "last_seen", "user_agents")
 
 
 def is_staff_only(request):
@@ -21,6 +54,106 @@ def is_staff_only(request):
     return True
 
 
+def datetime_param(request, name):
+    """Optional ISO 8601 query parameter as an aware datetime; 400 if malformed."""
+    raw = request.GET.get(name)
+    if not raw:
+        return None
+    try:
+        value = parse_datetime(raw)
+    except ValueError:
+        value = None
+    if value is None:
+        raise ParseError(f"{name} must be an ISO 8601 datetime.")
+    return timezone.make_aware(value) if timezone.is_naive(value) else value
+
+
+def filter_audit_logs(request, queryset):
+    """Apply ?user=, ?ip=, ?start=, ?end= to an AuditLog queryset."""
+    user = request.GET.get("user")
+    if user:
+        # ASCII digits only: str.isdigit() accepts "²", which int() rejects.
+        if re.fullmatch(r"[0-9]{1,18}", user):
+            queryset = queryset.filter(user_id=int(user))
+        else:
+            queryset = queryset.filter(user__username=user)
+    return filter_ip_and_period(request, queryset)
+
+
+def filter_ip_and_period(request, queryset, timestamp="created_at"):
+    """Apply ?ip= and ?start=/?end= (on `timestamp`) to a log queryset."""
+    ip = request.GET.get("ip")
+    if ip:
+        try:
+            ipaddress.ip_address(ip)
+        except ValueError:
+            raise ParseError("ip must be an IP address.")
+        queryset = queryset.filter(ip_address=ip)
+    start = datetime_param(request, "start")
+    if start:
+        queryset = queryset.filter(**{f"{timestamp}__gte": start})
+    end = datetime_param(request, "end")
+    if end:
+        queryset = queryset.filter(**{f"{timestamp}__lt": end})
+    return queryset
+
+
+def filter_users(request, queryset):
+    """
+    Apply ?q= (username or email; substring match, or prefix match with
+    ?match=prefix or for fewer than 3 characters, where trigrams cannot help),
+    ?is_active=true|false and ?start=/?end= (on date_joined).
+    """
+    q = request.GET.get("q", "").strip()
+    if q:
+        lookup = "istartswith" if request.GET.get("match") == "prefix" or len(q) < 3 else "icontains"
+        queryset = queryset.filter(Q(**{f"username__{lookup}": q}) | Q(**{f"email__{lookup}": q}))
+    is_active = request.GET.get("is_active")
+    if is_active:
+        if is_active not in ("true", "false"):
+            raise ParseError("is_active must be true or false.")
+        queryset = queryset.filter(is_active=is_active == "true")
+    start = datetime_param(request, "start")
+    if start:
+        queryset = queryset.filter(date_joined__gte=start)
+    end = datetime_param(request, "end")
+    if end:
+        queryset = queryset.filter(date_joined__lt=end)
+    return queryset
+
+
+def bulk_rows(request, field, header=()):
+    """
+    Items for a bulk endpoint, as rows of strings: request.data[field] (a list)
+    or an uploaded CSV (`file`), one item per row, optional header row whose
+    first cell is one of `header`. ParseError (400) when empty or too large.
+    """
+    upload = request.FILES.get("file")
+    if upload is not None:
+        try:
+            text = upload.read().decode("utf-8-sig")
+        except UnicodeDecodeError:
+            raise ParseError("file must be a UTF-8 CSV.")
+        rows = [[cell.strip() for cell in row] for row in csv.reader(io.StringIO(text)) if row and row[0].strip()]
+        if rows and rows[0][0].lower() in header:
+            rows = rows[1:]
+    else:
+        values = request.data.get(field)
+        if not isinstance(values, list):
+            raise ParseError(f"{field} must be a list, or upload a CSV as file.")
+        rows = [[str(value).strip()] for value in values]
+    if not rows:
+        raise ParseError("Nothing to do.")
+    if len(rows) > settings.ADMIN_BULK_MAX_ITEMS:
+        raise ParseError(f"At most {settings.ADMIN_BULK_MAX_ITEMS} items per request.")
+    return rows
+
+
+def bulk_response(action, results):
+    counts = collections.Counter(result["status"] for result in results)
+    return Response({"action": action, "counts": dict(counts), "results": results})
+
+
 def log_admin_audit(request, action, details=None):
     try:
         AuditLog.objects.create(
@@ -105,6 +238,7 @@ def admin_setup(request):
 
 @api_view(["POST"])
 @permission_classes([AllowAny])
+@throttle_classes([LoginThrottle])
 def admin_login(request):
     """Admin login. Only staff users can log in here."""
     username = request.data.get("username") or ""
@@ -140,23 +274,18 @@ def admin_me(request):
     })
 
 
-@api_view(["GET", "POST"])
-def admin_users_list(request):
+@api_view(["GET"])
+def admin_system(request):
+    """This worker's DB connection pools and log writer queues."""
+    if not is_staff_only(request):
+        return Response({"detail": "Forbidden"}, status=403)
+    return Response({"db_pools": pool_stats(), "log_writers": all_stats()})
+
+
+@api_view(["POST"])
+def admin_user_create(request):
     if not is_staff_only(request):
         return Response({"detail": "Forbidden"}, status=403)
-    if request.method == "GET":
-        users = User.objects.filter(is_superuser=False).order_by("-date_joined")
-        return Response([
-            {
-                "id": u.id,
-                "username": u.username,
-                "email": u.email or "",
-                "is_active": u.is_active,
-                "date_joined": u.date_joined.isoformat() if u.date_joined else None,
-            }
-            for u in users
-        ])
-    # POST - create user
     username = (request.data.get("username") or "").strip()
     password = request.data.get("password")
     email = (request.data.get("email") or "").strip()
@@ -182,6 +311,20 @@ def admin_users_list(request):
     )
 
 
+@async_api_view(["GET"], fallback=admin_user_create)
+async def admin_users_list(request):
+    """
+    Non-superusers, newest first, cursor-paginated (`?limit=`, default 50,
+    follow `next`). Filters: see filter_users.
+    """
+    if not is_staff_only(request):
+        return Response({"detail": "Forbidden"}, status=403)
+    users = filter_users(request, User.objects.filter(is_superuser=False).values(*USER_FIELDS))
+    paginator = UserPagination()
+    page = await paginator.apaginate_queryset(users, request)
+    return paginator.get_paginated_response(page)
+
+
 @api_view(["GET", "PUT", "DELETE"])
 def admin_user_detail(request, user_id):
     if not is_staff_only(request):
@@ -254,84 +397,193 @@ def admin_user_unban(request, user_id):
     return Response({"is_active": True})
 
 
-@api_view(["GET"])
-def admin_audit_logs(request):
+USER_BULK_ACTIONS = {"ban": "banned", "unban": "unbanned", "delete": "deleted"}
+
+
+@api_view(["POST"])
+def admin_users_bulk(request):
+    """
+    Ban, unban or delete many users at once: {"action": "ban"|"unban"|"delete",
+    "ids": [...]} or a CSV of ids (`file`). One transaction, one audit record;
+    the response has a status per id.
+    """
     if not is_staff_only(request):
         return Response({"detail": "Forbidden"}, status=403)
-    limit = min(int(request.GET.get("limit", 100)), 500)
-    logs = AuditLog.objects.all()[:limit]
-    return Response([
-        {
-            "id": l.id,
-            "user": l.user_id,
-            "username": l.user.username if l.user_id else None,
-            "ip_address": str(l.ip_address) if l.ip_address else None,
-            "path": l.path,
-            "method": l.method,
-            "action": l.action,
-            "details": l.details,
-            "created_at": l.created_at.isoformat() if l.created_at else None,
+    action = request.data.get("action")
+    if action not in USER_BULK_ACTIONS:
+        return Response({"detail": "action must be ban, unban or delete."}, status=status.HTTP_400_BAD_REQUEST)
+    results, ids = [], []
+    for raw, *_ in bulk_rows(request, "ids", header=("id", "user_id")):
+        try:
+            ids.append(int(raw))
+            results.append({"id": ids[-1], "status": None})
+        except ValueError:
+            results.append({"id": raw, "status": "invalid"})
+    changed = {}
+    with transaction.atomic():
+        users = {
+            u["id"]: u
+            for u in User.objects.select_for_update()
+            .filter(pk__in=ids)
+            .values("id", "username", "is_active", "is_superuser")
         }
-        for l in logs
-    ])
+        for result in results:
+            if result["status"] is not None:
+                continue
+            user = users.get(result["id"])
+            if user is None:
+                result["status"] = "not_found"
+            elif user["is_superuser"]:
+                result["status"] = "superuser"
+            elif result["id"] in changed:
+                result["status"] = "duplicate"
+            elif action != "delete" and user["is_active"] == (action == "unban"):
+                result["status"] = "unchanged"
+            else:
+                result["status"] = USER_BULK_ACTIONS[action]
+                changed[result["id"]] = user["username"]
+        if action == "delete":
+            User.objects.filter(pk__in=changed).delete()
+        elif changed:
+            User.objects.filter(pk__in=changed).update(is_active=action == "unban")
+    if changed:
+        log_admin_audit(request, f"admin_user_bulk_{action}", {
+            "requested": len(results),
+            "count": len(changed),
+            "users": [{"id": pk, "username": username} for pk, username in changed.items()],
+        })
+    return bulk_response(action, results)
 
 
-@api_view(["GET"])
-def admin_traffic(request):
+@async_api_view(["GET"])
+async def admin_audit_logs(request):
+    """
+    Audit log, newest first, cursor-paginated (`?limit=`, follow `next`).
+    Filters: ?action=, ?user= (id or username), ?ip=, ?start=/?end= (ISO 8601).
+    """
+    if not is_staff_only(request):
+        return Response({"detail": "Forbidden"}, status=403)
+    logs = AuditLog.objects.values(*AUDIT_LOG_FIELDS, "user_id", username=F("user__username"))
+    if request.GET.get("action"):
+        logs = logs.filter(action=request.GET["action"])
+    paginator = AdminLogPagination()
+    page = await paginator.apaginate_queryset(filter_audit_logs(request, logs), request)
+    for row in page:
+        row["user"] = row.pop("user_id")
+    return paginator.get_paginated_response(page)
+
+
+@async_api_view(["GET"])
+async def admin_audit_export(request):
+    """
+    Whole audit log as a download, oldest first: ?format=ndjson|csv, ?gzip=1,
+    and the list's filters (?action=, ?user=, ?ip=, ?start=/?end=).
+    """
+    if not is_staff_only(request):
+        return Response({"detail": "Forbidden"}, status=403)
+    logs = AuditLog.objects.annotate(username=F("user__username")).order_by("created_at", "id")
+    if request.GET.get("action"):
+        logs = logs.filter(action=request.GET["action"])
+    logs = filter_audit_logs(request, logs)
+    return export_response(request, logs, (*AUDIT_LOG_FIELDS, "user_id", "username"), "audit")
+
+
+@async_api_view(["GET"])
+async def admin_traffic_export(request):
+    """Whole traffic log as a download, oldest first: ?format=, ?gzip=1, ?ip=, ?start=/?end=."""
+    if not is_staff_only(request):
+        return Response({"detail": "Forbidden"}, status=403)
+    logs = filter_ip_and_period(request, TrafficLog.objects.order_by("created_at", "id"))
+    return export_response(request, logs, TRAFFIC_LOG_FIELDS, "traffic")
+
+
+def shorten_user_agents(rows, length=80):
+    for row in rows:
+        if len(row["user_agent"]) > length:
+            row["user_agent"] = row["user_agent"][:length] + "..."
+    return rows
+
+
+@async_api_view(["GET"])
+async def admin_traffic(request):
     if not is_staff_only(request):
         return Response({"detail": "Forbidden"}, status=403)
     limit = min(int(request.GET.get("limit", 100)), 500)
-    logs = TrafficLog.objects.all()[:limit]
-    return Response([
-        {
-            "id": l.id,
-            "ip_address": str(l.ip_address) if l.ip_address else None,
-            "path": l.path,
-            "method": l.method,
-            "status_code": l.status_code,
-            "user_agent": l.user_agent[:80] + "..." if len(l.user_agent or "") > 80 else (l.user_agent or ""),
-            "created_at": l.created_at.isoformat() if l.created_at else None,
-        }
-        for l in logs
-    ])
+    logs = TrafficLog.objects.values(*TRAFFIC_LOG_FIELDS)[:limit]
+    return Response(shorten_user_agents([l async for l in logs]))
+
+
+@cache_fill("traffic-stats", timeout=lambda: settings.TRAFFIC_STATS_CACHE_TIMEOUT)
+def cached_traffic_stats(key, start, end, interval, top):
+    return traffic_stats(start, end, interval=interval, top=top)
 
 
 @api_view(["GET"])
-def admin_attacks(request):
+def admin_traffic_stats(request):
+    """
+    Request counts from the per-minute rollups: ?start=&end= (ISO 8601,
+    default last hour), ?interval=minute|hour|day, ?top=N for top paths/IPs.
+    """
     if not is_staff_only(request):
         return Response({"detail": "Forbidden"}, status=403)
-    limit = min(int(request.GET.get("limit", 100)), 500)
-    logs = AuditLog.objects.filter(action="unauthorized_attempt").order_by("-created_at")[:limit]
-    return Response([
-        {
-            "id": l.id,
-            "ip_address": str(l.ip_address) if l.ip_address else None,
-            "path": l.path,
-            "method": l.method,
-            "details": l.details,
-            "created_at": l.created_at.isoformat() if l.created_at else None,
-        }
-        for l in logs
-    ])
+    end = datetime_param(request, "end") or timezone.now()
+    start = datetime_param(request, "start") or end - datetime.timedelta(hours=1)
+    if start >= end:
+        return Response({"detail": "start must be before end."}, status=status.HTTP_400_BAD_REQUEST)
+    interval = request.GET.get("interval", "minute")
+    if interval not in ("minute", "hour", "day"):
+        return Response({"detail": "interval must be minute, hour or day."}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        top = int(request.GET.get("top", 10))
+    except ValueError:
+        top = 0
+    if top < 1:
+        return Response({"detail": "top must be a positive integer."}, status=status.HTTP_400_BAD_REQUEST)
+    top = min(top, 100)
+    # Keyed on the query as sent: an open-ended window ("the last hour") stays
+    # one entry instead of a new key every request.
+    query = f"{request.GET.get('start', '')}|{request.GET.get('end', '')}|{interval}|{top}"
+    key = f"stats:traffic:{hashlib.md5(query.encode()).hexdigest()}"
+    return Response(cached_traffic_stats(key, start, end, interval, top))
+
+
+@async_api_view(["GET"])
+async def admin_attacks(request):
+    """
+    Unauthorized attempts coalesced per (ip, path, method), most recent hit
+    first. Paged like admin_audit_logs; filters: ?ip=, ?start=/?end= (on last_seen).
+    """
+    if not is_staff_only(request):
+        return Response({"detail": "Forbidden"}, status=403)
+    try:
+        await sync_to_async(flush_attempts)()
+    except Exception:
+        logger.warning("Could not flush attack counters; showing flushed attempts only")
+    attempts = UnauthorizedAttempt.objects.values(*ATTEMPT_FIELDS)
+    paginator = AttemptPagination()
+    page = await paginator.apaginate_queryset(filter_ip_and_period(request, attempts, "last_seen"), request)
+    return paginator.get_paginated_response(page)
 
 
-@api_view(["GET", "POST"])
-def admin_banned_ips_list(request):
+@api_view(["POST"])
+def admin_banned_ip_create(request):
     if not is_staff_only(request):
         return Response({"detail": "Forbidden"}, status=403)
-    if request.method == "GET":
-        ips = BannedIP.objects.all()
-        return Response([
-            {"id": b.id, "ip_address": str(b.ip_address), "reason": b.reason, "created_at": b.created_at.isoformat()}
-            for b in ips
-        ])
     ip_address = (request.data.get("ip_address") or "").strip()
     reason = (request.data.get("reason") or "").strip()
     if not ip_address:
         return Response({"detail": "ip_address required."}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        ip_address = normalize_network(ip_address)
+    except ValueError:
+        return Response(
+            {"detail": "ip_address must be an IP address or CIDR range."},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
     if BannedIP.objects.filter(ip_address=ip_address).exists():
         return Response({"detail": "IP already banned."}, status=status.HTTP_400_BAD_REQUEST)
     banned = BannedIP.objects.create(ip_address=ip_address, reason=reason)
+    banned_ips.publish_change()
     log_admin_audit(request, "admin_ip_ban", {"ip_address": ip_address})
     return Response(
         {"id": banned.id, "ip_address": str(banned.ip_address), "reason": banned.reason},
@@ -339,6 +591,69 @@ def admin_banned_ips_list(request):
     )
 
 
+@async_api_view(["GET"], fallback=admin_banned_ip_create)
+async def admin_banned_ips_list(request):
+    if not is_staff_only(request):
+        return Response({"detail": "Forbidden"}, status=403)
+    return Response([
+        {"id": b.id, "ip_address": str(b.ip_address), "reason": b.reason, "created_at": b.created_at.isoformat()}
+        async for b in BannedIP.objects.all()
+    ])
+
+
+@api_view(["POST"])
+def admin_banned_ips_bulk(request):
+    """
+    Ban or unban many addresses and CIDR ranges at once: {"action": "ban"|"unban",
+    "ip_addresses": [...], "reason": "..."} or a CSV (`file`) of
+    ip_address[,reason] rows. One transaction, one audit record, one ban list
+    broadcast; the response has a status per entry.
+    """
+    if not is_staff_only(request):
+        return Response({"detail": "Forbidden"}, status=403)
+    action = request.data.get("action", "ban")
+    if action not in ("ban", "unban"):
+        return Response({"detail": "action must be ban or unban."}, status=status.HTTP_400_BAD_REQUEST)
+    default_reason = (request.data.get("reason") or "").strip()[:255]
+    results, reasons = [], {}
+    for raw, *rest in bulk_rows(request, "ip_addresses", header=("ip", "ip_address")):
+        try:
+            network = normalize_network(raw)
+        except ValueError:
+            results.append({"ip_address": raw, "status": "invalid"})
+            continue
+        if network in reasons:
+            results.append({"ip_address": network, "status": "duplicate"})
+            continue
+        reasons[network] = (rest[0][:255] if rest and rest[0] else default_reason)
+        results.append({"ip_address": network, "status": None})
+    with transaction.atomic():
+        existing = set(BannedIP.objects.filter(ip_address__in=reasons).values_list("ip_address", flat=True))
+        if action == "ban":
+            changed = [network for network in reasons if network not in existing]
+            # ignore_conflicts: a concurrent ban of the same entry is not an error.
+            BannedIP.objects.bulk_create(
+                [BannedIP(ip_address=network, reason=reasons[network]) for network in changed],
+                ignore_conflicts=True,
+            )
+        else:
+            changed = [network for network in reasons if network in existing]
+            BannedIP.objects.filter(ip_address__in=changed).delete()
+    done, skipped = ("banned", "already_banned") if action == "ban" else ("unbanned", "not_banned")
+    applied = set(changed)
+    for result in results:
+        if result["status"] is None:
+            result["status"] = done if result["ip_address"] in applied else skipped
+    if changed:
+        banned_ips.publish_change()
+        log_admin_audit(request, f"admin_ip_bulk_{action}", {
+            "requested": len(results),
+            "count": len(changed),
+            "ip_addresses": changed,
+        })
+    return bulk_response(action, results)
+
+
 @api_view(["DELETE"])
 def admin_banned_ip_detail(request, ban_id):
     if not is_staff_only(request):
@@ -349,5 +664,6 @@ def admin_banned_ip_detail(request, ban_id):
         return Response({"detail": "Not found."}, status=404)
     ip_address = str(banned.ip_address)
     banned.delete()
+    banned_ips.publish_change()
     log_admin_audit(request, "admin_ip_unban", {"ip_address": ip_address})
     return Response(status=status.HTTP_204_NO_CONTENT)
@@ -0,0 +1,197 @@
+"""
+Coalesced recording of unauthorized access attempts.
+
+Every unauthenticated hit on a protected path used to be its own AuditLog
+row, so a scanner set our write rate. Hits are now counted in Redis instead:
+one hash per (ip, path, method) holding the hit count, first/last seen and a
+few sample user agents, updated by a single Lua call per request. A periodic
+flush folds the counters into UnauthorizedAttempt rows: hits within
+ATTACK_LOG_WINDOW seconds of a row's last_seen extend that row, a longer gap
+starts a new one. A scan costs a few rows per flush instead of one per hit.
+"""
+import datetime
+import hashlib
+import logging
+import time
+import uuid
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+
+from .models import UnauthorizedAttempt
+from .rollups import RELEASE_LUA
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "attacks:acc:"
+PENDING_KEY = "attacks:pending"
+LOCK_KEY = "attacks:flush-lock"
+MAX_USER_AGENTS = 5
+# Counters outlive a missed flush or two; they only matter until then.
+KEY_TTL = 86400
+
+# KEYS: counter hash, user-agent set, pending set.
+# ARGV: now (epoch seconds), ip, method, path, user agent, hash key.
+# Returns the hit count accumulated since the last flush.
+RECORD_LUA = """
+local hits = redis.call('HINCRBY', KEYS[1], 'hits', 1)
+if hits == 1 then
+    redis.call('HSET', KEYS[1], 'first', ARGV[1], 'ip', ARGV[2], 'method', ARGV[3], 'path', ARGV[4])
+end
+redis.call('HSET', KEYS[1], 'last', ARGV[1])
+redis.call('EXPIRE', KEYS[1], %(ttl)d)
+if ARGV[5] ~= '' and redis.call('SCARD', KEYS[2]) < %(max_user_agents)d then
+    redis.call('SADD', KEYS[2], ARGV[5])
+    redis.call('EXPIRE', KEYS[2], %(ttl)d)
+end
+redis.call('SADD', KEYS[3], ARGV[6])
+return hits
+""" % {"ttl": KEY_TTL, "max_user_agents": MAX_USER_AGENTS}
+
+_last_flush = 0.0
+
+
+def _redis():
+    from django_redis import get_redis_connection
+    return get_redis_connection("default")
+
+
+def _decode(value):
+    return value.decode() if isinstance(value, bytes) else value
+
+
+def _key(ip, method, path):
+    digest = hashlib.md5(f"{ip}\0{method}\0{path}".encode()).hexdigest()
+    return f"{KEY_PREFIX}{digest}"
+
+
+def record_attempt(ip, method, path, user_agent=""):
+    """Count one hit; returns the hits for this (ip, path, method) since the last flush."""
+    path, method, user_agent = path[:500], method[:10], user_agent[:500]
+    key = _key(ip, method, path)
+    try:
+        return _redis().eval(
+            RECORD_LUA, 3, key, f"{key}:ua", PENDING_KEY, time.time(), ip or "", method, path, user_agent, key
+        )
+    except Exception:
+        # Without Redis, fold the hit straight into the table (one write per hit).
+        logger.warning("Attack counters unavailable; recording attempt directly")
+        now = datetime.datetime.now(datetime.timezone.utc)
+        _merge([{
+            "ip_address": ip or None,
+            "method": method,
+            "path": path,
+            "hits": 1,
+            "first_seen": now,
+            "last_seen": now,
+            "user_agents": [user_agent] if user_agent else [],
+        }])
+        return 1
+
+
+def flush_hook(batch):
+    """BufferedLogWriter hook: flush the counters every ATTACK_LOG_FLUSH_INTERVAL seconds."""
+    global _last_flush
+    if time.monotonic() - _last_flush >= settings.ATTACK_LOG_FLUSH_INTERVAL:
+        _last_flush = time.monotonic()
+        flush()
+
+
+def flush():
+    """
+    Move the Redis counters into UnauthorizedAttempt. One worker at a time
+    (Redis lock); returns the number of (ip, path, method) counters flushed.
+    """
+    client = _redis()
+    token = uuid.uuid4().hex
+    if not client.set(LOCK_KEY, token, nx=True, ex=60):
+        return 0
+    try:
+        members = [_decode(m) for m in client.smembers(PENDING_KEY)]
+        if not members:
+            return 0
+        processing = []
+        for key in members:
+            # Unlist, then rename: hits arriving meanwhile start a fresh
+            # counter that re-lists itself for the next flush.
+            client.srem(PENDING_KEY, key)
+            for name in (key, f"{key}:ua"):
+                if client.exists(name) and not client.renamenx(name, f"{name}:flushing"):
+                    # An earlier failed flush is still pending; retry both next time.
+                    client.sadd(PENDING_KEY, key)
+            processing.append(key)
+        pipe = client.pipeline(transaction=False)
+        for key in processing:
+            pipe.hgetall(f"{key}:flushing")
+            pipe.smembers(f"{key}:ua:flushing")
+        results = pipe.execute()
+        entries = []
+        for fields, agents in zip(results[::2], results[1::2]):
+            fields = {_decode(k): _decode(v) for k, v in fields.items()}
+            if not fields.get("hits"):
+                continue
+            entries.append({
+                "ip_address": fields.get("ip") or None,
+                "method": fields.get("method", ""),
+                "path": fields.get("path", ""),
+                "hits": int(fields["hits"]),
+                "first_seen": _timestamp(fields["first"]),
+                "last_seen": _timestamp(fields["last"]),
+                "user_agents": sorted(_decode(a) for a in agents),
+            })
+        try:
+            if entries:
+                _merge(entries)
+        except Exception:
+            client.sadd(PENDING_KEY, *processing)
+            raise
+        client.delete(*[f"{key}:flushing" for key in processing], *[f"{key}:ua:flushing" for key in processing])
+        return len(entries)
+    finally:
+        client.eval(RELEASE_LUA, 1, LOCK_KEY, token)
+
+
+def _timestamp(value):
+    return datetime.datetime.fromtimestamp(float(value), tz=datetime.timezone.utc)
+
+
+def _identity(ip, method, path):
+    return (ip or None, method, path)
+
+
+def _merge(entries):
+    """Extend each entry's open row (last_seen within the window) or start a new one."""
+    window = datetime.timedelta(seconds=settings.ATTACK_LOG_WINDOW)
+    cutoff = min(e["first_seen"] for e in entries) - window
+    ips = {e["ip_address"] for e in entries}
+    same_ip = Q(ip_address__in=ips - {None})
+    if None in ips:
+        same_ip |= Q(ip_address__isnull=True)
+    with transaction.atomic():
+        open_rows = {
+            _identity(row.ip_address, row.method, row.path): row
+            for row in UnauthorizedAttempt.objects.filter(same_ip, last_seen__gte=cutoff)
+            .order_by("last_seen")
+            .select_for_update()
+        }
+        created, updated = [], {}
+        for entry in sorted(entries, key=lambda e: e["first_seen"]):
+            identity = _identity(entry["ip_address"], entry["method"], entry["path"])
+            row = open_rows.get(identity)
+            if row is not None and entry["first_seen"] - row.last_seen <= window:
+                row.hits += entry["hits"]
+                row.last_seen = max(row.last_seen, entry["last_seen"])
+                agents = row.user_agents + [a for a in entry["user_agents"] if a not in row.user_agents]
+                row.user_agents = agents[:MAX_USER_AGENTS]
+                if row.pk:
+                    updated[row.pk] = row
+            else:
+                row = UnauthorizedAttempt(**entry)
+                row.user_agents = row.user_agents[:MAX_USER_AGENTS]
+                open_rows[identity] = row
+                created.append(row)
+        if updated:
+            UnauthorizedAttempt.objects.bulk_update(updated.values(), ["hits", "last_seen", "user_agents"])
+        if created:
+            UnauthorizedAttempt.objects.bulk_create(created)
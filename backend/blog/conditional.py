@@ -0,0 +1,81 @@
+"""
+Conditional GET (ETag / Last-Modified) and If-Match for the post endpoints.
+
+Validators are computed without running the query they describe: the public
+feed from its cached version (blog.feed_cache), an author's list from
+max(updated_at) and a count over their posts, and a single post from its
+updated_at alone. A matching If-None-Match / If-Modified-Since gets a 304
+before any rows are fetched or serialized.
+"""
+import hashlib
+
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+from .models import Post
+
+# Browsers may keep these responses but must revalidate them every time.
+REVALIDATE = "no-cache"
+REVALIDATE_PRIVATE = "private, no-cache"
+
+
+class PreconditionFailed(APIException):
+    status_code = status.HTTP_412_PRECONDITION_FAILED
+    default_detail = "The post has changed since it was loaded."
+    default_code = "precondition_failed"
+
+
+def _timestamp(moment):
+    return int(moment.timestamp()) if moment else None
+
+
+def is_conditional_get(request):
+    return "HTTP_IF_NONE_MATCH" in request.META or "HTTP_IF_MODIFIED_SINCE" in request.META
+
+
+def has_preconditions(request):
+    return "HTTP_IF_MATCH" in request.META or "HTTP_IF_UNMODIFIED_SINCE" in request.META
+
+
+def add_validators(response, etag, last_modified, cache_control=REVALIDATE):
+    response["ETag"] = etag
+    if last_modified:
+        response["Last-Modified"] = http_date(_timestamp(last_modified))
+    response["Cache-Control"] = cache_control
+    return response
+
+
+def conditional(request, etag, last_modified, cache_control=REVALIDATE):
+    """A 304 for a matching conditional GET (412 for a failed precondition), else None."""
+    response = get_conditional_response(request, etag=etag, last_modified=_timestamp(last_modified))
+    if response is not None and response.status_code == status.HTTP_304_NOT_MODIFIED:
+        add_validators(response, etag, last_modified, cache_control)
+    return response
+
+
+def post_etag(post):
+    return f'"{post.pk}-{post.updated_at.timestamp():.6f}"'
+
+
+def check_post_preconditions(request, post):
+    """Raise PreconditionFailed when If-Match / If-Unmodified-Since do not hold for post."""
+    if get_conditional_response(request, etag=post_etag(post), last_modified=_timestamp(post.updated_at)) is not None:
+        raise PreconditionFailed()
+
+
+def post_validators(request, pk):
+    """(ETag, Last-Modified) of one of the user's posts, or (None, None) if missing."""
+    post = Post.objects.filter(pk=pk, author=request.user).only("updated_at").first()
+    if post is None:
+        return None, None
+    return post_etag(post), post.updated_at
+
+
+def user_posts_validators(request):
+    """(ETag, Last-Modified) for the requested page of the user's own post list."""
+    state = Post.objects.filter(author=request.user).aggregate(modified=Max("updated_at"), count=Count("id"))
+    raw = f"{request.user.pk}:{state['modified']}:{state['count']}:{request.get_full_path()}"
+    return f'"{hashlib.md5(raw.encode()).hexdigest()}"', state["modified"]
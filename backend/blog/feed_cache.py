@@ -0,0 +1,71 @@
+"""
+Versioned cache for the public post feed.
+
+Rendered feed pages are stored under a key that embeds a feed generation
+number. Any write to a Post bumps the generation (after the transaction
+commits), so every cached page becomes unreachable at once and stale pages
+simply age out of Redis.
+"""
+import datetime
+import hashlib
+import time
+
+from django.core.cache import cache
+
+FEED_VERSION_KEY = "feed:version"
+# Unix time of the last bump; the feed's Last-Modified.
+FEED_MODIFIED_KEY = "feed:modified"
+
+
+def get_feed_version():
+    version = cache.get(FEED_VERSION_KEY)
+    if version is None:
+        # Seed from the clock so a lost/evicted counter never reuses an old
+        # generation whose pages may still be cached.
+        cache.add(FEED_VERSION_KEY, time.time_ns() // 1000, None)
+        version = cache.get(FEED_VERSION_KEY)
+    return version
+
+
+def get_feed_state():
+    """(version, last modified) in one round trip when both are set."""
+    values = cache.get_many([FEED_VERSION_KEY, FEED_MODIFIED_KEY])
+    version = values.get(FEED_VERSION_KEY)
+    if version is None:
+        version = get_feed_version()
+    modified = values.get(FEED_MODIFIED_KEY)
+    if modified is None:
+        cache.add(FEED_MODIFIED_KEY, time.time(), None)
+        modified = cache.get(FEED_MODIFIED_KEY)
+    return version, datetime.datetime.fromtimestamp(modified, tz=datetime.timezone.utc)
+
+
+def bump_feed_version():
+    cache.set(FEED_MODIFIED_KEY, time.time(), None)
+    try:
+        return cache.incr(FEED_VERSION_KEY)
+    except ValueError:
+        cache.add(FEED_VERSION_KEY, time.time_ns() // 1000, None)
+        return cache.get(FEED_VERSION_KEY)
+
+
+def feed_page(request):
+    """
+    (cache key, ETag, Last-Modified) for the requested feed page.
+
+    Resolve this once per request: storing under a version read later could
+    file rows fetched before a write under the post-write generation.
+    """
+    from .pagination import FeedPagination
+
+    # Only what selects the page counts: other query parameters and the Host
+    # header would otherwise each add an entry. The cursor is decoded (404 if
+    # invalid) so equivalent spellings share one.
+    paginator = FeedPagination()
+    position = paginator.decode_cursor(request)
+    page = [paginator.get_page_size(request)]
+    if position is not None:
+        page.extend([position[0].isoformat(), position[1]])
+    version, modified = get_feed_state()
+    digest = hashlib.md5("|".join(map(str, page)).encode()).hexdigest()
+    return f"feed:v{version}:{digest}", f'"{version}-{digest}"', modified
@@ -0,0 +1,147 @@
+"""
+Traffic answered by nginx from the feed snapshots (blog.snapshots).
+
+Those requests never reach Django, so nginx logs them to FEED_HITS_LOG, one
+JSON object per line (`log_format feed_hits` in nginx.conf). This module reads
+the log from where the previous run stopped and feeds each hit to the same
+places a backend request goes: TrafficLog, the per-minute rollups and the
+Prometheus response metrics (route "public-posts-snapshot").
+
+The read position (inode and byte offset) is kept in Redis, so any worker can
+continue; one runs at a time (Redis lock). nginx's side rotates the log to
+`<FEED_HITS_LOG>.1`; a run that finds a new inode finishes the rotated file
+first. A partial last line is left for the next run.
+"""
+import datetime
+import ipaddress
+import json
+import logging
+import os
+import time
+import uuid
+
+from django.conf import settings
+
+from .models import TrafficLog
+from .rollups import RELEASE_LUA
+
+logger = logging.getLogger(__name__)
+
+POSITION_KEY = "feed:hits:position"
+LOCK_KEY = "feed:hits:ingest-lock"
+PATH = "/api/posts/"
+ROUTE = "public-posts-snapshot"
+READ_SIZE = 1 << 20
+
+_last_ingest = 0.0
+
+
+def _redis():
+    from django_redis import get_redis_connection
+    return get_redis_connection("default")
+
+
+def _decode(value):
+    return value.decode() if isinstance(value, bytes) else value
+
+
+def _valid_ip_or_none(value):
+    try:
+        return str(ipaddress.ip_address(value))
+    except ValueError:
+        return None
+
+
+def parse(line):
+    """One log line as TrafficLog field dicts plus the request time, or None if malformed."""
+    try:
+        hit = json.loads(line)
+        return {
+            "ip_address": _valid_ip_or_none(hit.get("ip", "")),
+            "path": PATH,
+            "method": str(hit["method"])[:10],
+            "status_code": int(hit["status"]),
+            "user_agent": str(hit.get("user_agent", ""))[:500],
+            "created_at": datetime.datetime.fromtimestamp(float(hit["time"]), tz=datetime.timezone.utc),
+        }, float(hit.get("request_time") or 0)
+    except (ValueError, TypeError, KeyError, AttributeError):
+        logger.warning("Skipping malformed feed hit log line %r", line[:200])
+        return None
+
+
+def _record(hits):
+    from core.metrics import REQUEST_DURATION, RESPONSES
+    from .rollups import record_traffic
+
+    entries = [entry for entry, _ in hits]
+    TrafficLog.objects.bulk_create([TrafficLog(**entry) for entry in entries])
+    try:
+        record_traffic(entries)
+    except Exception:
+        logger.exception("Could not count feed snapshot hits into the rollups")
+    for entry, duration in hits:
+        REQUEST_DURATION.labels(ROUTE, entry["method"]).observe(duration)
+        RESPONSES.labels(ROUTE, entry["method"], str(entry["status_code"])).inc()
+
+
+def _read(path, offset, client, inode):
+    """Ingest complete lines of `path` from `offset`; returns (hits, new offset)."""
+    count = 0
+    with open(path, "rb") as log:
+        log.seek(offset)
+        while True:
+            chunk = log.read(READ_SIZE)
+            end = chunk.rfind(b"\n")
+            if end < 0:
+                break
+            lines = chunk[:end].decode("utf-8", "replace").splitlines()
+            hits = [hit for hit in map(parse, filter(None, lines)) if hit is not None]
+            if hits:
+                _record(hits)
+            offset += end + 1
+            count += len(hits)
+            client.hset(POSITION_KEY, mapping={"inode": inode, "offset": offset})
+            log.seek(offset)
+    return count, offset
+
+
+def ingest():
+    """Read new snapshot hits from FEED_HITS_LOG; returns the number recorded."""
+    path = settings.FEED_HITS_LOG
+    if not path:
+        return 0
+    client = _redis()
+    token = uuid.uuid4().hex
+    if not client.set(LOCK_KEY, token, nx=True, ex=60):
+        return 0
+    try:
+        position = {_decode(k): int(v) for k, v in client.hgetall(POSITION_KEY).items()}
+        inode, offset = position.get("inode"), position.get("offset", 0)
+        try:
+            current = os.stat(path)
+        except FileNotFoundError:
+            return 0
+        count = 0
+        if inode is not None and inode != current.st_ino:
+            # Rotated since the last run: finish the old file, then start over.
+            rotated = f"{path}.1"
+            if os.path.exists(rotated) and os.stat(rotated).st_ino == inode:
+                count += _read(rotated, offset, client, inode)[0]
+            offset = 0
+        elif current.st_size < offset:
+            logger.warning("Feed hit log %s was truncated; reading it from the start", path)
+            offset = 0
+        count += _read(path, offset, client, current.st_ino)[0]
+        return count
+    finally:
+        client.eval(RELEASE_LUA, 1, LOCK_KEY, token)
+
+
+def flush_hook(batch):
+    """BufferedLogWriter hook: ingest snapshot hits every FEED_HITS_INGEST_INTERVAL seconds."""
+    global _last_ingest
+    if not settings.FEED_HITS_LOG:
+        return
+    if time.monotonic() - _last_ingest >= settings.FEED_HITS_INGEST_INTERVAL:
+        _last_ingest = time.monotonic()
+        ingest()
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from blog.rollups import compact
+
+
+class Command(BaseCommand):
+    help = (
+        "Move closed per-minute traffic counters from Redis into TrafficRollup. "
+        "Workers also do this in the background every TRAFFIC_ROLLUP_COMPACT_INTERVAL seconds."
+    )
+
+    def handle(self, *args, **options):
+        minutes = compact()
+        self.stdout.write(self.style.SUCCESS(f"compacted {minutes} minute(s)"))
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.snapshots import check_snapshots, enabled, write_ban_list, write_snapshots
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the static feed snapshots and the ban list exported for nginx in "
+        "FEED_SNAPSHOT_DIR from the database, or with --check, report files that "
+        "are missing, stale or left over."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--check", action="store_true", help="Compare only; exit 1 if anything differs.")
+
+    def handle(self, *args, **options):
+        if not enabled():
+            self.stdout.write("FEED_SNAPSHOT_DIR is not set; nothing to do")
+            return
+        if not options["check"]:
+            pages = write_snapshots()
+            write_ban_list()
+            self.stdout.write(self.style.SUCCESS(f"wrote {pages} feed snapshot page(s)"))
+            return
+        report = check_snapshots()
+        for problem, names in report.items():
+            for name in names:
+                self.stdout.write(f"{problem} {name}")
+        if any(report.values()):
+            raise CommandError("feed snapshots do not match the database; run `manage.py feed_snapshots`")
+        self.stdout.write(self.style.SUCCESS("feed snapshots match the database"))
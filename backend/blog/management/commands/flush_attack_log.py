@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from blog.attacks import flush
+
+
+class Command(BaseCommand):
+    help = (
+        "Fold the Redis unauthorized-attempt counters into UnauthorizedAttempt. "
+        "Workers also do this after logging traffic every ATTACK_LOG_FLUSH_INTERVAL seconds."
+    )
+
+    def handle(self, *args, **options):
+        counters = flush()
+        self.stdout.write(self.style.SUCCESS(f"flushed {counters} counter(s)"))
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from blog.feed_hits import ingest
+
+
+class Command(BaseCommand):
+    help = (
+        "Read the feed snapshot hits nginx logged to FEED_HITS_LOG into TrafficLog, "
+        "the rollups and the metrics. Workers also do this after logging traffic "
+        "every FEED_HITS_INGEST_INTERVAL seconds."
+    )
+
+    def handle(self, *args, **options):
+        hits = ingest()
+        self.stdout.write(self.style.SUCCESS(f"ingested {hits} snapshot hit(s)"))
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+
+from blog.partitions import maintain
+
+
+class Command(BaseCommand):
+    help = (
+        "Create upcoming created_at range partitions for TrafficLog/AuditLog and "
+        "detach (drop or archive) expired ones, per settings.LOG_PARTITIONS. "
+        "Run at deploy and daily (e.g. from cron)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dry-run", action="store_true", help="Report changes without applying them.")
+
+    def handle(self, *args, **options):
+        dry_run = options["dry_run"]
+        report = maintain(dry_run=dry_run)
+        prefix = "[dry run] " if dry_run else ""
+        for table, changes in report.items():
+            for partition in changes["created"]:
+                self.stdout.write(f"{prefix}created {partition.name} [{partition.start:%Y-%m-%d}, {partition.end:%Y-%m-%d})")
+            for partition in changes["expired"]:
+                self.stdout.write(f"{prefix}expired {partition.name}")
+            if changes["stray_deleted"]:
+                self.stdout.write(f"{prefix}deleted {changes['stray_deleted']} expired rows from {table}_default")
+            if changes["stray_archived"]:
+                self.stdout.write(
+                    f"{prefix}moved {changes['stray_archived']} expired rows from {table}_default to {table}_archive"
+                )
+        self.stdout.write(self.style.SUCCESS(f"{prefix}log partitions up to date"))
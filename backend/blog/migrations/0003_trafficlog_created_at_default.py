@@ -0,0 +1,19 @@
+# Generated by Django 5.0.3 on 2026-10-18 03:10
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0002_admin_models'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='trafficlog',
+            name='created_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+    ]
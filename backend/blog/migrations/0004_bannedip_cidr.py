@@ -0,0 +1,35 @@
+# Generated by Django 5.0.3 on 2026-10-18 03:12
+
+import ipaddress
+
+from django.db import migrations, models
+
+
+def normalize_existing(apps, schema_editor):
+    # inet -> varchar keeps the mask ("1.2.3.4/32"); store hosts bare.
+    BannedIP = apps.get_model("blog", "BannedIP")
+    for banned in BannedIP.objects.all():
+        network = ipaddress.ip_network(banned.ip_address, strict=False)
+        if network.prefixlen == network.max_prefixlen:
+            value = str(network.network_address)
+        else:
+            value = str(network)
+        if value != banned.ip_address:
+            banned.ip_address = value
+            banned.save(update_fields=["ip_address"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0003_trafficlog_created_at_default'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='bannedip',
+            name='ip_address',
+            field=models.CharField(max_length=49, unique=True),
+        ),
+        migrations.RunPython(normalize_existing, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.0.3 on 2026-10-18 03:16
+
+from django.db import migrations, models
+from django.utils.text import Truncator
+
+
+def backfill_summaries(apps, schema_editor):
+    Post = apps.get_model("blog", "Post")
+    batch = []
+    for post in Post.objects.only("id", "content").iterator(chunk_size=500):
+        text = " ".join(post.content.split())
+        post.excerpt = Truncator(text).chars(200)
+        post.word_count = len(text.split()) if text else 0
+        batch.append(post)
+        if len(batch) >= 500:
+            Post.objects.bulk_update(batch, ["excerpt", "word_count"])
+            batch = []
+    if batch:
+        Post.objects.bulk_update(batch, ["excerpt", "word_count"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0005_post_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='excerpt',
+            field=models.CharField(blank=True, editable=False, max_length=200),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='word_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_summaries, migrations.RunPython.noop),
+    ]
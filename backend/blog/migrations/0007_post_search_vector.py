@@ -0,0 +1,51 @@
+# Generated by Django 5.0.3 on 2026-10-18 03:17
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.conf import settings
+from django.db import migrations
+
+# Keep search_vector current on every INSERT/UPDATE, including bulk and raw
+# writes that bypass Post.save().
+CREATE_TRIGGER = """
+CREATE FUNCTION blog_post_search_vector_update() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector :=
+        setweight(to_tsvector('english', coalesce(NEW.title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(NEW.content, '')), 'B');
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER blog_post_search_vector_trigger
+    BEFORE INSERT OR UPDATE OF title, content ON blog_post
+    FOR EACH ROW EXECUTE FUNCTION blog_post_search_vector_update();
+
+UPDATE blog_post SET title = title;
+"""
+
+DROP_TRIGGER = """
+DROP TRIGGER IF EXISTS blog_post_search_vector_trigger ON blog_post;
+DROP FUNCTION IF EXISTS blog_post_search_vector_update();
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0006_post_excerpt_word_count'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunSQL(CREATE_TRIGGER, DROP_TRIGGER),
+        migrations.AddIndex(
+            model_name='post',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='post_search_idx'),
+        ),
+    ]
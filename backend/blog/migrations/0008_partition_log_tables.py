@@ -0,0 +1,90 @@
+# Convert TrafficLog and AuditLog into tables range-partitioned on created_at.
+
+from django.conf import settings
+from django.db import migrations
+
+
+def partition_table(schema_editor, table, extra_sql=()):
+    qn = schema_editor.quote_name
+    legacy = f"{table}_legacy"
+    seq = f"{table}_id_seq"
+    statements = [
+        f"ALTER TABLE {qn(table)} RENAME TO {qn(legacy)}",
+        # The identity sequence keeps its old name; free it for the new table.
+        f"ALTER SEQUENCE {qn(seq)} RENAME TO {qn(legacy + '_id_seq')}",
+        # Partitioned tables cannot have identity columns (PG < 17) or a
+        # primary key without the partition column; use a plain sequence and
+        # PRIMARY KEY (id, created_at).
+        f"CREATE TABLE {qn(table)} (LIKE {qn(legacy)} INCLUDING DEFAULTS INCLUDING CONSTRAINTS) "
+        f"PARTITION BY RANGE (created_at)",
+        f"CREATE SEQUENCE {qn(seq)} AS bigint OWNED BY {qn(table)}.id",
+        f"SELECT setval('{seq}', coalesce((SELECT max(id) FROM {qn(legacy)}), 0) + 1, false)",
+        f"ALTER TABLE {qn(table)} ALTER COLUMN id SET DEFAULT nextval('{seq}')",
+        # Catch-all so inserts never fail; manage_log_partitions adds ranges.
+        f"CREATE TABLE {qn(table + '_default')} PARTITION OF {qn(table)} DEFAULT",
+        f"INSERT INTO {qn(table)} SELECT * FROM {qn(legacy)}",
+        f"DROP TABLE {qn(legacy)}",
+        f"ALTER TABLE {qn(table)} ADD PRIMARY KEY (id, created_at)",
+        f"CREATE INDEX {qn(table + '_created_at_idx')} ON {qn(table)} (created_at)",
+        *extra_sql,
+    ]
+    for sql in statements:
+        schema_editor.execute(sql)
+
+
+def unpartition_table(schema_editor, table, extra_sql=()):
+    qn = schema_editor.quote_name
+    partitioned = f"{table}_partitioned"
+    statements = [
+        f"ALTER TABLE {qn(table)} RENAME TO {qn(partitioned)}",
+        f"CREATE TABLE {qn(table)} (LIKE {qn(partitioned)} INCLUDING CONSTRAINTS)",
+        f"INSERT INTO {qn(table)} SELECT * FROM {qn(partitioned)}",
+        # Drops the attached partitions and the id sequence with it.
+        f"DROP TABLE {qn(partitioned)}",
+        f"ALTER TABLE {qn(table)} ALTER COLUMN id ADD GENERATED BY DEFAULT AS IDENTITY",
+        f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+        f"coalesce((SELECT max(id) FROM {qn(table)}), 0) + 1, false)",
+        f"ALTER TABLE {qn(table)} ADD PRIMARY KEY (id)",
+        *extra_sql,
+    ]
+    for sql in statements:
+        schema_editor.execute(sql)
+
+
+def audit_log_user_sql(apps, schema_editor):
+    """The index and foreign key on blog_auditlog.user_id, named the way Django names them."""
+    qn = schema_editor.quote_name
+    user_meta = apps.get_model(settings.AUTH_USER_MODEL)._meta
+    index = schema_editor._create_index_name("blog_auditlog", ["user_id"])
+    fk = schema_editor._create_index_name(
+        "blog_auditlog", ["user_id"], suffix=f"_fk_{user_meta.db_table}_{user_meta.pk.column}"
+    )
+    return [
+        f"CREATE INDEX {qn(index)} ON {qn('blog_auditlog')} (user_id)",
+        f"ALTER TABLE {qn('blog_auditlog')} ADD CONSTRAINT {qn(fk)} FOREIGN KEY (user_id) "
+        f"REFERENCES {qn(user_meta.db_table)} ({qn(user_meta.pk.column)}) DEFERRABLE INITIALLY DEFERRED",
+    ]
+
+
+def forwards(apps, schema_editor):
+    partition_table(schema_editor, "blog_trafficlog")
+    partition_table(schema_editor, "blog_auditlog", extra_sql=audit_log_user_sql(apps, schema_editor))
+
+
+def backwards(apps, schema_editor):
+    # Rows in partitions already detached by manage_log_partitions (archive
+    # tables) are not copied back; they stay where they are.
+    unpartition_table(schema_editor, "blog_trafficlog")
+    unpartition_table(schema_editor, "blog_auditlog", extra_sql=audit_log_user_sql(apps, schema_editor))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("blog", "0007_post_search_vector"),
+    ]
+
+    operations = [
+        migrations.RunPython(forwards, backwards),
+    ]
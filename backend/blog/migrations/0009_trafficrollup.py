@@ -0,0 +1,33 @@
+# Generated by Django 5.0.3 on 2026-10-18 03:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0008_partition_log_tables'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TrafficRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bucket', models.DateTimeField()),
+                ('dimension', models.CharField(max_length=10)),
+                ('value', models.CharField(blank=True, max_length=500)),
+                ('count', models.PositiveBigIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Traffic rollup',
+                'verbose_name_plural': 'Traffic rollups',
+                'ordering': ['-bucket'],
+                'indexes': [models.Index(fields=['dimension', 'bucket'], name='trafficrollup_dim_bucket_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='trafficrollup',
+            constraint=models.UniqueConstraint(fields=('bucket', 'dimension', 'value'), name='trafficrollup_bucket_uniq'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.0.3 on 2026-10-18 03:24
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0009_trafficrollup'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='auditlog',
+            options={'ordering': ['-created_at', '-id'], 'verbose_name': 'Audit log', 'verbose_name_plural': 'Audit logs'},
+        ),
+        migrations.AddIndex(
+            model_name='auditlog',
+            index=models.Index(fields=['action', '-created_at', '-id'], name='auditlog_action_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='auditlog',
+            index=models.Index(fields=['user', '-created_at', '-id'], name='auditlog_user_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='auditlog',
+            index=models.Index(fields=['ip_address', '-created_at', '-id'], name='auditlog_ip_created_idx'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.0.3 on 2026-10-18 03:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0010_auditlog_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UnauthorizedAttempt',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('ip_address', models.GenericIPAddressField(blank=True, null=True)),
+                ('path', models.CharField(max_length=500)),
+                ('method', models.CharField(max_length=10)),
+                ('hits', models.PositiveBigIntegerField(default=0)),
+                ('first_seen', models.DateTimeField()),
+                ('last_seen', models.DateTimeField()),
+                ('user_agents', models.JSONField(blank=True, default=list)),
+            ],
+            options={
+                'verbose_name': 'Unauthorized attempt',
+                'verbose_name_plural': 'Unauthorized attempts',
+                'ordering': ['-last_seen', '-id'],
+                'indexes': [models.Index(fields=['-last_seen', '-id'], name='attempt_last_seen_idx'), models.Index(fields=['ip_address', '-last_seen', '-id'], name='attempt_ip_last_seen_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,49 @@
+import logging
+
+from django.conf import settings
+from django.db import migrations
+
+logger = logging.getLogger(__name__)
+
+# The admin user list pages auth_user newest first and searches username and
+# email with icontains / istartswith, which Django renders as
+# UPPER(col::text) LIKE UPPER(...). The trigram indexes cover exactly that
+# expression; they need pg_trgm (in the stock postgres images) and are skipped
+# with a logged warning where the extension is not available.
+JOINED_INDEX = (
+    "CREATE INDEX IF NOT EXISTS user_joined_idx ON auth_user (date_joined, id) WHERE NOT is_superuser"
+)
+TRIGRAM_INDEXES = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS user_username_trgm_idx ON auth_user USING gin ((UPPER(username::text)) gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS user_email_trgm_idx ON auth_user USING gin ((UPPER(email::text)) gin_trgm_ops)",
+]
+
+
+def create_indexes(apps, schema_editor):
+    schema_editor.execute(JOINED_INDEX)
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+        available = cursor.fetchone() is not None
+    if not available:
+        logger.warning("pg_trgm is not available; admin user search will not be indexed.")
+        return
+    for sql in TRIGRAM_INDEXES:
+        schema_editor.execute(sql)
+
+
+def drop_indexes(apps, schema_editor):
+    for name in ("user_joined_idx", "user_username_trgm_idx", "user_email_trgm_idx"):
+        schema_editor.execute(f"DROP INDEX IF EXISTS {name}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0011_unauthorizedattempt'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(create_indexes, drop_indexes),
+    ]
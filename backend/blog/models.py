@@ -1,5 +1,13 @@
 from django.conf import settings
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
+from django.utils import timezone
+from django.utils.text import Truncator
+
+EXCERPT_LENGTH = 200
+# Text search configuration used by the Post.search_vector trigger and queries.
+SEARCH_CONFIG = "english"
 
 
 class AdminSetup(models.Model):
@@ -12,7 +20,9 @@ class AdminSetup(models.Model):
 
 
 class BannedIP(models.Model):
-    ip_address = models.GenericIPAddressField(unique=True)
+    # A single address ("203.0.113.7") or a CIDR range ("203.0.113.0/24"),
+    # normalized by core.ip_bans.normalize_network.
+    ip_address = models.CharField(max_length=49, unique=True)
     reason = models.CharField(max_length=255, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
@@ -23,31 +33,68 @@ class BannedIP(models.Model):
 
 
 class AuditLog(models.Model):
-    """User actions and security events (e.g. unauthorized attempts)."""
+    """
+    User actions and security events (e.g. unauthorized attempts).
+    Range-partitioned on created_at; see blog.partitions.
+    """
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL, null=True, blank=True, on_delete=models.SET_NULL
     )
     ip_address = models.GenericIPAddressField(null=True, blank=True)
     path = models.CharField(max_length=500, blank=True)
     method = models.CharField(max_length=10, blank=True)
-    action = models.CharField(max_length=100)  # e.g. login, logout, unauthorized_attempt
+    action = models.CharField(max_length=100)  # e.g. login, logout, admin_login
     details = models.JSONField(default=dict, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
-        ordering = ["-created_at"]
+        ordering = ["-created_at", "-id"]
+        indexes = [
+            # Filtered keyset paging in the admin audit/attack views. Created
+            # on the partitioned parent, so every partition gets a copy.
+            models.Index(fields=["action", "-created_at", "-id"], name="auditlog_action_created_idx"),
+            models.Index(fields=["user", "-created_at", "-id"], name="auditlog_user_created_idx"),
+            models.Index(fields=["ip_address", "-created_at", "-id"], name="auditlog_ip_created_idx"),
+        ]
         verbose_name = "Audit log"
         verbose_name_plural = "Audit logs"
 
 
+class UnauthorizedAttempt(models.Model):
+    """
+    Unauthenticated hits on a protected path, coalesced per (ip, path,
+    method) while they keep coming; see blog.attacks.
+    """
+    ip_address = models.GenericIPAddressField(null=True, blank=True)
+    path = models.CharField(max_length=500)
+    method = models.CharField(max_length=10)
+    hits = models.PositiveBigIntegerField(default=0)
+    first_seen = models.DateTimeField()
+    last_seen = models.DateTimeField()
+    user_agents = models.JSONField(default=list, blank=True)  # a few samples
+
+    class Meta:
+        ordering = ["-last_seen", "-id"]
+        indexes = [
+            models.Index(fields=["-last_seen", "-id"], name="attempt_last_seen_idx"),
+            models.Index(fields=["ip_address", "-last_seen", "-id"], name="attempt_ip_last_seen_idx"),
+        ]
+        verbose_name = "Unauthorized attempt"
+        verbose_name_plural = "Unauthorized attempts"
+
+
 class TrafficLog(models.Model):
-    """Request traffic for admin dashboard."""
+    """
+    Request traffic for admin dashboard.
+    Range-partitioned on created_at; see blog.partitions.
+    """
     ip_address = models.GenericIPAddressField(null=True, blank=True)
     path = models.CharField(max_length=500)
     method = models.CharField(max_length=10)
     status_code = models.PositiveSmallIntegerField(null=True, blank=True)
     user_agent = models.CharField(max_length=500, blank=True)
-    created_at = models.DateTimeField(auto_now_add=True)
+    # Set when the request is logged, not when the buffered batch is flushed.
+    created_at = models.DateTimeField(default=timezone.now)
 
     class Meta:
         ordering = ["-created_at"]
@@ -55,6 +102,28 @@ class TrafficLog(models.Model):
         verbose_name_plural = "Traffic logs"
 
 
+class TrafficRollup(models.Model):
+    """
+    Per-minute request counts by dimension (total, path, method, status
+    class, ip), compacted from Redis counters by blog.rollups.
+    """
+    bucket = models.DateTimeField()
+    dimension = models.CharField(max_length=10)
+    value = models.CharField(max_length=500, blank=True)
+    count = models.PositiveBigIntegerField(default=0)
+
+    class Meta:
+        ordering = ["-bucket"]
+        constraints = [
+            models.UniqueConstraint(fields=["bucket", "dimension", "value"], name="trafficrollup_bucket_uniq"),
+        ]
+        indexes = [
+            models.Index(fields=["dimension", "bucket"], name="trafficrollup_dim_bucket_idx"),
+        ]
+        verbose_name = "Traffic rollup"
+        verbose_name_plural = "Traffic rollups"
+
+
 class Profile(models.Model):
     user = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     bio = models.TextField(blank=True)
@@ -68,13 +137,54 @@ class Post(models.Model):
     author = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     title = models.CharField(max_length=200)
     content = models.TextField()
+    # Precomputed from content on save so list views never load content.
+    excerpt = models.CharField(max_length=EXCERPT_LENGTH, blank=True, editable=False)
+    word_count = models.PositiveIntegerField(default=0, editable=False)
+    # Maintained by a database trigger (migration 0007): title weighted A,
+    # content weighted B.
+    search_vector = SearchVectorField(null=True, editable=False)
     published = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
-        ordering = ["-created_at"]
+        ordering = ["-created_at", "-id"]
+        indexes = [
+            # Keyset pagination (blog.pagination.KeysetPagination) for the
+            # public feed and for each author's own list.
+            models.Index(
+                fields=["-created_at", "-id"],
+                name="post_published_feed_idx",
+                condition=models.Q(published=True),
+            ),
+            models.Index(fields=["author", "-created_at", "-id"], name="post_author_feed_idx"),
+            GinIndex(fields=["search_vector"], name="post_search_idx"),
+        ]
+
+    # Whether the stored row is published; set on load and kept current by
+    # blog.signals, so unpublishing can be told apart from a draft edit.
+    published_in_db = False
 
     def __str__(self) -> str:
         return self.title
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        post = super().from_db(db, field_names, values)
+        # Deferred: assume published rather than query for it.
+        post.published_in_db = post.__dict__.get("published", True)
+        return post
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get("update_fields")
+        if update_fields is None or "content" in update_fields:
+            self.refresh_summary()
+            if update_fields is not None:
+                kwargs["update_fields"] = {*update_fields, "excerpt", "word_count"}
+        super().save(*args, **kwargs)
+
+    def refresh_summary(self):
+        text = " ".join(self.content.split())
+        self.excerpt = Truncator(text).chars(EXCERPT_LENGTH)
+        self.word_count = len(text.split()) if text else 0
+
@@ -0,0 +1,154 @@
+import base64
+import binascii
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+def get_page_size(request, param="page_size", default=None, maximum=None):
+    """Requested page size, clamped to 1..maximum (POSTS_MAX_PAGE_SIZE by default)."""
+    default = default or settings.POSTS_PAGE_SIZE
+    maximum = maximum or settings.POSTS_MAX_PAGE_SIZE
+    try:
+        size = int(request.query_params.get(param, default))
+    except (TypeError, ValueError):
+        size = default
+    return max(1, min(size, maximum))
+
+
+class KeysetPagination(BasePagination):
+    """
+    Newest-first cursor pagination keyed on (ordering_field, id), created_at
+    unless a subclass says otherwise.
+
+    Each page is a single index range scan starting just after the last row of
+    the previous page, so page N costs the same as page 1 and no COUNT(*) is
+    ever issued. The cursor is an opaque token; clients follow `next` until it
+    is null.
+    """
+
+    ordering_field = "created_at"
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+    default_page_size = None
+    max_page_size = None
+    invalid_cursor_message = "Invalid cursor."
+
+    def paginate_queryset(self, queryset, request, view=None):
+        return self._set_page(list(self.page_queryset(queryset, request)))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """paginate_queryset for coroutine views (core.async_api)."""
+        return self._set_page([row async for row in self.page_queryset(queryset, request)])
+
+    def page_queryset(self, queryset, request):
+        """The unevaluated query for this page (plus one row to detect a next page)."""
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        field = self.ordering_field
+        queryset = queryset.order_by(f"-{field}", "-id")
+        position = self.decode_cursor(request)
+        if position is not None:
+            moment, pk = position
+            # field <= X leads the index scan; the OR only trims ties.
+            queryset = queryset.filter(
+                Q(**{f"{field}__lte": moment}) & (Q(**{f"{field}__lt": moment}) | Q(id__lt=pk))
+            )
+        return queryset[: self.page_size + 1]
+
+    def _set_page(self, rows):
+        self.has_next = len(rows) > self.page_size
+        self.page = rows[: self.page_size]
+        return self.page
+
+    def get_paginated_response(self, data):
+        return Response({"next": self.get_next_link(), "results": data})
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+    def get_page_size(self, request):
+        return get_page_size(request, self.page_size_query_param, self.default_page_size, self.max_page_size)
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        last = self.page[-1]
+        return replace_query_param(self.page_url(), self.cursor_query_param, self.encode_cursor(last))
+
+    def page_url(self):
+        """The URL `next` is built from (its cursor is replaced)."""
+        return self.request.build_absolute_uri()
+
+    def encode_cursor(self, obj):
+        # Rows are model instances or values() dicts (fast-path list views).
+        if isinstance(obj, dict):
+            moment, pk = obj[self.ordering_field], obj["id"]
+        else:
+            moment, pk = getattr(obj, self.ordering_field), obj.pk
+        raw = f"{moment.isoformat()}|{pk}"
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+    def decode_cursor(self, request):
+        token = request.query_params.get(self.cursor_query_param)
+        if not token:
+            return None
+        try:
+            raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)).decode()
+            created_at, pk = raw.rsplit("|", 1)
+            created_at = parse_datetime(created_at)
+            pk = int(pk)
+        except (binascii.Error, UnicodeDecodeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        if created_at is None:
+            raise NotFound(self.invalid_cursor_message)
+        return created_at, pk
+
+
+class FeedPagination(KeysetPagination):
+    """
+    The public feed. `next` is built from FEED_BASE_URL and the page size
+    alone, not the request's host and query string, so every request that
+    maps to a cached page (blog.feed_cache) or snapshot gets the same body.
+    """
+
+    def page_url(self):
+        params = {}
+        if self.page_size != (self.default_page_size or settings.POSTS_PAGE_SIZE):
+            params[self.page_size_query_param] = self.page_size
+        url = f"{settings.FEED_BASE_URL.rstrip('/')}{self.request.path}"
+        return f"{url}?{urlencode(params)}" if params else url
+
+
+class AdminLogPagination(KeysetPagination):
+    """Keyset paging for the admin log views; keeps their `?limit=` parameter."""
+
+    page_size_query_param = "limit"
+    default_page_size = 100
+    max_page_size = 500
+
+
+class AttemptPagination(AdminLogPagination):
+    """Unauthorized attempts by most recent hit (rows move up as they grow)."""
+
+    ordering_field = "last_seen"
+
+
+class UserPagination(AdminLogPagination):
+    """Admin user list, newest account first."""
+
+    ordering_field = "date_joined"
+    default_page_size = 50
@@ -0,0 +1,177 @@
+"""
+Range partition maintenance for the append-only log tables.
+
+TrafficLog and AuditLog are partitioned by created_at (migration 0008). Each
+table has a DEFAULT partition so inserts never fail, plus day- or week-sized
+range partitions created ahead of time by `manage.py manage_log_partitions`.
+Expired partitions are detached (and dropped unless the table is configured
+to archive), never emptied row by row. Rows the DEFAULT partition still holds
+from before the retention window (legacy rows copied in by 0008) are deleted,
+or moved to `<table>_archive` when archiving.
+"""
+import datetime
+import logging
+import re
+from dataclasses import dataclass
+
+from django.apps import apps
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+logger = logging.getLogger(__name__)
+
+INTERVALS = {
+    "day": datetime.timedelta(days=1),
+    "week": datetime.timedelta(days=7),
+}
+
+_BOUND_RE = re.compile(r"FROM \('([^']+)'\) TO \('([^']+)'\)")
+
+
+@dataclass
+class Partition:
+    name: str
+    start: datetime.datetime
+    end: datetime.datetime
+
+
+def table_for(model_label):
+    return apps.get_model(model_label)._meta.db_table
+
+
+def floor_to_interval(moment, interval):
+    """Start of the day (UTC) or ISO week (Monday, UTC) containing moment."""
+    day = moment.astimezone(datetime.timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+    if interval == "week":
+        day -= datetime.timedelta(days=day.weekday())
+    return day
+
+
+def partition_name(table, start):
+    return f"{table}_p{start:%Y%m%d}"
+
+
+def list_partitions(table):
+    """Range partitions of table, oldest first (the DEFAULT partition is excluded)."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT child.relname, pg_get_expr(child.relpartbound, child.oid)
+            FROM pg_inherits
+            JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+            JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+            WHERE parent.relname = %s
+            """,
+            [table],
+        )
+        rows = cursor.fetchall()
+    partitions = []
+    for name, bound in rows:
+        match = _BOUND_RE.search(bound or "")
+        if match:
+            start, end = (parse_datetime(v) for v in match.groups())
+            partitions.append(Partition(name, start, end))
+    return sorted(partitions, key=lambda p: p.start)
+
+
+def ensure_partitions(table, interval, start, end, dry_run=False):
+    """
+    Create range partitions covering [start, end). Rows that already landed in
+    the DEFAULT partition for a new range are moved into it.
+    """
+    step = INTERVALS[interval]
+    existing = list_partitions(table)
+    created = []
+    lower = floor_to_interval(start, interval)
+    while lower < end:
+        upper = lower + step
+        if not any(p.start < upper and lower < p.end for p in existing):
+            name = partition_name(table, lower)
+            if not dry_run:
+                _create_partition(table, name, lower, upper)
+            created.append(Partition(name, lower, upper))
+        lower = upper
+    return created
+
+
+def _create_partition(table, name, lower, upper):
+    qn = connection.ops.quote_name
+    default = qn(f"{table}_default")
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT EXISTS (SELECT 1 FROM {default} WHERE created_at >= %s AND created_at < %s)",
+            [lower, upper],
+        )
+        if not cursor.fetchone()[0]:
+            cursor.execute(
+                f"CREATE TABLE {qn(name)} PARTITION OF {qn(table)} FOR VALUES FROM (%s) TO (%s)",
+                [lower, upper],
+            )
+            return
+        # Postgres refuses to add a partition whose range has rows in DEFAULT,
+        # so build it detached, move those rows over, then attach.
+        cursor.execute(f"CREATE TABLE {qn(name)} (LIKE {qn(table)} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)")
+        cursor.execute(
+            f"WITH moved AS (DELETE FROM {default} WHERE created_at >= %s AND created_at < %s RETURNING *) "
+            f"INSERT INTO {qn(name)} SELECT * FROM moved",
+            [lower, upper],
+        )
+        cursor.execute(
+            f"ALTER TABLE {qn(table)} ATTACH PARTITION {qn(name)} FOR VALUES FROM (%s) TO (%s)",
+            [lower, upper],
+        )
+
+
+def expire_partitions(table, cutoff, archive=False, dry_run=False):
+    """
+    Detach every partition that ends at or before cutoff; drop it unless
+    archiving. Stray rows older than cutoff in the DEFAULT partition are
+    deleted, or moved to `<table>_archive` when archiving.
+    """
+    qn = connection.ops.quote_name
+    expired = [p for p in list_partitions(table) if p.end <= cutoff]
+    if dry_run:
+        return expired, 0
+    default = qn(f"{table}_default")
+    with connection.cursor() as cursor:
+        for partition in expired:
+            with transaction.atomic():
+                cursor.execute(f"ALTER TABLE {qn(table)} DETACH PARTITION {qn(partition.name)}")
+                if not archive:
+                    cursor.execute(f"DROP TABLE {qn(partition.name)}")
+        with transaction.atomic():
+            if archive:
+                archived = qn(f"{table}_archive")
+                cursor.execute(f"CREATE TABLE IF NOT EXISTS {archived} (LIKE {qn(table)})")
+                cursor.execute(
+                    f"WITH moved AS (DELETE FROM {default} WHERE created_at < %s RETURNING *) "
+                    f"INSERT INTO {archived} SELECT * FROM moved",
+                    [cutoff],
+                )
+            else:
+                cursor.execute(f"DELETE FROM {default} WHERE created_at < %s", [cutoff])
+            stray = cursor.rowcount
+    return expired, stray
+
+
+def maintain(now=None, dry_run=False):
+    """Apply settings.LOG_PARTITIONS to every configured table; returns a report per table."""
+    now = now or timezone.now()
+    report = {}
+    for model_label, config in settings.LOG_PARTITIONS.items():
+        table = table_for(model_label)
+        interval = config["interval"]
+        cutoff = floor_to_interval(now - datetime.timedelta(days=config["retention_days"]), interval)
+        horizon = now + INTERVALS[interval] * (config["premake"] + 1)
+        created = ensure_partitions(table, interval, cutoff, horizon, dry_run=dry_run)
+        archive = config.get("archive", False)
+        expired, stray = expire_partitions(table, cutoff, archive=archive, dry_run=dry_run)
+        report[table] = {
+            "created": created,
+            "expired": expired,
+            "stray_deleted": 0 if archive else stray,
+            "stray_archived": stray if archive else 0,
+        }
+    return report
@@ -0,0 +1,218 @@
+"""
+Pre-aggregated traffic statistics.
+
+Logged requests are counted into one Redis hash per minute
+(`traffic:rollup:<epoch minute>`, fields `<dimension>|<value>`) with a single
+pipelined round trip per TrafficLog batch. Closed minutes are periodically
+compacted into TrafficRollup rows, so stats queries read a few rollup rows per
+minute instead of scanning TrafficLog.
+"""
+import datetime
+import logging
+import time
+import uuid
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Sum
+from django.db.models.functions import Trunc
+from django.utils import timezone
+
+from .models import TrafficRollup
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "traffic:rollup:"
+MINUTES_KEY = "traffic:rollup:minutes"
+LOCK_KEY = "traffic:rollup:compact-lock"
+# Redis copies outlive compaction comfortably; they only matter until then.
+KEY_TTL = 2 * 86400
+# Minutes this recent may still receive late (buffered) rows.
+GRACE_MINUTES = 2
+DIMENSIONS = ("path", "method", "status", "ip")
+# Deletes the lock only if this run still holds it.
+RELEASE_LUA = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+MAX_VALUE_LENGTH = 200
+
+_last_compaction = 0.0
+
+
+def _redis():
+    from django_redis import get_redis_connection
+    return get_redis_connection("default")
+
+
+def status_class(status_code):
+    return f"{status_code // 100}xx" if status_code else "unknown"
+
+
+def _minute(moment):
+    return int(moment.timestamp() // 60)
+
+
+def _minute_start(minute):
+    return datetime.datetime.fromtimestamp(minute * 60, tz=datetime.timezone.utc)
+
+
+def record_traffic(entries):
+    """Add TrafficLog field dicts to the per-minute Redis counters."""
+    counts = defaultdict(Counter)
+    for entry in entries:
+        fields = counts[_minute(entry.get("created_at") or timezone.now())]
+        fields["total|"] += 1
+        fields[f"path|{entry.get('path', '')[:MAX_VALUE_LENGTH]}"] += 1
+        fields[f"method|{entry.get('method', '')}"] += 1
+        fields[f"status|{status_class(entry.get('status_code'))}"] += 1
+        if entry.get("ip_address"):
+            fields[f"ip|{entry['ip_address']}"] += 1
+    if not counts:
+        return
+    pipe = _redis().pipeline(transaction=False)
+    for minute, fields in counts.items():
+        key = f"{KEY_PREFIX}{minute}"
+        for field, n in fields.items():
+            pipe.hincrby(key, field, n)
+        pipe.expire(key, KEY_TTL)
+        pipe.zadd(MINUTES_KEY, {minute: minute})
+    pipe.execute()
+
+
+def flush_hook(batch):
+    """BufferedLogWriter hook: count the batch, compacting now and then."""
+    global _last_compaction
+    record_traffic(batch)
+    if time.monotonic() - _last_compaction >= settings.TRAFFIC_ROLLUP_COMPACT_INTERVAL:
+        _last_compaction = time.monotonic()
+        compact()
+
+
+def _decode(value):
+    return value.decode() if isinstance(value, bytes) else value
+
+
+def compact(now=None):
+    """
+    Move closed minutes from Redis into TrafficRollup. One worker at a time
+    (Redis lock); returns the number of minutes compacted.
+    """
+    client = _redis()
+    token = uuid.uuid4().hex
+    if not client.set(LOCK_KEY, token, nx=True, ex=60):
+        return 0
+    done = 0
+    try:
+        cutoff = _minute(now or timezone.now()) - GRACE_MINUTES
+        for member in client.zrangebyscore(MINUTES_KEY, "-inf", cutoff):
+            minute = int(member)
+            key = f"{KEY_PREFIX}{minute}"
+            processing = f"{key}:compacting"
+            # Unlist, then rename: a late increment re-lists the minute and
+            # starts a fresh hash that the next run picks up.
+            client.zrem(MINUTES_KEY, member)
+            if client.exists(key) and not client.renamenx(key, processing):
+                # An earlier failed upsert is still pending: compact that
+                # first and leave the newer counts for the next run.
+                client.zadd(MINUTES_KEY, {member: minute})
+            fields = {_decode(k): int(v) for k, v in client.hgetall(processing).items()}
+            try:
+                if fields:
+                    _upsert(minute, fields)
+            except Exception:
+                client.zadd(MINUTES_KEY, {member: minute})
+                raise
+            client.delete(processing)
+            done += 1
+    finally:
+        client.eval(RELEASE_LUA, 1, LOCK_KEY, token)
+    return done
+
+
+def _upsert(minute, fields):
+    bucket = _minute_start(minute)
+    rows = []
+    for field, n in fields.items():
+        dimension, _, value = field.partition("|")
+        rows.extend([bucket, dimension, value, n])
+    table = connection.ops.quote_name(TrafficRollup._meta.db_table)
+    placeholders = ", ".join(["(%s, %s, %s, %s)"] * (len(rows) // 4))
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {table} (bucket, dimension, value, count) VALUES {placeholders} "
+            f"ON CONFLICT (bucket, dimension, value) DO UPDATE SET count = {table}.count + EXCLUDED.count",
+            rows,
+        )
+
+
+def _pending(start, end):
+    """Counters for [start, end) still in Redis (not yet compacted)."""
+    client = _redis()
+    members = client.zrangebyscore(MINUTES_KEY, _minute(start), _minute(end) - 1)
+    if not members:
+        return {}
+    pipe = client.pipeline(transaction=False)
+    for member in members:
+        pipe.hgetall(f"{KEY_PREFIX}{int(member)}")
+    return {
+        int(member): {_decode(k): int(v) for k, v in fields.items()}
+        for member, fields in zip(members, pipe.execute())
+    }
+
+
+def traffic_stats(start, end, interval="minute", top=10):
+    """Request counts for [start, end): a time series plus per-dimension breakdowns."""
+    rows = TrafficRollup.objects.filter(bucket__gte=start, bucket__lt=end)
+    series = Counter()
+    for row in (
+        rows.filter(dimension="total")
+        .annotate(period=Trunc("bucket", interval))
+        .values("period")
+        .annotate(n=Sum("count"))
+    ):
+        series[row["period"]] += row["n"]
+    breakdown = defaultdict(Counter)
+    for row in rows.filter(dimension__in=DIMENSIONS).values("dimension", "value").annotate(n=Sum("count")):
+        breakdown[row["dimension"]][row["value"]] += row["n"]
+
+    try:
+        pending = _pending(start, end)
+    except Exception:
+        logger.warning("Traffic rollup counters unavailable; stats cover compacted minutes only")
+        pending = {}
+    for minute, fields in pending.items():
+        period = _truncate(_minute_start(minute), interval)
+        for field, n in fields.items():
+            dimension, _, value = field.partition("|")
+            if dimension == "total":
+                series[period] += n
+            elif dimension in DIMENSIONS:
+                breakdown[dimension][value] += n
+
+    def ranked(dimension, key):
+        return [{key: value, "count": n} for value, n in breakdown[dimension].most_common(top)]
+
+    return {
+        "start": start.isoformat(),
+        "end": end.isoformat(),
+        "interval": interval,
+        "total": sum(series.values()),
+        "series": [{"period": p.isoformat(), "count": n} for p, n in sorted(series.items())],
+        "by_status": dict(breakdown["status"]),
+        "by_method": dict(breakdown["method"]),
+        "top_paths": ranked("path", "path"),
+        "top_ips": ranked("ip", "ip_address"),
+    }
+
+
+def _truncate(moment, interval):
+    moment = moment.astimezone(datetime.timezone.utc)
+    if interval == "minute":
+        return moment.replace(second=0, microsecond=0)
+    if interval == "hour":
+        return moment.replace(minute=0, second=0, microsecond=0)
+    return moment.replace(hour=0, minute=0, second=0, microsecond=0)
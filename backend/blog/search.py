@@ -0,0 +1,43 @@
+"""
+Full-text search over published posts, backed by Post.search_vector (GIN).
+"""
+from django.contrib.postgres.search import SearchHeadline, SearchQuery, SearchRank
+from django.db.models import F
+from django.utils.html import escape
+
+from .models import SEARCH_CONFIG
+
+# Control characters mark highlights in ts_headline output so the snippet can
+# be HTML-escaped before the markers are turned into <mark> tags.
+HIGHLIGHT_START = "\x02"
+HIGHLIGHT_STOP = "\x03"
+
+
+def search_query(text):
+    return SearchQuery(text, search_type="websearch", config=SEARCH_CONFIG)
+
+
+def search_posts(queryset, text):
+    """Filter queryset to posts matching text, best match first, with snippets."""
+    query = search_query(text)
+    return (
+        queryset.filter(search_vector=query)
+        .annotate(
+            rank=SearchRank(F("search_vector"), query),
+            snippet=SearchHeadline(
+                "content",
+                query,
+                config=SEARCH_CONFIG,
+                start_sel=HIGHLIGHT_START,
+                stop_sel=HIGHLIGHT_STOP,
+                max_words=35,
+                min_words=15,
+                max_fragments=2,
+            ),
+        )
+        .order_by("-rank", "-created_at", "-id")
+    )
+
+
+def highlight_html(snippet):
+    return escape(snippet).replace(HIGHLIGHT_START, "<mark>").replace(HIGHLIGHT_STOP, "</mark>")
@@ -1,7 +1,9 @@
 from django.contrib.auth import authenticate, get_user_model
+from django.db.models import F
 from rest_framework import serializers
 
 from .models import Post, Profile
+from .search import highlight_html
 
 
 User = get_user_model()
@@ -61,9 +63,54 @@ class PostSerializer(serializers.ModelSerializer):
             "id",
             "title",
             "content",
+            "excerpt",
+            "word_count",
             "published",
             "author_username",
             "created_at",
             "updated_at",
         ]
 
+
+class PostSummarySerializer(serializers.ModelSerializer):
+    """List representation: precomputed excerpt instead of the full content."""
+
+    author_username = serializers.ReadOnlyField(source="author.username")
+
+    class Meta:
+        model = Post
+        fields = [
+            "id",
+            "title",
+            "excerpt",
+            "word_count",
+            "published",
+            "author_username",
+            "created_at",
+            "updated_at",
+        ]
+        read_only_fields = fields
+
+
+def post_summary_values(queryset):
+    """
+    PostSummarySerializer's fields straight from values(): no model instances
+    and no per-field to_representation. Datetimes stay datetime objects and are
+    formatted by the renderer (core.renderers.ORJSONRenderer), as DRF would.
+    """
+    fields = [f for f in PostSummarySerializer.Meta.fields if f != "author_username"]
+    return queryset.values(*fields, author_username=F("author__username"))
+
+
+class PostSearchResultSerializer(PostSummarySerializer):
+    """Summary plus rank and an HTML-escaped snippet with <mark> highlights."""
+
+    snippet = serializers.SerializerMethodField()
+    rank = serializers.FloatField(read_only=True)
+
+    class Meta(PostSummarySerializer.Meta):
+        fields = PostSummarySerializer.Meta.fields + ["snippet", "rank"]
+        read_only_fields = fields
+
+    def get_snippet(self, obj):
+        return highlight_html(obj.snippet or "")
@@ -0,0 +1,20 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .feed_cache import bump_feed_version
+from .models import Post
+from .snapshots import schedule_refresh
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def post_changed(sender, instance, **kwargs):
+    """Invalidate the public feed after any Post write (API views and Django admin)."""
+    # Bump only once the row is visible to other connections; bumping earlier
+    # would let a concurrent reader re-cache the old rows under the new version.
+    transaction.on_commit(bump_feed_version)
+    # Draft edits never reach the static snapshots.
+    if instance.published or instance.published_in_db:
+        schedule_refresh()
+    instance.published_in_db = instance.published
@@ -0,0 +1,197 @@
+"""
+Static snapshots of the public feed for nginx to serve.
+
+The first FEED_SNAPSHOT_PAGES pages of /api/posts/ (default page size) are
+rendered to FEED_SNAPSHOT_DIR exactly as the API would return them:
+`index.json` for the first page and `cursor-<cursor>.json` for each page
+reached by following `next`. nginx serves those two query shapes from the
+directory and passes everything else, or a missing file, to the backend.
+
+Requests nginx answers from a snapshot never reach Django, so two things
+are handed to nginx instead. The ban list is exported as `banned-ips.conf`
+(`<network> 1;` lines for a `geo` block) on every ban change; nginx sends
+banned clients to the backend, which refuses them. Snapshot hits are logged
+by nginx and read back by blog.feed_hits.
+
+Snapshots are rewritten after every commit that changes a published post (or
+unpublishes one). Each file is replaced atomically, later pages before the
+first so a `next` link never points at a file that is not there yet, then
+files for cursors that no longer exist are removed. Concurrent rebuilds are
+serialized with a Redis lock and a dirty flag: a change arriving during a
+rebuild triggers one more, so the last rebuild always sees the last commit.
+"""
+import logging
+import os
+import tempfile
+import threading
+from pathlib import Path
+
+from django.conf import settings
+from django.test.client import RequestFactory
+from rest_framework.request import Request
+
+from core.renderers import ORJSONRenderer
+from .pagination import FeedPagination
+
+logger = logging.getLogger(__name__)
+
+BAN_LIST_FILE = "banned-ips.conf"
+DIRTY_KEY = "feed:snapshots:dirty"
+LOCK_KEY = "feed:snapshots:lock"
+
+# Per thread: changes seen so far, and how many of them the last rebuild covered.
+_changes = threading.local()
+
+
+def _redis():
+    from django_redis import get_redis_connection
+    return get_redis_connection("default")
+
+
+def enabled():
+    return bool(settings.FEED_SNAPSHOT_DIR)
+
+
+def file_name(cursor):
+    return "index.json" if cursor is None else f"cursor-{cursor}.json"
+
+
+def render_pages():
+    """{file name: response body} for the first FEED_SNAPSHOT_PAGES feed pages, first page first."""
+    from .views import PUBLIC_FEED_QUERYSET
+
+    factory = RequestFactory()
+    renderer = ORJSONRenderer()
+    pages, cursor = {}, None
+    for _ in range(settings.FEED_SNAPSHOT_PAGES):
+        params = {} if cursor is None else {"cursor": cursor}
+        request = Request(factory.get("/api/posts/", params))
+        paginator = FeedPagination()
+        rows = paginator.paginate_queryset(PUBLIC_FEED_QUERYSET, request)
+        pages[file_name(cursor)] = renderer.render(paginator.get_paginated_response(rows).data)
+        if not paginator.has_next:
+            break
+        cursor = paginator.encode_cursor(rows[-1])
+    return pages
+
+
+def _write(directory, name, body):
+    fd, temporary = tempfile.mkstemp(dir=directory, prefix=".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as handle:
+            handle.write(body)
+        # mkstemp creates 0600; nginx runs as another user.
+        os.chmod(temporary, 0o644)
+        os.replace(temporary, directory / name)
+    except BaseException:
+        os.unlink(temporary)
+        raise
+
+
+def snapshot_files(directory):
+    return {path.name for path in directory.glob("*.json")}
+
+
+def write_snapshots():
+    """Render and publish every snapshot; returns the number of pages written."""
+    directory = Path(settings.FEED_SNAPSHOT_DIR)
+    directory.mkdir(parents=True, exist_ok=True)
+    pages = render_pages()
+    for name in reversed(list(pages)):
+        _write(directory, name, pages[name])
+    for name in snapshot_files(directory) - set(pages):
+        (directory / name).unlink(missing_ok=True)
+    return len(pages)
+
+
+def render_ban_list():
+    """The BannedIP table as nginx `geo` entries."""
+    from core.ip_bans import normalize_network
+    from .models import BannedIP
+
+    lines = []
+    for value in BannedIP.objects.order_by("ip_address").values_list("ip_address", flat=True):
+        try:
+            lines.append(f"{normalize_network(value)} 1;\n")
+        except ValueError:
+            logger.warning("Not exporting invalid banned IP entry %r", value)
+    return "".join(lines).encode()
+
+
+def write_ban_list():
+    """Export the ban list for nginx (call after every ban change)."""
+    if not enabled():
+        return
+    directory = Path(settings.FEED_SNAPSHOT_DIR)
+    directory.mkdir(parents=True, exist_ok=True)
+    _write(directory, BAN_LIST_FILE, render_ban_list())
+
+
+def check_snapshots():
+    """
+    Differences between the snapshot directory and the database: {"missing",
+    "stale", "extra"}, covering the pages and the exported ban list.
+    """
+    directory = Path(settings.FEED_SNAPSHOT_DIR)
+    pages = render_pages()
+    present = snapshot_files(directory) if directory.is_dir() else set()
+    report = {
+        "missing": sorted(set(pages) - present),
+        "stale": sorted(name for name in set(pages) & present if (directory / name).read_bytes() != pages[name]),
+        "extra": sorted(present - set(pages)),
+    }
+    ban_list = directory / BAN_LIST_FILE
+    if not ban_list.exists():
+        report["missing"].append(BAN_LIST_FILE)
+    elif ban_list.read_bytes() != render_ban_list():
+        report["stale"].append(BAN_LIST_FILE)
+    return report
+
+
+def remove_snapshots():
+    directory = Path(settings.FEED_SNAPSHOT_DIR)
+    if directory.is_dir():
+        for name in snapshot_files(directory):
+            (directory / name).unlink(missing_ok=True)
+
+
+def schedule_refresh():
+    """Rebuild once the current transaction commits (call on every feed change)."""
+    if not enabled():
+        return
+    from django.db import transaction
+
+    _changes.seen = seen = getattr(_changes, "seen", 0) + 1
+    transaction.on_commit(lambda: _refresh_after(seen))
+
+
+def _refresh_after(change):
+    # A transaction that saves many posts queues one callback per post; the
+    # first rebuild after the commit covers all of them.
+    if change <= getattr(_changes, "covered", 0):
+        return
+    _changes.covered = _changes.seen
+    refresh_snapshots()
+
+
+def refresh_snapshots():
+    """Rebuild now; one worker at a time, and again if a change arrives meanwhile."""
+    try:
+        client = _redis()
+        client.set(DIRTY_KEY, 1)
+        while client.get(DIRTY_KEY):
+            if not client.set(LOCK_KEY, 1, nx=True, ex=60):
+                return  # The holder sees the flag and rebuilds again.
+            try:
+                while client.delete(DIRTY_KEY):
+                    write_snapshots()
+            finally:
+                client.delete(LOCK_KEY)
+    except Exception:
+        # A stale snapshot could keep showing an unpublished post; without
+        # any, nginx passes feed requests to the backend.
+        logger.exception("Could not rebuild feed snapshots; removing them")
+        try:
+            remove_snapshots()
+        except OSError:
+            logger.exception("Could not remove feed snapshots")
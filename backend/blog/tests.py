@@ -1,14 +1,93 @@
+import concurrent.futures
+import csv
+import datetime
+import gzip
+import io
+import json
+import time
+from urllib.parse import urlsplit
+
 import pytest
+from asgiref.sync import async_to_sync
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.db.models import Q, Sum
+from django.http import QueryDict
+from django.test import AsyncClient
 from django.urls import reverse
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
 from rest_framework.test import APIClient
 from rest_framework import status
 
-from .models import Post, Profile
+from benchmarks import harness
+from benchmarks import views as view_benchmarks
+from core import cache_fill as cache_fill_module
+from core import metrics, throttling, timing_chain
+from core.cache_fill import cache_fill
+from core.db_pool import ConnectionPool, PoolTimeout
+from core.ip_bans import PrefixMatcher, banned_ips
+from core.query_budget import QueryBudget
+from core.log_buffer import BufferedLogWriter
+from core.renderers import ORJSONRenderer
+from core.throttling import local_lockouts
+from . import attacks, exports, feed_hits, partitions, rollups, serializers, snapshots, urls
+from .models import AuditLog, BannedIP, Post, Profile, TrafficLog, TrafficRollup, UnauthorizedAttempt
+from .serializers import PostSummarySerializer
 
 User = get_user_model()
 
 
+@pytest.fixture(autouse=True)
+def isolated_cache(settings):
+    # Use a dedicated Redis database, emptied per test: cached feed pages and
+    # version keys must not outlive the rolled-back test data.
+    default = dict(settings.CACHES["default"])
+    default["LOCATION"] = f"redis://{settings.REDIS_HOST}:{settings.REDIS_PORT}/15"
+    settings.CACHES = {**settings.CACHES, "default": default}
+    cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def synchronous_traffic_log(settings):
+    # Background writer threads would insert outside the test transaction.
+    settings.TRAFFIC_LOG_BUFFERED = False
+    # The periodic compaction/flush hooks would then run inside whichever
+    # request's query budget came due; tests flush explicitly.
+    settings.TRAFFIC_ROLLUP_COMPACT_INTERVAL = settings.ATTACK_LOG_FLUSH_INTERVAL = float("inf")
+    settings.FEED_HITS_INGEST_INTERVAL = float("inf")
+
+
+@pytest.fixture(autouse=True)
+def fresh_ban_list(settings):
+    # The compiled ban list is process-wide; reload it from each test's DB.
+    settings.BANNED_IPS_PUBSUB = False
+    banned_ips.reset()
+    yield
+    banned_ips.reset()
+
+
+@pytest.fixture(autouse=True)
+def fresh_throttles():
+    # Buckets live in the per-test Redis database; local lockouts are per process.
+    local_lockouts.clear()
+    yield
+    local_lockouts.clear()
+
+
+@pytest.fixture
+def query_budget(db):
+    # `with query_budget(n):` fails on more than n queries or on one query
+    # shape run twice (N+1), printing where the repeat came from. The ban
+    # list is loaded up front, as in a running worker.
+    banned_ips.load()
+    return QueryBudget
+
+
 @pytest.fixture
 def api_client():
     return APIClient()
@@ -31,6 +110,19 @@ def authenticated_client(api_client, user):
     return api_client
 
 
+@pytest.fixture
+def admin_client(db):
+    User.objects.create_user(
+        username="admin",
+        password="adminpass123",
+        is_staff=True,
+        is_superuser=True,
+    )
+    client = APIClient()
+    client.login(username="admin", password="adminpass123")
+    return client
+
+
 @pytest.fixture
 def profile(db, user):
     return Profile.objects.create(
@@ -117,30 +209,217 @@ class TestAuth:
         assert profile.bio == "Updated bio"
 
 
+@pytest.mark.django_db
+class TestAuthThrottle:
+    @pytest.fixture
+    def hashes(self, monkeypatch):
+        calls = []
+        real = serializers.authenticate
+
+        def counting(*args, **kwargs):
+            calls.append(kwargs.get("username"))
+            return real(*args, **kwargs)
+
+        monkeypatch.setattr(serializers, "authenticate", counting)
+        return calls
+
+    def login(self, client, username, ip):
+        return client.post(
+            reverse("login"), {"username": username, "password": "wrong"}, format="json",
+            HTTP_X_FORWARDED_FOR=ip,
+        )
+
+    def test_username_bucket_rejects_before_hashing(self, api_client, user, settings, hashes):
+        settings.AUTH_THROTTLE_RATES = {**settings.AUTH_THROTTLE_RATES, "login_username": (3, 1)}
+        for i in range(3):
+            assert self.login(api_client, "TestUser", f"10.0.0.{i}").status_code == status.HTTP_400_BAD_REQUEST
+        response = self.login(api_client, "testuser", "10.0.0.9")
+        assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+        assert int(response["Retry-After"]) > 0
+        assert len(hashes) == 3
+        # Other accounts from the same address are unaffected.
+        assert self.login(api_client, "someone", "10.0.0.9").status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_locked_out_ip_skips_redis(self, api_client, admin_client, settings, monkeypatch):
+        settings.AUTH_THROTTLE_RATES = {**settings.AUTH_THROTTLE_RATES, "login_ip": (2, 1)}
+        self.login(api_client, "a", "10.1.1.1")
+        self.login(api_client, "b", "10.1.1.1")
+        assert self.login(api_client, "c", "10.1.1.1").status_code == status.HTTP_429_TOO_MANY_REQUESTS
+
+        def no_redis():
+            raise AssertionError("locked-out IP reached Redis")
+
+        monkeypatch.setattr(throttling, "_redis", no_redis)
+        # Admin login shares the budget.
+        response = APIClient().post(
+            "/api/admin/login/", {"username": "admin", "password": "x"}, format="json",
+            HTTP_X_FORWARDED_FOR="10.1.1.1",
+        )
+        assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+
+    def test_rotating_forwarded_for_shares_ip_bucket(self, api_client, settings):
+        settings.AUTH_THROTTLE_RATES = {**settings.AUTH_THROTTLE_RATES, "login_ip": (2, 1)}
+        # nginx appends the real address; the first entries are the client's.
+        for i in range(2):
+            assert self.login(api_client, f"u{i}", f"198.51.100.{i}, 10.3.3.3").status_code == status.HTTP_400_BAD_REQUEST
+        assert self.login(api_client, "u2", "198.51.100.2, 10.3.3.3").status_code == status.HTTP_429_TOO_MANY_REQUESTS
+        response = api_client.post(
+            reverse("login"), {"username": "u3", "password": "wrong"}, format="json",
+            HTTP_X_FORWARDED_FOR="198.51.100.3", HTTP_X_REAL_IP="10.3.3.3",
+        )
+        assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+
+    def test_register_limited_per_ip(self, api_client, settings):
+        settings.AUTH_THROTTLE_RATES = {**settings.AUTH_THROTTLE_RATES, "register_ip": (1, 1)}
+        data = {"username": "first", "email": "first@example.com", "password": "securepass123"}
+        assert api_client.post(reverse("register"), data, format="json").status_code == status.HTTP_201_CREATED
+        data = {"username": "second", "email": "second@example.com", "password": "securepass123"}
+        assert api_client.post(reverse("register"), data, format="json").status_code == status.HTTP_429_TOO_MANY_REQUESTS
+        assert not User.objects.filter(username="second").exists()
+
+    def test_redis_outage_admits(self, api_client, user, monkeypatch):
+        def broken():
+            raise ConnectionError("redis down")
+
+        monkeypatch.setattr(throttling, "_redis", broken)
+        assert self.login(api_client, "testuser", "10.2.2.2").status_code == status.HTTP_400_BAD_REQUEST
+
+
 @pytest.mark.django_db
 class TestPublicPosts:
     def test_list_published_posts(self, api_client, published_post, draft_post):
         url = reverse("public-posts")
         response = api_client.get(url)
         assert response.status_code == status.HTTP_200_OK
-        assert len(response.data) == 1
-        assert response.data[0]["title"] == "Published Post"
-        assert response.data[0]["published"] is True
+        assert len(response.data["results"]) == 1
+        assert response.data["results"][0]["title"] == "Published Post"
+        assert response.data["results"][0]["published"] is True
 
     def test_draft_posts_not_visible(self, api_client, draft_post):
         url = reverse("public-posts")
         response = api_client.get(url)
         assert response.status_code == status.HTTP_200_OK
-        assert len(response.data) == 0
+        assert len(response.data["results"]) == 0
+
+    def test_keyset_pages_cover_feed_once(self, api_client, user):
+        posts = [
+            Post.objects.create(author=user, title=f"Post {i}", content="x", published=True)
+            for i in range(7)
+        ]
+        # Identical timestamps must still page deterministically by id.
+        Post.objects.filter(pk__in=[p.pk for p in posts[:4]]).update(created_at=posts[0].created_at)
+        seen = []
+        response = api_client.get(reverse("public-posts"), {"page_size": 3})
+        while True:
+            assert response.status_code == status.HTTP_200_OK
+            assert len(response.data["results"]) <= 3
+            seen.extend(p["id"] for p in response.data["results"])
+            if not response.data["next"]:
+                break
+            response = api_client.get(response.data["next"])
+        expected = list(Post.objects.order_by("-created_at", "-id").values_list("id", flat=True))
+        assert seen == expected
+
+    def test_feed_cached_until_post_write(
+        self, authenticated_client, published_post, django_assert_num_queries,
+        django_capture_on_commit_callbacks,
+    ):
+        api_client = APIClient()
+        url = reverse("public-posts")
+        assert len(api_client.get(url).data["results"]) == 1
+        with django_assert_num_queries(1):  # TrafficLog insert only
+            cached = api_client.get(url)
+        assert [p["id"] for p in cached.data["results"]] == [published_post.id]
+        with django_capture_on_commit_callbacks(execute=True):
+            authenticated_client.put(
+                reverse("my-post-detail", kwargs={"pk": published_post.pk}),
+                {"title": "Unpublished", "content": "x", "published": False},
+                format="json",
+            )
+        assert api_client.get(url).data["results"] == []
+
+    def test_feed_cache_ignores_host_and_extra_params(self, api_client, user, settings, django_assert_num_queries):
+        settings.FEED_BASE_URL = "https://blog.example"
+        for i in range(3):
+            Post.objects.create(author=user, title=f"Post {i}", content="x", published=True)
+        url = reverse("public-posts")
+        first = api_client.get(url, {"page_size": 2})
+        assert first.data["next"].startswith("https://blog.example/api/posts/?")
+        assert QueryDict(urlsplit(first.data["next"]).query)["page_size"] == "2"
+        with django_assert_num_queries(1):  # TrafficLog insert only
+            junk = api_client.get(url, {"page_size": "2", "utm": "x"}, HTTP_HOST="attacker.example")
+        assert junk.content == first.content
+        assert junk["ETag"] == first["ETag"]
+        cursor = QueryDict(urlsplit(first.data["next"]).query)["cursor"]
+        assert api_client.get(url, {"cursor": "!!"}).status_code == status.HTTP_404_NOT_FOUND
+        second = api_client.get(url, {"cursor": cursor, "page_size": 2})
+        assert second.data["next"] is None
+
+    def test_list_is_summary_only(self, api_client, user, query_budget):
+        other = User.objects.create_user(username="other", password="pass123")
+        for author in (user, other, user):
+            Post.objects.create(author=author, title="Long", content="word " * 5000, published=True)
+        api_client.get(reverse("public-posts"), {"page_size": 1})  # warm middleware
+        # Post page with authors joined + TrafficLog insert, however many authors.
+        with query_budget(2):
+            response = api_client.get(reverse("public-posts"))
+        row = response.data["results"][0]
+        assert "content" not in row
+        assert row["word_count"] == 5000
+        assert len(row["excerpt"]) <= 200
+        assert row["excerpt"].endswith("…")
+
+    def test_detail_serves_full_content(self, api_client, published_post, draft_post):
+        response = api_client.get(reverse("public-post-detail", kwargs={"pk": published_post.pk}))
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["content"] == published_post.content
+        response = api_client.get(reverse("public-post-detail", kwargs={"pk": draft_post.pk}))
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_invalid_cursor(self, api_client):
+        response = api_client.get(reverse("public-posts"), {"cursor": "garbage"})
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.django_db
+class TestPostSearch:
+    def test_ranked_search_with_highlights(self, api_client, user, draft_post, query_budget):
+        body = Post.objects.create(
+            author=user, title="Notes", content="We adopt kittens & cats.", published=True
+        )
+        title = Post.objects.create(
+            author=user, title="Kittens everywhere", content="Nothing else here.", published=True
+        )
+        Post.objects.create(author=user, title="Kittens draft", content="kittens", published=False)
+        with query_budget(2):
+            response = api_client.get(reverse("post-search"), {"q": "kitten"})
+        assert response.status_code == status.HTTP_200_OK
+        results = response.data["results"]
+        assert [r["id"] for r in results] == [title.id, body.id]
+        assert "<mark>kittens</mark>" in results[1]["snippet"]
+        assert "&amp; cats" in results[1]["snippet"]
+        assert "content" not in results[0]
+
+    def test_search_index_follows_edits(self, api_client, published_post):
+        published_post.content = "Now about zeppelins."
+        published_post.save()
+        response = api_client.get(reverse("post-search"), {"q": "zeppelin"})
+        assert [r["id"] for r in response.data["results"]] == [published_post.id]
+
+    def test_query_required(self, api_client):
+        response = api_client.get(reverse("post-search"))
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
 
 
 @pytest.mark.django_db
 class TestUserPosts:
-    def test_list_own_posts(self, authenticated_client, user, published_post, draft_post):
+    def test_list_own_posts(self, authenticated_client, user, published_post, draft_post, query_budget):
         url = reverse("my-posts")
-        response = authenticated_client.get(url)
+        with query_budget(4):
+            response = authenticated_client.get(url)
         assert response.status_code == status.HTTP_200_OK
-        assert len(response.data) == 2
+        assert len(response.data["results"]) == 2
+        assert response.data["next"] is None
 
     def test_create_post(self, authenticated_client, user):
         url = reverse("my-posts")
@@ -165,6 +444,8 @@ class TestUserPosts:
         published_post.refresh_from_db()
         assert published_post.title == "Updated Title"
         assert published_post.published is False
+        assert published_post.excerpt == "Updated content"
+        assert published_post.word_count == 2
 
     def test_cannot_update_other_user_post(self, authenticated_client, user):
         other_user = User.objects.create_user(
@@ -180,3 +461,1159 @@ class TestUserPosts:
         url = reverse("my-post-detail", kwargs={"pk": other_post.pk})
         response = authenticated_client.get(url)
         assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.django_db
+class TestConditionalRequests:
+    def test_public_feed_not_modified_without_queries(self, published_post, django_assert_num_queries, django_capture_on_commit_callbacks):
+        client = APIClient()
+        response = client.get("/api/posts/")
+        etag = response["ETag"]
+        assert response["Cache-Control"] == "no-cache"
+        assert response.has_header("Last-Modified")
+        with django_assert_num_queries(1):  # TrafficLog insert only
+            response = client.get("/api/posts/", HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert response["ETag"] == etag
+        # Another page is another representation.
+        assert client.get("/api/posts/?page_size=1", HTTP_IF_NONE_MATCH=etag).status_code == status.HTTP_200_OK
+
+        with django_capture_on_commit_callbacks(execute=True):
+            Post.objects.create(author=published_post.author, title="New", content="x", published=True)
+        response = client.get("/api/posts/", HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.data["results"]) == 2
+
+    def test_own_list_not_modified(self, authenticated_client, published_post):
+        url = reverse("my-posts")
+        etag = authenticated_client.get(url)["ETag"]
+        response = authenticated_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert response["Cache-Control"] == "private, no-cache"
+        published_post.title = "Edited"
+        published_post.save()
+        assert authenticated_client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == status.HTTP_200_OK
+
+    def test_detail_not_modified_skips_full_read(self, authenticated_client, published_post, django_assert_num_queries):
+        url = reverse("my-post-detail", kwargs={"pk": published_post.pk})
+        response = authenticated_client.get(url)
+        etag, modified = response["ETag"], response["Last-Modified"]
+        # User, the updated_at lookup and the TrafficLog insert; no post row.
+        with django_assert_num_queries(3):
+            response = authenticated_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert authenticated_client.get(url, HTTP_IF_MODIFIED_SINCE=modified).status_code == status.HTTP_304_NOT_MODIFIED
+
+    def test_if_match_on_update(self, authenticated_client, published_post):
+        url = reverse("my-post-detail", kwargs={"pk": published_post.pk})
+        etag = authenticated_client.get(url)["ETag"]
+        data = {"title": "First edit", "content": "c", "published": True}
+        response = authenticated_client.put(url, data, format="json", HTTP_IF_MATCH=etag)
+        assert response.status_code == status.HTTP_200_OK
+        assert response["ETag"] != etag
+        # A second client still holding the old ETag loses.
+        data["title"] = "Stale edit"
+        response = authenticated_client.put(url, data, format="json", HTTP_IF_MATCH=etag)
+        assert response.status_code == status.HTTP_412_PRECONDITION_FAILED
+        published_post.refresh_from_db()
+        assert published_post.title == "First edit"
+
+
+@pytest.mark.django_db
+class TestAdminLists:
+    def test_users_list(self, admin_client, query_budget):
+        for i in range(3):
+            user = User.objects.create_user(username=f"member{i}", password="pass123")
+            Profile.objects.create(user=user)
+        with query_budget(3):
+            response = admin_client.get("/api/admin/users/")
+        assert response.status_code == status.HTTP_200_OK
+        assert {"member0", "member1", "member2"} <= {u["username"] for u in response.data["results"]}
+
+    def test_users_pages_and_filters(self, admin_client):
+        joined = timezone.now() - datetime.timedelta(days=10)
+        for i in range(7):
+            User.objects.create_user(
+                username=f"reader{i}", email=f"r{i}@example.org", password="pass123", is_active=i % 2 == 0,
+            )
+        User.objects.filter(username__in=["reader0", "reader1"]).update(date_joined=joined)
+        names, response = [], admin_client.get("/api/admin/users/", {"limit": 3})
+        while True:
+            names += [u["username"] for u in response.data["results"]]
+            if not response.data["next"]:
+                break
+            response = admin_client.get(response.data["next"])
+        assert names == [f"reader{i}" for i in (6, 5, 4, 3, 2, 1, 0)]
+
+        def usernames(**params):
+            response = admin_client.get("/api/admin/users/", params)
+            assert response.status_code == status.HTTP_200_OK
+            return {u["username"] for u in response.data["results"]}
+
+        assert usernames(q="ADER3") == {"reader3"}
+        assert usernames(q="r5@example") == {"reader5"}
+        assert usernames(q="ader", match="prefix") == set()
+        assert usernames(q="re", is_active="false") == {"reader1", "reader3", "reader5"}
+        assert usernames(end=(joined + datetime.timedelta(days=1)).isoformat()) == {"reader0", "reader1"}
+        assert admin_client.get("/api/admin/users/", {"is_active": "maybe"}).status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_users_list_uses_indexes(self, admin_client):
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_seqscan = off")
+            cursor.execute("SELECT indexname FROM pg_indexes WHERE tablename = 'auth_user'")
+            indexes = {name for (name,) in cursor.fetchall()}
+        users = User.objects.filter(is_superuser=False).order_by("-date_joined", "-id")
+        assert "user_joined_idx" in users[:50].explain()
+        if "user_username_trgm_idx" not in indexes:
+            pytest.skip("pg_trgm is not available on this server")
+        plan = users.filter(Q(username__icontains="reader") | Q(email__icontains="reader")).explain()
+        assert "user_username_trgm_idx" in plan and "user_email_trgm_idx" in plan
+
+    def test_traffic_list(self, admin_client, query_budget):
+        for i in range(3):
+            TrafficLog.objects.create(path=f"/api/posts/{i}/", method="GET", status_code=200, user_agent="x" * 200)
+        with query_budget(3):
+            response = admin_client.get("/api/admin/traffic/")
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.data) == 3
+
+    def test_banned_ips_list(self, admin_client, query_budget):
+        for ip in ("192.0.2.1", "192.0.2.2", "198.51.100.0/24"):
+            BannedIP.objects.create(ip_address=ip)
+        with query_budget(4):
+            response = admin_client.get("/api/admin/banned-ips/")
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.data) == 3
+
+
+@pytest.mark.django_db
+class TestTrafficLogBuffer:
+    def test_api_request_is_logged(self, api_client):
+        api_client.get(reverse("public-posts"))
+        log = TrafficLog.objects.get()
+        assert log.path == "/api/posts/"
+        assert log.status_code == 200
+        assert log.ip_address == "127.0.0.1"
+
+    def test_flush_writes_batches(self):
+        writer = BufferedLogWriter("blog.TrafficLog", batch_size=2, background=False)
+        for i in range(5):
+            assert writer.enqueue(path=f"/api/{i}/", method="GET", status_code=200)
+        assert writer.depth() == 5
+        writer.flush()
+        assert TrafficLog.objects.count() == 5
+        assert writer.stats() == {"queued": 0, "dropped": 0, "written": 5}
+
+    def test_full_queue_drops_and_counts(self):
+        writer = BufferedLogWriter("blog.TrafficLog", max_queue=2, background=False)
+        results = [writer.enqueue(path="/api/posts/", method="GET") for _ in range(3)]
+        assert results == [True, True, False]
+        assert writer.dropped == 1
+        writer.flush()
+        assert TrafficLog.objects.count() == 2
+
+
+class TestPrefixMatcher:
+    def test_hosts_and_ranges(self):
+        matcher = PrefixMatcher(["203.0.113.7", "10.0.0.0/8", "2001:db8::/32"])
+        assert "203.0.113.7" in matcher
+        assert "203.0.113.8" not in matcher
+        assert "10.255.0.1" in matcher
+        assert "11.0.0.1" not in matcher
+        assert "2001:db8::1" in matcher
+        assert "::ffff:10.1.2.3" in matcher
+        assert "not-an-ip" not in matcher
+        assert len(matcher) == 3
+
+
+@pytest.mark.django_db
+class TestBannedIPs:
+    def test_ban_cidr_blocks_range_without_queries(self, admin_client, api_client, django_assert_num_queries):
+        response = admin_client.post(
+            "/api/admin/banned-ips/", {"ip_address": "198.51.100.9/24"}, format="json"
+        )
+        assert response.status_code == status.HTTP_201_CREATED
+        assert response.data["ip_address"] == "198.51.100.0/24"
+        response = api_client.get(reverse("public-posts"), HTTP_X_FORWARDED_FOR="198.51.101.1")
+        assert response.status_code == status.HTTP_200_OK
+        with django_assert_num_queries(0):
+            response = api_client.get(reverse("public-posts"), HTTP_X_FORWARDED_FOR="198.51.100.77")
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    def test_unban_lifts_block(self, admin_client, api_client):
+        admin_client.post("/api/admin/banned-ips/", {"ip_address": "192.0.2.1"}, format="json")
+        ban = BannedIP.objects.get(ip_address="192.0.2.1")
+        assert api_client.get(reverse("public-posts"), HTTP_X_FORWARDED_FOR="192.0.2.1").status_code == 403
+        response = admin_client.delete(f"/api/admin/banned-ips/{ban.id}/")
+        assert response.status_code == status.HTTP_204_NO_CONTENT
+        assert api_client.get(reverse("public-posts"), HTTP_X_FORWARDED_FOR="192.0.2.1").status_code == 200
+
+    def test_spoofed_forwarded_for_still_blocked(self, api_client):
+        BannedIP.objects.create(ip_address="203.0.113.0/24")
+        response = api_client.get(
+            reverse("public-posts"), HTTP_X_REAL_IP="203.0.113.5", HTTP_X_FORWARDED_FOR="1.2.3.4, 203.0.113.5"
+        )
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+        assert api_client.get(
+            reverse("public-posts"), HTTP_X_REAL_IP="203.0.113.5", HTTP_X_FORWARDED_FOR="1.2.3.4"
+        ).status_code == status.HTTP_403_FORBIDDEN
+
+    def test_logs_record_the_proxy_address(self, api_client):
+        headers = {"HTTP_X_REAL_IP": "198.51.100.5", "HTTP_X_FORWARDED_FOR": "1.2.3.4, 198.51.100.5"}
+        api_client.get(reverse("public-posts"), **headers)
+        api_client.get("/api/auth/me/", **headers)
+        assert set(TrafficLog.objects.values_list("ip_address", flat=True)) == {"198.51.100.5"}
+        attacks.flush()
+        assert UnauthorizedAttempt.objects.get().ip_address == "198.51.100.5"
+
+    def test_invalid_address_rejected(self, admin_client):
+        response = admin_client.post("/api/admin/banned-ips/", {"ip_address": "nope"}, format="json")
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert not BannedIP.objects.exists()
+
+
+@pytest.mark.django_db
+class TestBulkAdmin:
+    def test_bulk_ban_users(self, admin_client, user, query_budget):
+        others = [User.objects.create_user(username=f"spammer{i}", password="pass123") for i in range(3)]
+        admin = User.objects.get(username="admin")
+        ids = [user.id, *(u.id for u in others), user.id, 999999, "x", admin.id]
+        with query_budget(8):
+            response = admin_client.post("/api/admin/users/bulk/", {"action": "ban", "ids": ids}, format="json")
+        assert response.status_code == status.HTTP_200_OK
+        assert [r["status"] for r in response.data["results"]] == [
+            "banned", "banned", "banned", "banned", "duplicate", "not_found", "invalid", "superuser",
+        ]
+        assert response.data["counts"]["banned"] == 4
+        assert not User.objects.filter(is_superuser=False, is_active=True).exists()
+        log = AuditLog.objects.get(action="admin_user_bulk_ban")
+        assert log.details["count"] == 4
+        response = admin_client.post("/api/admin/users/bulk/", {"action": "unban", "ids": [user.id]}, format="json")
+        assert response.data["results"] == [{"id": user.id, "status": "unbanned"}]
+
+    def test_bulk_delete_from_csv(self, admin_client, user, published_post):
+        other = User.objects.create_user(username="other", password="pass123")
+        upload = SimpleUploadedFile("users.csv", f"id\n{user.id}\n{other.id}\n".encode(), content_type="text/csv")
+        response = admin_client.post("/api/admin/users/bulk/", {"action": "delete", "file": upload}, format="multipart")
+        assert response.data["counts"] == {"deleted": 2}
+        assert not User.objects.filter(pk__in=[user.id, other.id]).exists()
+        assert not Post.objects.exists()
+        assert AuditLog.objects.filter(action="admin_user_bulk_delete").count() == 1
+
+    def test_bulk_ban_ips(self, admin_client, api_client, query_budget):
+        BannedIP.objects.create(ip_address="192.0.2.1")
+        entries = ["192.0.2.1", "203.0.113.9/24", "198.51.100.7", "nope", "198.51.100.7"]
+        with query_budget(8):
+            response = admin_client.post(
+                "/api/admin/banned-ips/bulk/", {"ip_addresses": entries, "reason": "scan"}, format="json"
+            )
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["results"] == [
+            {"ip_address": "192.0.2.1", "status": "already_banned"},
+            {"ip_address": "203.0.113.0/24", "status": "banned"},
+            {"ip_address": "198.51.100.7", "status": "banned"},
+            {"ip_address": "nope", "status": "invalid"},
+            {"ip_address": "198.51.100.7", "status": "duplicate"},
+        ]
+        assert BannedIP.objects.get(ip_address="203.0.113.0/24").reason == "scan"
+        assert AuditLog.objects.get(action="admin_ip_bulk_ban").details["ip_addresses"] == ["203.0.113.0/24", "198.51.100.7"]
+        assert api_client.get(reverse("public-posts"), HTTP_X_FORWARDED_FOR="203.0.113.50").status_code == 403
+
+        response = admin_client.post(
+            "/api/admin/banned-ips/bulk/", {"action": "unban", "ip_addresses": ["203.0.113.0/24", "10.0.0.1"]}, format="json"
+        )
+        assert response.data["counts"] == {"unbanned": 1, "not_banned": 1}
+        assert api_client.get(reverse("public-posts"), HTTP_X_FORWARDED_FOR="203.0.113.50").status_code == 200
+
+    def test_bulk_ban_ips_from_csv(self, admin_client):
+        csv_file = SimpleUploadedFile("ips.csv", b"ip_address,reason\n10.1.0.0/16,botnet\n10.2.0.1,\n", content_type="text/csv")
+        response = admin_client.post(
+            "/api/admin/banned-ips/bulk/", {"file": csv_file, "reason": "default"}, format="multipart"
+        )
+        assert response.data["counts"] == {"banned": 2}
+        assert dict(BannedIP.objects.values_list("ip_address", "reason")) == {"10.1.0.0/16": "botnet", "10.2.0.1": "default"}
+
+    def test_rejects_bad_requests(self, admin_client, authenticated_client, settings):
+        settings.ADMIN_BULK_MAX_ITEMS = 2
+        url = "/api/admin/banned-ips/bulk/"
+        assert authenticated_client.post(url, {"ip_addresses": ["10.0.0.1"]}, format="json").status_code == 403
+        assert admin_client.post(url, {"ip_addresses": ["10.0.0.1"] * 3}, format="json").status_code == 400
+        assert admin_client.post(url, {"ip_addresses": "10.0.0.1"}, format="json").status_code == 400
+        assert admin_client.post(url, {"ip_addresses": []}, format="json").status_code == 400
+        response = admin_client.post("/api/admin/users/bulk/", {"action": "purge", "ids": [1]}, format="json")
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert not AuditLog.objects.filter(action__contains="bulk").exists()
+
+
+@pytest.mark.django_db
+class TestLogPartitions:
+    NOW = datetime.datetime(2026, 3, 11, 15, 30, tzinfo=datetime.timezone.utc)  # a Wednesday
+
+    @pytest.fixture(autouse=True)
+    def partition_settings(self, settings):
+        settings.LOG_PARTITIONS = {
+            "blog.TrafficLog": {"interval": "day", "retention_days": 30, "premake": 2, "archive": False},
+            "blog.AuditLog": {"interval": "week", "retention_days": 28, "premake": 1, "archive": True},
+        }
+
+    def partition_of(self, model, pk):
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT tableoid::regclass::text FROM {model._meta.db_table} WHERE id = %s", [pk])
+            return cursor.fetchone()[0]
+
+    def test_creates_ranges_and_moves_default_rows(self):
+        recent = TrafficLog.objects.create(path="/api/", method="GET", created_at=self.NOW)
+        expired = TrafficLog.objects.create(
+            path="/api/", method="GET", created_at=self.NOW - datetime.timedelta(days=90)
+        )
+        assert self.partition_of(TrafficLog, recent.pk) == "blog_trafficlog_default"
+
+        report = partitions.maintain(now=self.NOW)
+
+        names = [p.name for p in partitions.list_partitions("blog_trafficlog")]
+        assert names[0] == "blog_trafficlog_p20260209"
+        assert names[-1] == "blog_trafficlog_p20260314"
+        assert self.partition_of(TrafficLog, recent.pk) == "blog_trafficlog_p20260311"
+        assert not TrafficLog.objects.filter(pk=expired.pk).exists()
+        assert report["blog_trafficlog"]["stray_deleted"] == 1
+        weekly = partitions.list_partitions("blog_auditlog")
+        assert weekly[0].start.weekday() == 0
+        assert weekly[-1].end - weekly[-1].start == datetime.timedelta(days=7)
+        # Idempotent.
+        assert partitions.maintain(now=self.NOW)["blog_trafficlog"]["created"] == []
+
+    def test_expired_partitions_detached(self):
+        partitions.maintain(now=self.NOW)
+        log = AuditLog.objects.create(action="login")
+        AuditLog.objects.filter(pk=log.pk).update(created_at=self.NOW)  # auto_now_add
+        later = self.NOW + datetime.timedelta(days=60)
+        report = partitions.maintain(now=later)
+
+        assert "blog_trafficlog_p20260311" in [p.name for p in report["blog_trafficlog"]["expired"]]
+        assert "blog_trafficlog_p20260311" not in [p.name for p in partitions.list_partitions("blog_trafficlog")]
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT to_regclass('blog_trafficlog_p20260311'), to_regclass('blog_auditlog_p20260309')")
+            dropped, archived = cursor.fetchone()
+        assert dropped is None
+        # Audit partitions are archived: detached but kept with their rows.
+        assert archived is not None
+        assert not AuditLog.objects.exists()
+
+    def test_archived_default_rows_survive(self):
+        # Legacy rows copied into DEFAULT by 0008, older than the retention window.
+        log = AuditLog.objects.create(action="login")
+        AuditLog.objects.filter(pk=log.pk).update(created_at=self.NOW - datetime.timedelta(days=400))
+
+        report = partitions.maintain(now=self.NOW)
+
+        assert report["blog_auditlog"]["stray_archived"] == 1
+        assert report["blog_auditlog"]["stray_deleted"] == 0
+        assert not AuditLog.objects.exists()
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT id, action FROM blog_auditlog_archive")
+            assert cursor.fetchall() == [(log.pk, "login")]
+        # Later runs append to the same archive table.
+        assert partitions.maintain(now=self.NOW)["blog_auditlog"]["stray_archived"] == 0
+
+
+@pytest.mark.django_db
+class TestAdminAuditLogs:
+    def make_logs(self, n, user=None, action="login", ip="10.0.0.1"):
+        return [
+            AuditLog.objects.create(user=user, ip_address=ip, path="/api/auth/login/", method="POST", action=action)
+            for _ in range(n)
+        ]
+
+    def test_one_query_regardless_of_page_size(self, admin_client, user, query_budget):
+        self.make_logs(3, user=user)
+        # User, page with usernames joined, TrafficLog insert.
+        with query_budget(3) as small:
+            admin_client.get("/api/admin/audit/")
+        self.make_logs(6, user=user)
+        with query_budget(len(small)) as large:
+            response = admin_client.get("/api/admin/audit/")
+        assert len(response.data["results"]) == 9
+        assert response.data["results"][0]["username"] == "testuser"
+        assert len(large) == len(small)
+
+    def test_filters_and_cursor_paging(self, admin_client, user):
+        self.make_logs(5, user=user)
+        self.make_logs(2, action="logout", ip="10.0.0.2")
+        response = admin_client.get("/api/admin/audit/", {"user": "testuser", "limit": 2})
+        ids = [row["id"] for row in response.data["results"]]
+        while response.data["next"]:
+            response = admin_client.get(response.data["next"])
+            ids += [row["id"] for row in response.data["results"]]
+        assert len(ids) == len(set(ids)) == 5
+        assert ids == sorted(ids, reverse=True)
+
+        response = admin_client.get("/api/admin/audit/", {"action": "logout", "ip": "10.0.0.2"})
+        assert len(response.data["results"]) == 2
+        future = (timezone.now() + datetime.timedelta(minutes=1)).isoformat()
+        assert admin_client.get("/api/admin/audit/", {"start": future}).data["results"] == []
+
+    def test_invalid_filters(self, admin_client):
+        assert admin_client.get("/api/admin/audit/", {"ip": "nope"}).status_code == status.HTTP_400_BAD_REQUEST
+        assert admin_client.get("/api/admin/attacks/", {"start": "yesterday"}).status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_non_ascii_digit_user_is_a_username(self, admin_client, user):
+        self.make_logs(1, user=user)
+        for url in ("/api/admin/audit/", "/api/admin/audit/export/"):
+            response = admin_client.get(url, {"user": "\u00b2"})
+            assert response.status_code == status.HTTP_200_OK
+        assert admin_client.get("/api/admin/audit/", {"user": str(user.pk)}).data["results"]
+
+
+@pytest.mark.django_db
+class TestAttackLog:
+    def test_scan_coalesces_into_one_row(self, api_client, query_budget):
+        # Only the per-request TrafficLog inserts; no per-hit attempt writes.
+        with query_budget(50, max_repeats=50) as queries:
+            for i in range(50):
+                api_client.get("/api/admin/users/", HTTP_X_FORWARDED_FOR="10.0.0.9", HTTP_USER_AGENT=f"scanner/{i % 7}")
+        assert all("blog_trafficlog" in sql for sql, _ in queries.queries)
+        assert attacks.flush() == 1
+        row = UnauthorizedAttempt.objects.get()
+        assert (row.ip_address, row.method, row.path, row.hits) == ("10.0.0.9", "GET", "/api/admin/users/", 50)
+        assert row.first_seen <= row.last_seen
+        assert len(row.user_agents) == attacks.MAX_USER_AGENTS
+        assert not AuditLog.objects.exists()
+
+    def test_window_extends_or_starts_rows(self, settings):
+        settings.ATTACK_LOG_WINDOW = 600
+        attacks.record_attempt("10.0.0.1", "GET", "/api/admin/users/")
+        attacks.flush()
+        attacks.record_attempt("10.0.0.1", "GET", "/api/admin/users/")
+        attacks.record_attempt("10.0.0.1", "POST", "/api/admin/users/")
+        attacks.flush()
+        assert UnauthorizedAttempt.objects.get(method="GET").hits == 2
+        assert UnauthorizedAttempt.objects.get(method="POST").hits == 1
+        UnauthorizedAttempt.objects.update(last_seen=timezone.now() - datetime.timedelta(seconds=601))
+        attacks.record_attempt("10.0.0.1", "GET", "/api/admin/users/")
+        attacks.flush()
+        assert list(UnauthorizedAttempt.objects.filter(method="GET").values_list("hits", flat=True)) == [1, 2]
+
+    def test_unbuffered_log_flushes_counters(self, api_client, settings):
+        settings.ATTACK_LOG_FLUSH_INTERVAL = 0
+        api_client.get("/api/admin/users/", HTTP_X_FORWARDED_FOR="10.0.0.7")
+        api_client.get("/api/admin/users/", HTTP_X_FORWARDED_FOR="10.0.0.7")
+        # The second request's traffic row ran the flush hook.
+        assert UnauthorizedAttempt.objects.get(ip_address="10.0.0.7").hits == 2
+
+    def test_flush_command(self):
+        attacks.record_attempt("10.0.0.6", "GET", "/api/admin/users/")
+        out = io.StringIO()
+        call_command("flush_attack_log", stdout=out)
+        assert "flushed 1 counter(s)" in out.getvalue()
+        assert UnauthorizedAttempt.objects.get(ip_address="10.0.0.6").hits == 1
+
+    def test_flush_keeps_another_runs_lock(self, monkeypatch):
+        attacks.record_attempt("10.0.0.6", "GET", "/api/admin/users/")
+        merge = attacks._merge
+
+        def slow(entries):
+            # Our lock expired and another run took it over.
+            attacks._redis().set(attacks.LOCK_KEY, "another-run", ex=60)
+            merge(entries)
+
+        monkeypatch.setattr(attacks, "_merge", slow)
+        assert attacks.flush() == 1
+        assert attacks._redis().get(attacks.LOCK_KEY) == b"another-run"
+        attacks._redis().delete(attacks.LOCK_KEY)
+
+    def test_redis_outage_writes_directly(self, monkeypatch):
+        def broken():
+            raise ConnectionError("redis down")
+
+        monkeypatch.setattr(attacks, "_redis", broken)
+        for _ in range(3):
+            assert attacks.record_attempt(None, "GET", "/api/auth/me/", "curl") == 1
+        row = UnauthorizedAttempt.objects.get()
+        assert (row.ip_address, row.hits, row.user_agents) == (None, 3, ["curl"])
+
+    def test_admin_view_reads_aggregates(self, admin_client, query_budget):
+        APIClient().get("/api/auth/me/", HTTP_X_FORWARDED_FOR="10.0.0.9")
+        APIClient().get("/api/auth/me/", HTTP_X_FORWARDED_FOR="10.0.0.9")
+        APIClient().get("/api/admin/users/", HTTP_X_FORWARDED_FOR="10.0.0.8")
+        # User, flush of the pending counters (4), page, TrafficLog insert.
+        with query_budget(7):
+            response = admin_client.get("/api/admin/attacks/")
+        assert len(response.data["results"]) == 2
+        response = admin_client.get("/api/admin/attacks/", {"ip": "10.0.0.9"})
+        assert [(r["path"], r["hits"]) for r in response.data["results"]] == [("/api/auth/me/", 2)]
+        assert response.data["next"] is None
+        response = admin_client.get("/api/admin/attacks/", {"limit": 1})
+        assert len(response.data["results"]) == 1
+        assert len(admin_client.get(response.data["next"]).data["results"]) == 1
+
+
+class TestConnectionPool:
+    def connect(self):
+        return connection.Database.connect(**connection.get_connection_params())
+
+    def test_reuses_connections(self, db):
+        pool = ConnectionPool(max_size=2)
+        first = pool.getconn(self.connect)
+        pool.putconn(first)
+        assert pool.getconn(self.connect) is first
+        assert pool.stats() | {"wait_seconds": 0} == {
+            "max_size": 2, "size": 1, "idle": 0, "in_use": 1, "wait_seconds": 0, "checkouts": 2,
+            "waits": 0, "timeouts": 0, "created": 1, "discarded": 0, "health_check_failures": 0,
+        }
+        pool.putconn(first, discard=True)
+        assert first.closed
+
+    def test_times_out_when_exhausted(self, db):
+        pool = ConnectionPool(max_size=1, timeout=0.05)
+        conn = pool.getconn(self.connect)
+        with pytest.raises(PoolTimeout):
+            pool.getconn(self.connect)
+        assert pool.stats()["timeouts"] == 1
+        pool.putconn(conn, discard=True)
+
+    def test_replaces_dead_connections(self, db):
+        pool = ConnectionPool(max_size=3, check_idle=0)
+        conns = [pool.getconn(self.connect) for _ in range(2)]
+        for conn in conns:
+            pool.putconn(conn)
+        # What a proxy or server restart looks like from the pool's side.
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT pg_terminate_backend(pid) FROM unnest(%s) AS pid", [[c.info.backend_pid for c in conns]])
+        fresh = pool.getconn(self.connect)
+        assert fresh not in conns
+        with fresh.cursor() as cursor:
+            cursor.execute("SELECT 1")
+        stats = pool.stats()
+        assert (stats["health_check_failures"], stats["idle"], stats["created"]) == (1, 0, 3)
+        pool.putconn(fresh, discard=True)
+
+    def test_admin_system_stats(self, admin_client):
+        response = admin_client.get("/api/admin/system/")
+        assert response.status_code == status.HTTP_200_OK
+        assert "blog.TrafficLog" in response.data["log_writers"]
+        assert "db_pools" in response.data
+
+
+@pytest.mark.django_db
+class TestAsgi:
+    """The ASGI stack: coroutine views and async middleware paths."""
+
+    def get(self, path, user=None, **extra):
+        async def run():
+            client = AsyncClient()
+            if user is not None:
+                await client.aforce_login(user)
+            return await client.get(path, **extra)
+        return async_to_sync(run)()
+
+    def test_public_feed(self, published_post, draft_post):
+        response = self.get("/api/posts/")
+        assert response.status_code == status.HTTP_200_OK
+        assert [p["title"] for p in response.json()["results"]] == [published_post.title]
+        assert response["X-Content-Type-Options"] == "nosniff"
+        assert TrafficLog.objects.filter(path="/api/posts/", status_code=200).exists()
+
+    def test_me(self, user, profile):
+        response = self.get("/api/auth/me/", user=user)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["user"]["username"] == user.username
+
+    def test_anonymous_me_logs_attempt(self, db):
+        response = self.get("/api/auth/me/")
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+        attacks.flush()
+        assert UnauthorizedAttempt.objects.filter(path="/api/auth/me/", hits=1).exists()
+
+    def test_banned_ip_blocked(self, db):
+        BannedIP.objects.create(ip_address="10.9.0.0/16")
+        banned_ips.load()
+        assert self.get("/api/posts/", headers={"X-Forwarded-For": "10.9.8.7"}).status_code == status.HTTP_403_FORBIDDEN
+
+    def test_admin_list_and_write_fallback(self, admin_client):
+        admin = User.objects.get(username="admin")
+        response = self.get("/api/admin/banned-ips/", user=admin)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == []
+        response = admin_client.post("/api/admin/banned-ips/", {"ip_address": "10.1.2.3"}, format="json")
+        assert response.status_code == status.HTTP_201_CREATED
+        assert admin_client.delete("/api/admin/banned-ips/").status_code == status.HTTP_405_METHOD_NOT_ALLOWED
+
+
+@pytest.mark.django_db
+class TestTrafficRollups:
+    START = datetime.datetime(2026, 3, 11, 15, 0, tzinfo=datetime.timezone.utc)
+
+    def entry(self, minute, path="/api/posts/", status_code=200, ip="10.0.0.1"):
+        return {
+            "ip_address": ip,
+            "path": path,
+            "method": "GET",
+            "status_code": status_code,
+            "created_at": self.START + datetime.timedelta(minutes=minute, seconds=30),
+        }
+
+    def stats(self, admin_client, **params):
+        params = {"start": self.START.isoformat(), "end": (self.START + datetime.timedelta(hours=1)).isoformat(), **params}
+        response = admin_client.get("/api/admin/traffic/stats/", params)
+        assert response.status_code == status.HTTP_200_OK
+        return response.data
+
+    def test_stats_from_redis_then_rollups(self, admin_client, query_budget):
+        rollups.record_traffic([
+            self.entry(0),
+            self.entry(0, path="/api/auth/me/", status_code=401, ip="10.0.0.2"),
+            self.entry(1),
+        ])
+        before = self.stats(admin_client)
+        assert before["total"] == 3
+        assert [s["count"] for s in before["series"]] == [2, 1]
+        assert before["by_status"] == {"2xx": 2, "4xx": 1}
+        assert before["top_paths"][0] == {"path": "/api/posts/", "count": 2}
+
+        assert rollups.compact(now=self.START + datetime.timedelta(minutes=10)) == 2
+        assert TrafficRollup.objects.filter(dimension="total").count() == 2
+        cache.delete_pattern("stats:traffic:*")
+        with query_budget(6, max_repeats=4):
+            assert self.stats(admin_client) == before
+
+        # A late row for a compacted minute is added, not overwritten.
+        rollups.record_traffic([self.entry(1)])
+        rollups.compact(now=self.START + datetime.timedelta(minutes=10))
+        after = self.stats(admin_client, interval="hour")
+        assert after["total"] == 4
+        assert after["series"] == [{"period": self.START.isoformat(), "count": 4}]
+        assert after["top_ips"][0] == {"ip_address": "10.0.0.1", "count": 3}
+
+    def test_failed_compaction_is_not_overwritten(self, monkeypatch):
+        rollups.record_traffic([self.entry(0), self.entry(0)])
+
+        def broken(minute, fields):
+            raise RuntimeError("db down")
+
+        monkeypatch.setattr(rollups, "_upsert", broken)
+        with pytest.raises(RuntimeError):
+            rollups.compact(now=self.START + datetime.timedelta(minutes=10))
+        rollups.record_traffic([self.entry(0)])
+        monkeypatch.undo()
+
+        assert rollups.compact(now=self.START + datetime.timedelta(minutes=10)) == 1
+        assert rollups.compact(now=self.START + datetime.timedelta(minutes=10)) == 1
+        assert TrafficRollup.objects.get(dimension="total").count == 3
+
+    def test_compaction_keeps_another_runs_lock(self, monkeypatch):
+        rollups.record_traffic([self.entry(0)])
+        upsert = rollups._upsert
+
+        def slow(minute, fields):
+            # Our lock expired and another run took it over.
+            rollups._redis().set(rollups.LOCK_KEY, "another-run", ex=60)
+            upsert(minute, fields)
+
+        monkeypatch.setattr(rollups, "_upsert", slow)
+        assert rollups.compact(now=self.START + datetime.timedelta(minutes=10)) == 1
+        assert rollups._redis().get(rollups.LOCK_KEY) == b"another-run"
+        rollups._redis().delete(rollups.LOCK_KEY)
+
+    def test_rejects_bad_top(self, admin_client):
+        for top in ("abc", "-5", "0", "1.5"):
+            response = admin_client.get("/api/admin/traffic/stats/", {"top": top})
+            assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert self.stats(admin_client, top=1000)["top_paths"] == []
+
+    def test_recent_minutes_not_compacted(self):
+        rollups.record_traffic([self.entry(5)])
+        assert rollups.compact(now=self.START + datetime.timedelta(minutes=6)) == 0
+        assert not TrafficRollup.objects.exists()
+
+    def test_requires_staff(self, authenticated_client):
+        response = authenticated_client.get("/api/admin/traffic/stats/")
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+@pytest.mark.django_db
+class TestFastJson:
+    def test_renderer_matches_drf(self):
+        data = {"when": datetime.datetime(2024, 5, 1, 12, 30, 0, 250, tzinfo=datetime.timezone.utc), "s": "\u2028"}
+        assert ORJSONRenderer().render(data) == JSONRenderer().render(data)
+
+    def test_feed_rows_match_serializer(self, api_client, published_post):
+        response = api_client.get(reverse("public-posts"))
+        expected = PostSummarySerializer(Post.objects.filter(pk=published_post.pk), many=True).data
+        assert response.json()["results"] == json.loads(JSONRenderer().render(expected))
+        assert response.json()["results"][0]["created_at"].endswith("Z")
+
+    def test_malformed_json_is_400(self, api_client):
+        response = api_client.post(reverse("login"), "{nope", content_type="application/json")
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert "JSON parse error" in response.json()["detail"]
+
+
+class TestServerTiming:
+    @pytest.fixture
+    def timed_client(self, settings):
+        settings.MIDDLEWARE = timing_chain.instrument_middleware(settings.MIDDLEWARE)
+        settings.SERVER_TIMING_SAMPLE_RATE = 1.0
+        return APIClient()
+
+    def metrics(self, response):
+        return {part.split(";")[0]: part for part in response["Server-Timing"].split(", ")}
+
+    def test_reports_middleware_view_db_and_total(self, timed_client, published_post):
+        response = timed_client.get(reverse("public-posts"))
+        assert response.status_code == status.HTTP_200_OK
+        metrics = self.metrics(response)
+        assert {"SessionMiddleware", "TrafficLoggingMiddleware", "view", "render", "db", "redis"} <= set(metrics)
+        assert list(metrics)[-1] == "total"
+        assert 'desc="' in metrics["db"]
+
+    def test_chain_behaves_the_same(self, timed_client, user):
+        assert timed_client.get("/api/admin/users/").status_code == status.HTTP_403_FORBIDDEN
+        timed_client.force_authenticate(user)
+        assert timed_client.get(reverse("my-posts")).status_code == status.HTTP_200_OK
+
+    def test_logs_when_enabled(self, timed_client, settings, db, caplog):
+        settings.SERVER_TIMING_HEADER = False
+        settings.SERVER_TIMING_LOG = True
+        with caplog.at_level("INFO", logger="core.profiling"):
+            response = timed_client.get(reverse("public-posts"))
+        assert "Server-Timing" not in response
+        assert "view" in caplog.records[-1].server_timing
+
+    def test_unsampled_requests_get_no_header(self, timed_client, settings, db):
+        settings.SERVER_TIMING_SAMPLE_RATE = 0
+        assert "Server-Timing" not in timed_client.get(reverse("public-posts"))
+
+
+class TestMetrics:
+    def sample(self, name, **labels):
+        return metrics.REGISTRY.get_sample_value(name, labels) or 0
+
+    def test_records_route_status_and_queries(self, api_client, published_post):
+        before = self.sample("http_responses_total", route="public-posts", method="GET", status="200")
+        queries = self.sample("db_queries_per_request_sum", route="public-posts")
+        assert api_client.get(reverse("public-posts")).status_code == status.HTTP_200_OK
+        assert self.sample("http_responses_total", route="public-posts", method="GET", status="200") == before + 1
+        assert self.sample("db_queries_per_request_sum", route="public-posts") > queries
+        assert self.sample("http_request_duration_seconds_count", route="public-posts", method="GET") >= 1
+
+    def test_counts_cache_hits_and_misses(self, db):
+        # A namespace outside the local tier, so every lookup reaches Redis.
+        misses = self.sample("cache_requests_total", namespace="stats", result="miss")
+        hits = self.sample("cache_requests_total", namespace="stats", result="hit")
+        cache.get("stats:nothing-here")
+        cache.set("stats:something", 1)
+        cache.get_many(["stats:something", "stats:nothing-here"])
+        assert self.sample("cache_requests_total", namespace="stats", result="miss") == misses + 2
+        assert self.sample("cache_requests_total", namespace="stats", result="hit") == hits + 1
+
+    def test_endpoint_skips_ban_check_and_logging(self, api_client, db):
+        BannedIP.objects.create(ip_address="127.0.0.1")
+        banned_ips.load()
+        response = api_client.get("/metrics")
+        assert response.status_code == status.HTTP_200_OK
+        assert b"http_request_duration_seconds_bucket" in response.content
+        assert b"log_writer_queue_depth" in response.content
+        assert not TrafficLog.objects.exists()
+
+    def test_endpoint_is_internal_only(self, api_client):
+        assert api_client.get("/metrics", HTTP_X_FORWARDED_FOR="127.0.0.1").status_code == status.HTTP_404_NOT_FOUND
+        assert api_client.get("/metrics", REMOTE_ADDR="203.0.113.5").status_code == status.HTTP_404_NOT_FOUND
+
+
+class TestTieredCache:
+    @pytest.fixture
+    def tier(self):
+        tier = cache.local
+        assert tier.subscribed.wait(5), "invalidation listener did not subscribe"
+        return tier
+
+    def redis(self):
+        return cache.client.get_client(write=True)
+
+    def wait_until(self, condition):
+        deadline = time.monotonic() + 5
+        while not condition() and time.monotonic() < deadline:
+            time.sleep(0.01)
+        return condition()
+
+    def test_serves_local_copies(self, tier):
+        cache.set("feed:page", {"results": [1]})
+        # Writes are not kept locally; the first read fills the tier.
+        assert cache.make_key("feed:page") not in tier._entries
+        assert cache.get("feed:page") == {"results": [1]}
+        self.redis().delete(cache.make_key("feed:page"))
+        value = cache.get("feed:page")
+        assert value == {"results": [1]}
+        value["results"].append(2)
+        assert async_to_sync(cache.aget)("feed:page") == {"results": [1]}
+        cache.delete("feed:page")
+        assert cache.get("feed:page") is None
+
+        cache.set("stats:total", 1)
+        assert cache.make_key("stats:total") not in tier._entries
+
+    def test_other_workers_writes_invalidate(self, tier):
+        self.redis().set(cache.make_key("feed:version"), cache.client.encode(1))
+        assert cache.get("feed:version") == 1
+        self.redis().set(cache.make_key("feed:version"), cache.client.encode(2))
+        assert cache.get("feed:version") == 1
+        notice = {"origin": "another-worker", "keys": [cache.make_key("feed:version")]}
+        self.redis().publish(tier.channel, json.dumps(notice))
+        assert self.wait_until(lambda: cache.get("feed:version") == 2)
+
+    def test_read_racing_a_write_is_not_kept(self, tier):
+        generation = tier.generation
+        tier.invalidate(["other"])
+        tier.put("feed:stale", 1, generation)
+        assert "feed:stale" not in tier._entries
+
+    def test_bypassed_while_unsubscribed(self, tier):
+        cache.set("feed:page", 1)
+        self.redis().delete(cache.make_key("feed:page"))
+        tier.subscribed.clear()
+        try:
+            assert cache.get("feed:page") is None
+        finally:
+            tier.subscribed.set()
+
+    def test_sessions(self, tier, authenticated_client):
+        assert authenticated_client.get("/api/auth/me/").status_code == status.HTTP_200_OK
+        key = cache.make_key(f"django.contrib.sessions.cache{authenticated_client.session.session_key}")
+        assert key in tier._entries
+        authenticated_client.post("/api/auth/logout/")
+        assert key not in tier._entries
+        assert authenticated_client.get("/api/auth/me/").status_code in (
+            status.HTTP_401_UNAUTHORIZED, status.HTTP_403_FORBIDDEN
+        )
+
+
+class TestCacheFill:
+    def fills(self, name, result):
+        return metrics.REGISTRY.get_sample_value("cache_fills_total", {"name": name, "result": result}) or 0
+
+    def producer(self, name, delay=0.0, **options):
+        calls = []
+
+        options.setdefault("timeout", 60)
+
+        @cache_fill(name, **options)
+        def produce(key):
+            calls.append(key)
+            time.sleep(delay)
+            return len(calls)
+
+        return produce, calls
+
+    def hold_lock(self, key):
+        cache_fill_module._redis().set(f"{cache_fill_module.LOCK_PREFIX}{key}", "another-worker", ex=10)
+
+    def test_concurrent_misses_compute_once(self):
+        produce, calls = self.producer("test-stampede", delay=0.2)
+        with concurrent.futures.ThreadPoolExecutor(8) as pool:
+            results = list(pool.map(lambda _: produce("stats:stampede"), range(8)))
+        assert results == [1] * 8
+        assert len(calls) == 1
+        assert self.fills("test-stampede", "waited") == 7
+        assert produce("stats:stampede") == 1
+        assert self.fills("test-stampede", "hit") == 1
+
+    def test_serves_stale_while_another_refreshes(self):
+        produce, calls = self.producer("test-stale")
+        cache.set("stats:stale", ("old", time.time() - 1, 0.01), 60)
+        self.hold_lock("stats:stale")
+        assert produce("stats:stale") == "old"
+        assert not calls
+        assert self.fills("test-stale", "stale") == 1
+
+        cache_fill_module._redis().delete(f"{cache_fill_module.LOCK_PREFIX}stats:stale")
+        assert produce("stats:stale") == 1
+        assert self.fills("test-stale", "computed") == 1
+
+    def test_gives_up_waiting(self):
+        produce, calls = self.producer("test-fallback", lock_timeout=0.2)
+        self.hold_lock("stats:fallback")
+        assert produce("stats:fallback") == 1
+        assert self.fills("test-fallback", "fallback") == 1
+
+    def test_early_expiration(self, monkeypatch):
+        entry = ("value", 100.0, 1.0)
+        monkeypatch.setattr(cache_fill_module.random, "random", lambda: 0.0)
+        assert cache_fill_module.is_fresh(entry, beta=1.0, now=99.0)
+        # Draws near 1 expire slow-to-compute entries well ahead of time.
+        monkeypatch.setattr(cache_fill_module.random, "random", lambda: 0.99)
+        assert not cache_fill_module.is_fresh(entry, beta=1.0, now=96.0)
+        assert cache_fill_module.is_fresh(("value", 100.0, 0.01), beta=1.0, now=96.0)
+
+    def test_zero_timeout_bypasses_cache_and_lock(self, monkeypatch):
+        produce, calls = self.producer("test-disabled", timeout=0)
+        self.hold_lock("stats:disabled")
+        monkeypatch.setattr(cache_fill_module, "_redis", lambda: pytest.fail("took the lock"))
+        assert [produce("stats:disabled"), produce("stats:disabled")] == [1, 2]
+        assert cache.get("stats:disabled") is None
+
+    def test_bare_cached_value_is_a_miss(self):
+        produce, calls = self.producer("test-legacy")
+        cache.set("stats:legacy", {"results": []}, 60)
+        assert produce("stats:legacy") == 1
+        assert produce("stats:legacy") == 1
+
+    def test_feed_is_filled_once(self, api_client, published_post):
+        computed = self.fills("feed", "computed")
+        hits = self.fills("feed", "hit")
+        for _ in range(3):
+            assert api_client.get(reverse("public-posts")).status_code == status.HTTP_200_OK
+        assert self.fills("feed", "computed") == computed + 1
+        assert self.fills("feed", "hit") == hits + 2
+
+
+class TestFeedSnapshots:
+    @pytest.fixture
+    def snapshot_dir(self, settings, tmp_path):
+        settings.FEED_SNAPSHOT_DIR = str(tmp_path)
+        settings.FEED_SNAPSHOT_PAGES = 2
+        settings.POSTS_PAGE_SIZE = 2
+        return tmp_path
+
+    def make_posts(self, user, count):
+        return [
+            Post.objects.create(author=user, title=f"Post {i}", content="Body", published=True) for i in range(count)
+        ]
+
+    def test_pages_match_the_api(self, snapshot_dir, api_client, user):
+        self.make_posts(user, 5)
+        assert snapshots.write_snapshots() == 2
+        first = api_client.get("/api/posts/")
+        assert (snapshot_dir / "index.json").read_bytes() == first.content
+        cursor = QueryDict(urlsplit(first.data["next"]).query)["cursor"]
+        second = api_client.get("/api/posts/", {"cursor": cursor})
+        assert (snapshot_dir / f"cursor-{cursor}.json").read_bytes() == second.content
+        assert len(snapshots.snapshot_files(snapshot_dir)) == 2
+
+    def test_rebuilt_on_publish_not_on_draft_edits(
+        self, snapshot_dir, user, draft_post, django_capture_on_commit_callbacks, monkeypatch
+    ):
+        rebuilds = []
+        monkeypatch.setattr(snapshots, "refresh_snapshots", lambda: rebuilds.append(1))
+        with django_capture_on_commit_callbacks(execute=True):
+            draft_post.title = "Still a draft"
+            draft_post.save()
+        assert not rebuilds
+
+        with django_capture_on_commit_callbacks(execute=True):
+            self.make_posts(user, 3)
+        assert len(rebuilds) == 1
+
+        post = Post.objects.get(title="Post 0")
+        with django_capture_on_commit_callbacks(execute=True):
+            post.published = False
+            post.save()
+        assert len(rebuilds) == 2
+
+    def test_unpublished_post_leaves_the_snapshot(self, snapshot_dir, user, django_capture_on_commit_callbacks):
+        with django_capture_on_commit_callbacks(execute=True):
+            post = self.make_posts(user, 1)[0]
+        assert b"Post 0" in (snapshot_dir / "index.json").read_bytes()
+        with django_capture_on_commit_callbacks(execute=True):
+            post.delete()
+        assert b"Post 0" not in (snapshot_dir / "index.json").read_bytes()
+
+    def test_check_and_rebuild_command(self, snapshot_dir, user):
+        self.make_posts(user, 3)
+        (snapshot_dir / "index.json").write_bytes(b"{}")
+        (snapshot_dir / "cursor-gone.json").write_bytes(b"{}")
+        assert snapshots.check_snapshots() == {
+            "missing": [next(name for name in snapshots.render_pages() if name != "index.json"), "banned-ips.conf"],
+            "stale": ["index.json"],
+            "extra": ["cursor-gone.json"],
+        }
+        with pytest.raises(CommandError):
+            call_command("feed_snapshots", "--check", stdout=io.StringIO())
+        call_command("feed_snapshots", stdout=io.StringIO())
+        call_command("feed_snapshots", "--check", stdout=io.StringIO())
+
+    def test_failed_rebuild_removes_snapshots(self, snapshot_dir, user, monkeypatch):
+        self.make_posts(user, 1)
+        snapshots.write_snapshots()
+
+        def broken():
+            raise RuntimeError("database went away")
+
+        monkeypatch.setattr(snapshots, "render_pages", broken)
+        snapshots.refresh_snapshots()
+        assert not snapshots.snapshot_files(snapshot_dir)
+
+    def test_ban_list_exported_for_nginx(self, snapshot_dir, admin_client):
+        admin_client.post("/api/admin/banned-ips/", {"ip_address": "198.51.100.9/24"}, format="json")
+        admin_client.post("/api/admin/banned-ips/", {"ip_address": "192.0.2.1"}, format="json")
+        assert (snapshot_dir / "banned-ips.conf").read_text() == "192.0.2.1 1;\n198.51.100.0/24 1;\n"
+        ban = BannedIP.objects.get(ip_address="192.0.2.1")
+        admin_client.delete(f"/api/admin/banned-ips/{ban.id}/")
+        assert (snapshot_dir / "banned-ips.conf").read_text() == "198.51.100.0/24 1;\n"
+
+
+@pytest.mark.django_db
+class TestFeedHits:
+    START = datetime.datetime(2026, 3, 11, 15, 0, tzinfo=datetime.timezone.utc)
+
+    @pytest.fixture
+    def hits_log(self, settings, tmp_path):
+        settings.FEED_HITS_LOG = str(tmp_path / "hits.log")
+        return tmp_path / "hits.log"
+
+    def line(self, seconds=0, ip="203.0.113.7", status_code=200):
+        return json.dumps({
+            "time": self.START.timestamp() + seconds,
+            "ip": ip,
+            "method": "GET",
+            "status": status_code,
+            "user_agent": "curl/8",
+            "request_time": 0.001,
+        }) + "\n"
+
+    def append(self, path, text):
+        with open(path, "a") as log:
+            log.write(text)
+
+    def test_hits_reach_the_traffic_log_rollups_and_metrics(self, hits_log):
+        responses = metrics.RESPONSES.labels("public-posts-snapshot", "GET", "200")
+        before = responses._value.get()
+        self.append(hits_log, self.line() + "not json\n" + self.line(70, ip="-") + self.line(80)[:20])
+        assert feed_hits.ingest() == 2
+        assert list(TrafficLog.objects.order_by("created_at").values_list("ip_address", "path", "created_at")) == [
+            ("203.0.113.7", "/api/posts/", self.START),
+            (None, "/api/posts/", self.START + datetime.timedelta(seconds=70)),
+        ]
+        assert responses._value.get() == before + 2
+
+        # The partial line is read once nginx has finished it, and only once.
+        self.append(hits_log, self.line(80)[20:])
+        assert feed_hits.ingest() == 1
+        assert feed_hits.ingest() == 0
+        rollups.compact(now=self.START + datetime.timedelta(minutes=10))
+        assert TrafficRollup.objects.filter(dimension="total").aggregate(n=Sum("count"))["n"] == 3
+
+    def test_rotated_log_is_finished_first(self, hits_log):
+        self.append(hits_log, self.line())
+        assert feed_hits.ingest() == 1
+        # Written after our last run but before nginx reopened its log.
+        self.append(hits_log, self.line(1))
+        hits_log.rename(f"{hits_log}.1")
+        self.append(hits_log, self.line(2) + self.line(3))
+        assert feed_hits.ingest() == 3
+        assert TrafficLog.objects.count() == 4
+        assert feed_hits.ingest() == 0
+
+    def test_disabled_without_a_log(self, settings):
+        settings.FEED_HITS_LOG = ""
+        assert feed_hits.ingest() == 0
+
+
+class TestExports:
+    @pytest.fixture(autouse=True)
+    def small_chunks(self, settings, monkeypatch):
+        settings.EXPORT_CHUNK_SIZE = 3
+        monkeypatch.setattr(exports, "BLOCK_SIZE", 200)
+
+    def make_traffic(self, count):
+        start = timezone.now() - datetime.timedelta(hours=1)
+        TrafficLog.objects.bulk_create(
+            TrafficLog(
+                ip_address="10.0.0.1", path=f"/api/posts/{i}/", method="GET", status_code=200,
+                user_agent="=HYPERLINK(\"http://evil\")" if i == 0 else "curl", created_at=start + datetime.timedelta(seconds=i),
+            )
+            for i in range(count)
+        )
+        return start
+
+    def test_traffic_ndjson(self, admin_client):
+        start = self.make_traffic(20)
+        response = admin_client.get("/api/admin/traffic/export/")
+        assert response.status_code == status.HTTP_200_OK
+        assert response.streaming
+        assert response["Content-Type"] == "application/x-ndjson"
+        assert response["Content-Disposition"].startswith('attachment; filename="traffic-')
+        blocks = list(response.streaming_content)
+        assert len(blocks) > 1
+        rows = [json.loads(line) for line in b"".join(blocks).splitlines()]
+        assert [r["path"] for r in rows[:20]] == [f"/api/posts/{i}/" for i in range(20)]
+        assert rows[0]["created_at"].endswith("Z")
+
+        response = admin_client.get("/api/admin/traffic/export/", {
+            "start": (start + datetime.timedelta(seconds=5)).isoformat(),
+            "end": (start + datetime.timedelta(seconds=8)).isoformat(),
+        })
+        paths = [json.loads(line)["path"] for line in b"".join(response.streaming_content).splitlines()]
+        assert paths == ["/api/posts/5/", "/api/posts/6/", "/api/posts/7/"]
+
+    def test_audit_csv_gzip(self, admin_client):
+        admin = User.objects.get(username="admin")
+        AuditLog.objects.create(user=admin, action="login", path="/api/auth/login/", details={"via": "form"})
+        AuditLog.objects.create(action="other", path="-1+1")
+        response = admin_client.get("/api/admin/audit/export/", {"format": "csv", "gzip": "1", "action": "login"})
+        assert response["Content-Type"] == "application/gzip"
+        assert response["Content-Disposition"].endswith('.csv.gz"')
+        text = gzip.decompress(b"".join(response.streaming_content)).decode()
+        rows = list(csv.DictReader(io.StringIO(text)))
+        assert [(r["action"], r["username"], r["details"]) for r in rows] == [("login", "admin", '{"via":"form"}')]
+
+        response = admin_client.get("/api/admin/audit/export/", {"format": "csv", "action": "other"})
+        assert list(csv.DictReader(io.StringIO(b"".join(response.streaming_content).decode())))[0]["path"] == "'-1+1"
+
+    def test_csv_escapes_formulas(self, admin_client):
+        self.make_traffic(1)
+        response = admin_client.get("/api/admin/traffic/export/", {"format": "csv"})
+        row = next(csv.DictReader(io.StringIO(b"".join(response.streaming_content).decode())))
+        assert row["user_agent"].startswith("'=HYPERLINK")
+
+    def test_streams_from_an_open_cursor(self, admin_client):
+        self.make_traffic(20)
+        outer = connection.in_atomic_block
+        blocks = exports.export_blocks(TrafficLog.objects.order_by("created_at", "id"), ("id", "path"), "ndjson")
+        next(blocks)
+        assert connection.in_atomic_block
+        blocks.close()
+        assert connection.in_atomic_block == outer
+
+    def test_asgi_streams_asynchronously(self, admin_client):
+        self.make_traffic(10)
+        admin = User.objects.get(username="admin")
+
+        async def run():
+            client = AsyncClient()
+            await client.aforce_login(admin)
+            response = await client.get("/api/admin/traffic/export/")
+            assert response.is_async
+            return b"".join([block async for block in response.streaming_content])
+
+        # The export request logs itself before its rows are read.
+        rows = [json.loads(line) for line in async_to_sync(run)().splitlines()]
+        assert [r["path"] for r in rows] == [f"/api/posts/{i}/" for i in range(10)] + ["/api/admin/traffic/export/"]
+
+    def test_errors(self, authenticated_client, admin_client):
+        assert authenticated_client.get("/api/admin/audit/export/").status_code == status.HTTP_403_FORBIDDEN
+        response = admin_client.get("/api/admin/traffic/export/", {"format": "xml"})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert admin_client.get("/api/admin/traffic/export/", {"start": "soon"}).status_code == 400
+
+
+class TestBenchmarkHarness:
+    def test_compare_flags_slowdowns_and_extra_queries(self):
+        baseline = [
+            {"name": "a", "best": 0.010, "queries": 2},
+            {"name": "b", "best": 0.010, "queries": 2},
+            {"name": "c", "best": 0.010, "queries": 2},
+        ]
+        results = [
+            {"name": "a", "best": 0.011, "queries": 2},
+            {"name": "b", "best": 0.020, "queries": 2},
+            {"name": "c", "best": 0.009, "queries": 3},
+            {"name": "d", "best": 0.001, "queries": 0},
+        ]
+        rows, regressions = harness.compare(results, baseline, tolerance=0.25)
+        assert regressions == ["b", "c"]
+        assert rows[-1][-1] == "new"
+
+    def test_every_url_has_a_request(self, user, admin_client, published_post):
+        specs = view_benchmarks.requests(user, User.objects.get(username="admin"))
+        assert {str(p.pattern) for p in urls.urlpatterns} == set(specs)
+
@@ -8,9 +8,11 @@ urlpatterns = [
     path("auth/register/", views.RegisterView.as_view(), name="register"),
     path("auth/login/", views.LoginView.as_view(), name="login"),
     path("auth/logout/", views.LogoutView.as_view(), name="logout"),
-    path("auth/me/", views.MeView.as_view(), name="me"),
+    path("auth/me/", views.me, name="me"),
     # Public posts
-    path("posts/", views.PublicPostListView.as_view(), name="public-posts"),
+    path("posts/", views.public_post_list, name="public-posts"),
+    path("posts/search/", views.PostSearchView.as_view(), name="post-search"),
+    path("posts/<int:pk>/", views.PublicPostDetailView.as_view(), name="public-post-detail"),
     # User's own posts
     path("my-posts/", views.UserPostListCreateView.as_view(), name="my-posts"),
     path("my-posts/<int:pk>/", views.UserPostDetailView.as_view(), name="my-post-detail"),
@@ -20,14 +22,20 @@ urlpatterns = [
     path("admin/login/", admin_views.admin_login),
     path("admin/logout/", admin_views.admin_logout),
     path("admin/me/", admin_views.admin_me),
+    path("admin/system/", admin_views.admin_system),
     path("admin/users/", admin_views.admin_users_list),
+    path("admin/users/bulk/", admin_views.admin_users_bulk),
     path("admin/users/<int:user_id>/", admin_views.admin_user_detail),
     path("admin/users/<int:user_id>/ban/", admin_views.admin_user_ban),
     path("admin/users/<int:user_id>/unban/", admin_views.admin_user_unban),
     path("admin/audit/", admin_views.admin_audit_logs),
+    path("admin/audit/export/", admin_views.admin_audit_export),
     path("admin/traffic/", admin_views.admin_traffic),
+    path("admin/traffic/stats/", admin_views.admin_traffic_stats),
+    path("admin/traffic/export/", admin_views.admin_traffic_export),
     path("admin/attacks/", admin_views.admin_attacks),
     path("admin/banned-ips/", admin_views.admin_banned_ips_list),
+    path("admin/banned-ips/bulk/", admin_views.admin_banned_ips_bulk),
     path("admin/banned-ips/<int:ban_id>/", admin_views.admin_banned_ip_detail),
 ]
 
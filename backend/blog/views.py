@@ -1,26 +1,50 @@
+from asgiref.sync import sync_to_async
+from django.conf import settings
 from django.contrib.auth import login, logout
 from django.db import transaction
 from rest_framework import generics, permissions, status, views
 from rest_framework.response import Response
 
+from core.async_api import async_api_view
+from core.cache_fill import cache_fill
 from core.middleware import get_client_ip
+from core.throttling import LoginThrottle, RegisterThrottle
+from .conditional import (
+    REVALIDATE_PRIVATE,
+    add_validators,
+    check_post_preconditions,
+    conditional,
+    has_preconditions,
+    is_conditional_get,
+    post_etag,
+    post_validators,
+    user_posts_validators,
+)
+from .feed_cache import feed_page
 from .models import AuditLog, Post, Profile
+from .pagination import FeedPagination, KeysetPagination, get_page_size
+from .search import search_posts
 from .serializers import (
     LoginSerializer,
+    PostSearchResultSerializer,
     PostSerializer,
+    PostSummarySerializer,
     ProfileSerializer,
     RegisterSerializer,
     UserSerializer,
+    post_summary_values,
 )
 
 
 class RegisterView(generics.CreateAPIView):
     serializer_class = RegisterSerializer
     permission_classes = [permissions.AllowAny]
+    throttle_classes = [RegisterThrottle]
 
 
 class LoginView(views.APIView):
     permission_classes = [permissions.AllowAny]
+    throttle_classes = [LoginThrottle]
 
     def post(self, request, *args, **kwargs):
         serializer = LoginSerializer(data=request.data)
@@ -61,11 +85,7 @@ class LogoutView(views.APIView):
 
 
 class MeView(views.APIView):
-    def get(self, request, *args, **kwargs):
-        if not request.user.is_authenticated:
-            return Response({"detail": "Not authenticated"}, status=401)
-        profile, _ = Profile.objects.get_or_create(user=request.user)
-        return Response(ProfileSerializer(profile).data)
+    """Profile updates; reads are served by the `me` coroutine below."""
 
     @transaction.atomic
     def put(self, request, *args, **kwargs):
@@ -78,25 +98,124 @@ class MeView(views.APIView):
         return Response(serializer.data)
 
 
-class PublicPostListView(generics.ListAPIView):
-    queryset = Post.objects.filter(published=True)
+@async_api_view(["GET"], fallback=MeView.as_view())
+async def me(request):
+    if not request.user.is_authenticated:
+        return Response({"detail": "Not authenticated"}, status=401)
+    profile, _ = await Profile.objects.aget_or_create(user=request.user)
+    # Reuse the session user; a lazy FK load is not allowed in a coroutine.
+    profile.user = request.user
+    return Response(ProfileSerializer(profile).data)
+
+
+# Lists never load content: excerpt/word_count are stored, author is joined,
+# and rows come back as values() dicts rather than Post instances.
+PUBLIC_FEED_QUERYSET = post_summary_values(Post.objects.filter(published=True))
+
+
+@cache_fill("feed", timeout=lambda: settings.FEED_CACHE_TIMEOUT)
+async def feed_page_data(key, request):
+    paginator = FeedPagination()
+    page = await paginator.apaginate_queryset(PUBLIC_FEED_QUERYSET, request)
+    return paginator.get_paginated_response(page).data
+
+
+@async_api_view(["GET"])
+async def public_post_list(request):
+    key, etag, modified = await sync_to_async(feed_page)(request)
+    response = conditional(request, etag, modified)
+    if response is not None:
+        return response
+    data = await feed_page_data(key, request)
+    return add_validators(Response(data), etag, modified)
+
+
+class PublicPostDetailView(generics.RetrieveAPIView):
+    queryset = Post.objects.filter(published=True).select_related("author").defer("search_vector")
     serializer_class = PostSerializer
     permission_classes = [permissions.AllowAny]
 
 
+class PostSearchView(generics.ListAPIView):
+    """Ranked full-text search over published posts: /api/posts/search/?q=..."""
+
+    serializer_class = PostSearchResultSerializer
+    permission_classes = [permissions.AllowAny]
+
+    def get_queryset(self):
+        queryset = (
+            Post.objects.filter(published=True)
+            .select_related("author")
+            .defer("content", "search_vector")
+        )
+        return search_posts(queryset, self.request.query_params["q"].strip())
+
+    def list(self, request, *args, **kwargs):
+        if not request.query_params.get("q", "").strip():
+            return Response({"detail": "q is required."}, status=status.HTTP_400_BAD_REQUEST)
+        results = self.get_queryset()[: get_page_size(request)]
+        return Response({"results": self.get_serializer(results, many=True).data})
+
+
 class UserPostListCreateView(generics.ListCreateAPIView):
-    serializer_class = PostSerializer
+    pagination_class = KeysetPagination
+
+    def get_serializer_class(self):
+        if self.request.method == "GET":
+            return PostSummarySerializer
+        return PostSerializer
 
     def get_queryset(self):
-        return Post.objects.filter(author=self.request.user)
+        return (
+            Post.objects.filter(author=self.request.user)
+            .select_related("author")
+            .defer("content", "search_vector")
+        )
+
+    def list(self, request, *args, **kwargs):
+        if not request.user.is_authenticated:
+            return super().list(request, *args, **kwargs)
+        etag, modified = user_posts_validators(request)
+        response = conditional(request, etag, modified, REVALIDATE_PRIVATE)
+        if response is not None:
+            return response
+        return add_validators(super().list(request, *args, **kwargs), etag, modified, REVALIDATE_PRIVATE)
 
     def perform_create(self, serializer):
         serializer.save(author=self.request.user)
 
 
 class UserPostDetailView(generics.RetrieveUpdateAPIView):
+    """
+    GET honours If-None-Match / If-Modified-Since; PUT/PATCH honour If-Match /
+    If-Unmodified-Since (412 when the post changed since the client read it).
+    """
+
     serializer_class = PostSerializer
 
     def get_queryset(self):
-        return Post.objects.filter(author=self.request.user)
+        queryset = Post.objects.filter(author=self.request.user).select_related("author").defer("search_vector")
+        if self.request.method in ("PUT", "PATCH") and has_preconditions(self.request):
+            # Lock the row update() reads anyway, so check and write are atomic.
+            queryset = queryset.select_for_update(of=("self",))
+        return queryset
+
+    def get_object(self):
+        self.post = super().get_object()
+        if self.request.method in ("PUT", "PATCH"):
+            check_post_preconditions(self.request, self.post)
+        return self.post
+
+    def retrieve(self, request, *args, **kwargs):
+        if is_conditional_get(request):
+            etag, modified = post_validators(request, kwargs["pk"])
+            response = conditional(request, etag, modified, REVALIDATE_PRIVATE) if etag else None
+            if response is not None:
+                return response
+        response = super().retrieve(request, *args, **kwargs)
+        return add_validators(response, post_etag(self.post), self.post.updated_at, REVALIDATE_PRIVATE)
 
+    @transaction.atomic
+    def update(self, request, *args, **kwargs):
+        response = super().update(request, *args, **kwargs)
+        return add_validators(response, post_etag(self.post), self.post.updated_at, REVALIDATE_PRIVATE)
@@ -0,0 +1,62 @@
+"""
+Coroutine API views for the hot read paths under ASGI.
+
+DRF 3.15 views are synchronous, so under ASGI every DRF request is handed to
+a worker thread. `async_api_view` runs a coroutine instead: the session user
+is resolved without blocking (core.middleware.request_user), the view gets a
+DRF Request (query_params, build_absolute_uri for pagination) and returns a
+DRF Response, rendered with the first DEFAULT_RENDERER_CLASSES entry. Methods the coroutine does not
+handle are passed to an ordinary sync DRF view (`fallback`) in a thread, so
+writes keep DRF's parsing, auth and CSRF behaviour unchanged.
+
+Under WSGI the same views still work; Django runs them via async_to_sync.
+"""
+import functools
+
+from asgiref.sync import sync_to_async
+from rest_framework import status
+from rest_framework.exceptions import APIException
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.views import exception_handler
+
+from .middleware import request_user
+
+
+def _finalize(response, request):
+    # First configured renderer (JSON); there is no content negotiation here.
+    response.accepted_renderer = api_settings.DEFAULT_RENDERER_CLASSES[0]()
+    response.accepted_media_type = response.accepted_renderer.media_type
+    response.renderer_context = {"request": request, "response": response, "view": None}
+    return response
+
+
+def async_api_view(methods=("GET",), fallback=None):
+    """Serve `methods` with the decorated coroutine; send anything else to `fallback`."""
+
+    def decorator(func):
+        @functools.wraps(func)
+        async def view(request, *args, **kwargs):
+            if request.method not in methods:
+                if fallback is not None:
+                    return await sync_to_async(fallback)(request, *args, **kwargs)
+                response = Response(
+                    {"detail": f'Method "{request.method}" not allowed.'},
+                    status=status.HTTP_405_METHOD_NOT_ALLOWED,
+                )
+                response["Allow"] = ", ".join(methods)
+                return _finalize(response, request)
+            drf_request = Request(request)
+            drf_request.user = await request_user(request)
+            try:
+                response = await func(drf_request, *args, **kwargs)
+            except APIException as exc:
+                response = exception_handler(exc, {"request": drf_request, "view": None})
+            return _finalize(response, drf_request)
+
+        # Same as DRF views: API CSRF is enforced by the sync fallback, not here.
+        view.csrf_exempt = True
+        return view
+
+    return decorator
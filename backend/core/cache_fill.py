@@ -0,0 +1,201 @@
+"""
+Stampede-safe cache fills for expensive producers.
+
+    @cache_fill("feed", timeout=lambda: settings.FEED_CACHE_TIMEOUT)
+    async def feed_page_data(key, request):
+        ...
+
+The decorated function (sync or async) is called with the cache key first,
+unless `key` maps its arguments to one. Its result is cached for `timeout`
+seconds together with how long it took to compute, and kept `stale` seconds
+longer (default: another `timeout`) as a fallback.
+
+- Probabilistic early expiration (XFetch): a fresh entry is treated as
+  expired slightly early, more likely the closer it is to expiry and the
+  slower it was to compute (scaled by `beta`), so one caller usually
+  refreshes it before everyone sees it expire.
+- Coalescing: a refresh takes a Redis lock first. Only the holder runs the
+  producer. Everyone else gets the stale value if there is one, or waits up
+  to `lock_timeout` seconds for the holder's result and computes it
+  themselves only if none arrives.
+
+Outcomes are counted in `cache_fills_total{name, result}`: `hit`, `computed`
+(expired or missing), `early` (refreshed ahead of expiry), `stale` and
+`waited` (a recompute saved by coalescing), `fallback` (gave up waiting).
+Without Redis for the lock, every caller computes. A key holding anything
+but an envelope counts as missing.
+"""
+import asyncio
+import functools
+import logging
+import math
+import random
+import time
+import uuid
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.core.cache import cache
+
+from .metrics import CACHE_FILLS
+
+logger = logging.getLogger(__name__)
+
+LOCK_PREFIX = "fill-lock:"
+POLL_INTERVAL = 0.05
+
+# Deletes the lock only if this caller still holds it.
+RELEASE_LUA = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+def _redis():
+    from django_redis import get_redis_connection
+    return get_redis_connection("default")
+
+
+def _envelope(entry):
+    # Anything else under the key (e.g. a bare value cached before the
+    # producer was wrapped) is treated as a miss and overwritten.
+    return entry if isinstance(entry, tuple) and len(entry) == 3 else None
+
+
+def is_fresh(entry, beta, now=None):
+    """XFetch: (value, expires, compute seconds) is fresh, with early expiry drawn at random."""
+    _, expires, delta = entry
+    now = time.time() if now is None else now
+    return now - delta * beta * math.log(1.0 - random.random()) < expires
+
+
+class CacheFill:
+    def __init__(self, name, timeout, stale=None, beta=1.0, lock_timeout=10):
+        self.name = name
+        self._timeout = timeout
+        self._stale = stale
+        self.beta = beta
+        self.lock_timeout = lock_timeout
+
+    @property
+    def timeout(self):
+        return self._timeout() if callable(self._timeout) else self._timeout
+
+    @property
+    def stale(self):
+        return self.timeout if self._stale is None else self._stale
+
+    def count(self, result):
+        CACHE_FILLS.labels(self.name, result).inc()
+
+    def envelope(self, value, started):
+        return (value, time.time() + self.timeout, time.monotonic() - started)
+
+    def acquire(self, key):
+        """A lock token, None when another caller holds the lock, or "" without Redis."""
+        token = uuid.uuid4().hex
+        try:
+            if _redis().set(f"{LOCK_PREFIX}{key}", token, nx=True, px=int(self.lock_timeout * 1000)):
+                return token
+            return None
+        except Exception:
+            logger.warning("Cache fill lock unavailable; computing %s without coalescing", self.name)
+            return ""
+
+    def release(self, key, token):
+        if token:
+            try:
+                _redis().eval(RELEASE_LUA, 1, f"{LOCK_PREFIX}{key}", token)
+            except Exception:
+                pass  # It expires after lock_timeout anyway.
+
+    def locked(self, key):
+        try:
+            return bool(_redis().exists(f"{LOCK_PREFIX}{key}"))
+        except Exception:
+            return False
+
+    def wrap(self, producer, key_func):
+        if iscoroutinefunction(producer):
+            @functools.wraps(producer)
+            async def wrapper(*args, **kwargs):
+                return await self.aget(key_func(*args, **kwargs), producer, args, kwargs)
+        else:
+            @functools.wraps(producer)
+            def wrapper(*args, **kwargs):
+                return self.get(key_func(*args, **kwargs), producer, args, kwargs)
+        wrapper.cache_fill = self
+        return wrapper
+
+    def get(self, key, producer, args, kwargs):
+        if self.timeout <= 0:
+            return producer(*args, **kwargs)
+        entry = _envelope(cache.get(key))
+        if entry is not None and is_fresh(entry, self.beta):
+            self.count("hit")
+            return entry[0]
+        token = self.acquire(key)
+        if token is None:
+            if entry is not None:
+                self.count("stale")
+                return entry[0]
+            deadline = time.monotonic() + self.lock_timeout
+            while time.monotonic() < deadline and self.locked(key):
+                time.sleep(POLL_INTERVAL)
+                entry = _envelope(cache.get(key))
+                if entry is not None:
+                    self.count("waited")
+                    return entry[0]
+            self.count("fallback")
+        try:
+            started = time.monotonic()
+            value = producer(*args, **kwargs)
+            cache.set(key, self.envelope(value, started), self.timeout + self.stale)
+        finally:
+            self.release(key, token)
+        if token is not None:
+            self.count("computed" if entry is None or entry[1] <= time.time() else "early")
+        return value
+
+    async def aget(self, key, producer, args, kwargs):
+        if self.timeout <= 0:
+            return await producer(*args, **kwargs)
+        entry = _envelope(await cache.aget(key))
+        if entry is not None and is_fresh(entry, self.beta):
+            self.count("hit")
+            return entry[0]
+        token = await sync_to_async(self.acquire)(key)
+        if token is None:
+            if entry is not None:
+                self.count("stale")
+                return entry[0]
+            deadline = time.monotonic() + self.lock_timeout
+            while time.monotonic() < deadline and await sync_to_async(self.locked)(key):
+                await asyncio.sleep(POLL_INTERVAL)
+                entry = _envelope(await cache.aget(key))
+                if entry is not None:
+                    self.count("waited")
+                    return entry[0]
+            self.count("fallback")
+        try:
+            started = time.monotonic()
+            value = await producer(*args, **kwargs)
+            await cache.aset(key, self.envelope(value, started), self.timeout + self.stale)
+        finally:
+            await sync_to_async(self.release)(key, token)
+        if token is not None:
+            self.count("computed" if entry is None or entry[1] <= time.time() else "early")
+        return value
+
+
+def cache_fill(name, timeout, key=None, stale=None, beta=1.0, lock_timeout=10):
+    """
+    Decorator caching a producer's result under `key(*args, **kwargs)` (default:
+    the first argument) with coalesced, stale-while-revalidate refreshes.
+    `timeout` may be a callable, read on every fill; at 0 or below the
+    producer is called directly, without the cache or the lock.
+    """
+    fill = CacheFill(name, timeout, stale=stale, beta=beta, lock_timeout=lock_timeout)
+    key_func = key or (lambda cache_key, *args, **kwargs: cache_key)
+    return lambda producer: fill.wrap(producer, key_func)
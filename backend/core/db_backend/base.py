@@ -0,0 +1,63 @@
+"""
+PostgreSQL engine that borrows connections from core.db_pool.
+
+Configured like the stock engine plus OPTIONS["pool"] (same key Django 5.1
+uses for its psycopg3 pool): {"max_size", "timeout", "max_idle",
+"max_lifetime", "check_idle"}. Keep CONN_MAX_AGE = 0 so Django returns the
+connection to the pool at the end of every request.
+"""
+from django.db.backends.base.base import NO_DB_ALIAS
+from django.db.backends.postgresql import base, creation
+from django.db.backends.postgresql.psycopg_any import IsolationLevel
+
+from core.db_pool import PoolTimeout, close_all_pools, get_pool
+
+
+class DatabaseCreation(creation.DatabaseCreation):
+    def _destroy_test_db(self, test_database_name, verbosity):
+        # Idle pooled connections would block DROP DATABASE.
+        close_all_pools()
+        super()._destroy_test_db(test_database_name, verbosity)
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    creation_class = DatabaseCreation
+
+    @property
+    def pool_options(self):
+        return self.settings_dict["OPTIONS"].get("pool") or {}
+
+    def get_connection_params(self):
+        params = super().get_connection_params()
+        params.pop("pool", None)
+        return params
+
+    def get_new_connection(self, conn_params):
+        if self.alias == NO_DB_ALIAS:
+            # Short-lived maintenance connections (test DB setup) are not pooled.
+            return super().get_new_connection(conn_params)
+        key = tuple(conn_params.get(k) for k in ("dbname", "host", "port", "user"))
+        pool = get_pool((self.alias, *key), **self.pool_options)
+        # Set by the stock get_new_connection, which only runs for new connections.
+        self.isolation_level = IsolationLevel(
+            self.settings_dict["OPTIONS"].get("isolation_level", IsolationLevel.READ_COMMITTED)
+        )
+        try:
+            conn = pool.getconn(lambda: super(DatabaseWrapper, self).get_new_connection(conn_params))
+        except PoolTimeout as exc:
+            raise self.Database.OperationalError(str(exc)) from exc
+        self._pool = pool
+        return conn
+
+    def _close(self):
+        pool = getattr(self, "_pool", None)
+        if self.connection is None or pool is None:
+            return super()._close()
+        conn, self._pool = self.connection, None
+        discard = self.in_atomic_block or self.errors_occurred
+        if not discard and not conn.closed and not conn.autocommit:
+            try:
+                conn.rollback()
+            except Exception:
+                discard = True
+        pool.putconn(conn, discard=discard)
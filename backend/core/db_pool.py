@@ -0,0 +1,167 @@
+"""
+Per-process Postgres connection pool (used by the core.db_backend engine).
+
+Django 5.0 with psycopg2 has no built-in pool, and persistent connections
+(CONN_MAX_AGE) are tied to a thread, which does not work under ASGI where
+every request runs in its own thread. Instead, Django "closes" its connection
+at the end of every request as usual and the backend hands the raw psycopg2
+connection back here, so the TCP + auth handshake through internal_proxy is
+paid once per pooled connection instead of once per request.
+
+Connections idle for longer than `check_idle` seconds are health-checked
+(SELECT 1) on checkout. A failed check means the proxy or server went away,
+so every idle connection is dropped at once instead of failing one request
+per stale connection.
+"""
+import threading
+import time
+from collections import deque
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+class PoolTimeout(Exception):
+    pass
+
+
+class ConnectionPool:
+    def __init__(self, max_size=10, timeout=10.0, max_idle=300.0, max_lifetime=3600.0, check_idle=30.0):
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self.max_lifetime = max_lifetime
+        self.check_idle = check_idle
+        self._slots = threading.BoundedSemaphore(max_size)
+        self._lock = threading.Lock()
+        # (connection, created_at, returned_at), most recently returned last.
+        self._idle = deque()
+        self._created_at = {}
+        self.in_use = 0
+        self.counters = dict.fromkeys(
+            ("checkouts", "waits", "timeouts", "created", "discarded", "health_check_failures"), 0
+        )
+        self.wait_seconds = 0.0
+
+    def stats(self):
+        with self._lock:
+            return {
+                "max_size": self.max_size,
+                "size": self.in_use + len(self._idle),
+                "idle": len(self._idle),
+                "in_use": self.in_use,
+                "wait_seconds": round(self.wait_seconds, 6),
+                **self.counters,
+            }
+
+    def getconn(self, connect):
+        """An idle connection, or a new one from `connect()`; waits up to `timeout` when full."""
+        if not self._slots.acquire(blocking=False):
+            started = time.monotonic()
+            self._count("waits")
+            acquired = self._slots.acquire(timeout=self.timeout)
+            with self._lock:
+                self.wait_seconds += time.monotonic() - started
+            if not acquired:
+                self._count("timeouts")
+                raise PoolTimeout(f"no database connection available within {self.timeout}s")
+        try:
+            conn = self._checkout_idle() or self._new(connect)
+        except BaseException:
+            self._slots.release()
+            raise
+        with self._lock:
+            self.in_use += 1
+            self.counters["checkouts"] += 1
+        return conn
+
+    def putconn(self, conn, discard=False):
+        now = time.monotonic()
+        with self._lock:
+            self.in_use -= 1
+            created_at = self._created_at.get(id(conn), now)
+            keep = not discard and not conn.closed and now - created_at < self.max_lifetime
+            if keep:
+                self._idle.append((conn, created_at, now))
+        if not keep:
+            self._close(conn)
+        self._slots.release()
+
+    def close_all(self):
+        """Close every idle connection (checked-out ones close on return)."""
+        with self._lock:
+            idle, self._idle = list(self._idle), deque()
+        for conn, _, _ in idle:
+            self._close(conn)
+
+    def _checkout_idle(self):
+        while True:
+            now = time.monotonic()
+            with self._lock:
+                if not self._idle:
+                    return None
+                conn, created_at, returned_at = self._idle.pop()
+            if conn.closed or now - returned_at > self.max_idle or now - created_at > self.max_lifetime:
+                self._close(conn)
+                continue
+            if now - returned_at > self.check_idle and not self._healthy(conn):
+                self._count("health_check_failures")
+                self._close(conn)
+                # Whatever broke this one (proxy restart, failover) broke the rest.
+                self.close_all()
+                return None
+            return conn
+
+    def _healthy(self, conn):
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            if not conn.autocommit:
+                conn.rollback()
+            return True
+        except Exception:
+            return False
+
+    def _new(self, connect):
+        conn = connect()
+        with self._lock:
+            self._created_at[id(conn)] = time.monotonic()
+            self.counters["created"] += 1
+        return conn
+
+    def _close(self, conn):
+        with self._lock:
+            self._created_at.pop(id(conn), None)
+            self.counters["discarded"] += 1
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def _count(self, name):
+        with self._lock:
+            self.counters[name] += 1
+
+
+def get_pool(key, **options):
+    pool = _pools.get(key)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(key)
+            if pool is None:
+                pool = _pools[key] = ConnectionPool(**options)
+    return pool
+
+
+def close_all_pools():
+    with _pools_lock:
+        pools = list(_pools.values())
+    for pool in pools:
+        pool.close_all()
+
+
+def pool_stats():
+    """{"<alias>/<dbname>": stats} for every pool in this process."""
+    with _pools_lock:
+        pools = dict(_pools)
+    return {f"{alias}/{dbname}": pool.stats() for (alias, dbname, _, _, _), pool in pools.items()}
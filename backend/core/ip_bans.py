@@ -0,0 +1,202 @@
+"""
+Per-worker banned-IP matcher.
+
+The BannedIP table is compiled into a prefix table (one set of masked network
+integers per prefix length), so a ban check is a handful of set lookups and
+never touches the database. Single addresses and CIDR ranges are supported.
+
+Writes bump a version in Redis and publish it; every worker listens on the
+channel and reloads its table when the version changes. The list is also
+exported for nginx, which serves feed snapshots without asking Django
+(blog.snapshots).
+"""
+import asyncio
+import ipaddress
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.db import connection
+
+logger = logging.getLogger(__name__)
+
+VERSION_KEY = "banned_ips:version"
+CHANNEL = "banned_ips:changes"
+
+
+def normalize_network(value):
+    """
+    Canonical form stored in BannedIP.ip_address: a bare address for single
+    hosts ("10.1.2.3"), otherwise the network in CIDR notation ("10.0.0.0/8").
+    Raises ValueError for anything that is not an address or network.
+    """
+    network = ipaddress.ip_network(str(value).strip(), strict=False)
+    if network.prefixlen == network.max_prefixlen:
+        return str(network.network_address)
+    return str(network)
+
+
+class PrefixMatcher:
+    """Longest-prefix style membership test over a fixed set of networks."""
+
+    def __init__(self, networks=()):
+        # {ip version: {prefix length: {network int >> host bits}}}
+        self._tables = {4: {}, 6: {}}
+        for value in networks:
+            network = ipaddress.ip_network(value, strict=False)
+            host_bits = network.max_prefixlen - network.prefixlen
+            table = self._tables[network.version].setdefault(network.prefixlen, set())
+            table.add(int(network.network_address) >> host_bits)
+        self._lengths = {
+            version: sorted(table, reverse=True) for version, table in self._tables.items()
+        }
+
+    def __len__(self):
+        return sum(len(s) for table in self._tables.values() for s in table.values())
+
+    def __contains__(self, ip):
+        try:
+            address = ipaddress.ip_address(ip)
+        except ValueError:
+            return False
+        if address.version == 6 and address.ipv4_mapped is not None:
+            address = address.ipv4_mapped
+        value = int(address)
+        table = self._tables[address.version]
+        for prefixlen in self._lengths[address.version]:
+            if value >> (address.max_prefixlen - prefixlen) in table[prefixlen]:
+                return True
+        return False
+
+
+def _redis():
+    from django_redis import get_redis_connection
+    return get_redis_connection("default")
+
+
+class BannedIPSet:
+    """Process-wide compiled ban list kept in sync across workers via Redis."""
+
+    RETRY_SECONDS = 5.0
+
+    def __init__(self):
+        self._matcher = PrefixMatcher()
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._last_attempt = 0.0
+        self._listener = None
+        self.version = None
+
+    @property
+    def loaded(self):
+        return self._loaded
+
+    def start(self):
+        """Load the table and subscribe to change notifications (worker startup)."""
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            # Every handler (e.g. each test client) builds its own middleware.
+            if not self._loaded:
+                self.load()
+        # else: app loaded inside an event loop (e.g. plain uvicorn), where the
+        # ORM may not run; the listener or the first request loads instead.
+        if settings.BANNED_IPS_PUBSUB and self._listener is None:
+            with self._lock:
+                if self._listener is None:
+                    self._listener = threading.Thread(
+                        target=self._listen, name="banned-ip-listener", daemon=True
+                    )
+                    self._listener.start()
+
+    def load(self):
+        from blog.models import BannedIP
+
+        self._last_attempt = time.monotonic()
+        try:
+            version = self._read_version()
+            networks = list(BannedIP.objects.values_list("ip_address", flat=True))
+        except Exception:
+            logger.exception("Could not load banned IPs")
+            return False
+        try:
+            matcher = PrefixMatcher(networks)
+        except ValueError:
+            # Skip malformed rows instead of dropping every ban.
+            valid = []
+            for value in networks:
+                try:
+                    valid.append(normalize_network(value))
+                except ValueError:
+                    logger.warning("Ignoring invalid banned IP entry %r", value)
+            matcher = PrefixMatcher(valid)
+        self._matcher = matcher
+        self.version = version
+        self._loaded = True
+        return True
+
+    def reset(self):
+        """Forget the compiled table; the next check reloads it."""
+        self._matcher = PrefixMatcher()
+        self._loaded = False
+        self._last_attempt = 0.0
+        self.version = None
+
+    def is_banned(self, ip):
+        if not self._loaded and time.monotonic() - self._last_attempt >= self.RETRY_SECONDS:
+            self.load()
+        return ip in self._matcher
+
+    def __len__(self):
+        return len(self._matcher)
+
+    def publish_change(self):
+        """Reload locally, tell the other workers and re-export the list for nginx (call after every write)."""
+        from blog.snapshots import write_ban_list
+
+        try:
+            client = _redis()
+            version = client.incr(VERSION_KEY)
+            client.publish(CHANNEL, version)
+        except Exception:
+            logger.warning("Could not publish banned IP change; other workers keep their table")
+        self.load()
+        try:
+            write_ban_list()
+        except Exception:
+            logger.exception("Could not export banned IPs for nginx")
+
+    def _read_version(self):
+        try:
+            value = _redis().get(VERSION_KEY)
+        except Exception:
+            return None
+        return int(value) if value is not None else 0
+
+    def _load_in_thread(self):
+        try:
+            self.load()
+        finally:
+            # The listener thread reloads rarely; don't hold a DB connection.
+            connection.close()
+
+    def _listen(self):
+        backoff = 1.0
+        while True:
+            try:
+                pubsub = _redis().pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(CHANNEL)
+                # Changes may have been missed while disconnected.
+                self._load_in_thread()
+                backoff = 1.0
+                for message in pubsub.listen():
+                    if int(message["data"]) != self.version:
+                        self._load_in_thread()
+            except Exception:
+                logger.warning("Banned IP listener disconnected; retrying in %.0fs", backoff)
+                time.sleep(backoff)
+                backoff = min(backoff * 2, 30.0)
+
+
+banned_ips = BannedIPSet()
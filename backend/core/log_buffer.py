@@ -0,0 +1,157 @@
+"""
+Buffered, batched writes for high-volume log tables.
+
+Request handlers enqueue plain field dicts; a daemon thread per writer drains
+the queue and writes rows with bulk_create in batches bounded by size and by
+time. When the queue is full, entries are dropped and counted instead of
+blocking the request. Pending rows are flushed on interpreter/worker exit.
+"""
+import atexit
+import logging
+import queue
+import threading
+import time
+
+from django.apps import apps
+from django.db import close_old_connections
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+_writers = []
+_writers_lock = threading.Lock()
+
+
+class BufferedLogWriter:
+    """In-process queue + background bulk_create flusher for one model."""
+
+    def __init__(
+        self, model_label, max_queue=10000, batch_size=500, flush_interval=1.0, background=True, on_flush=None
+    ):
+        self.model_label = model_label
+        # Optional dotted path(s) to callables given each successfully written batch.
+        self.on_flush = (on_flush,) if isinstance(on_flush, str) else tuple(on_flush or ())
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.background = background
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread = None
+        self.dropped = 0
+        self.written = 0
+        with _writers_lock:
+            _writers.append(self)
+
+    @property
+    def model(self):
+        return apps.get_model(self.model_label)
+
+    def depth(self):
+        return self._queue.qsize()
+
+    def stats(self):
+        return {"queued": self.depth(), "dropped": self.dropped, "written": self.written}
+
+    def enqueue(self, **fields):
+        """Queue one row. Returns False (and counts a drop) when the buffer is full."""
+        if self.background:
+            self._ensure_started()
+        try:
+            self._queue.put_nowait(fields)
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+            return False
+        return True
+
+    def flush(self):
+        """Write everything currently queued from the calling thread."""
+        while True:
+            batch = self._drain(block=False)
+            if not batch:
+                return
+            self._write(batch)
+
+    def stop(self, timeout=5.0):
+        self._stopped.set()
+        thread = self._thread
+        if thread is not None and thread.is_alive():
+            thread.join(timeout)
+        self.flush()
+
+    def _ensure_started(self):
+        if self._thread is not None or self._stopped.is_set():
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name=f"log-writer-{self.model_label}", daemon=True
+                )
+                self._thread.start()
+
+    def _run(self):
+        while not self._stopped.is_set():
+            batch = self._drain(block=True)
+            if batch:
+                # This thread owns its own DB connection; treat each batch
+                # like a request so CONN_MAX_AGE and broken links are honoured.
+                close_old_connections()
+                try:
+                    self._write(batch)
+                finally:
+                    close_old_connections()
+
+    def _drain(self, block):
+        """Collect up to batch_size rows, waiting at most flush_interval when blocking."""
+        batch = []
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            try:
+                if block:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    batch.append(self._queue.get(timeout=remaining))
+                else:
+                    batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _write(self, batch):
+        model = self.model
+        try:
+            model.objects.bulk_create([model(**fields) for fields in batch])
+            with self._lock:
+                self.written += len(batch)
+        except Exception:
+            logger.exception("Dropping %d %s rows after failed bulk insert", len(batch), self.model_label)
+            with self._lock:
+                self.dropped += len(batch)
+            return
+        for hook in self.on_flush:
+            try:
+                import_string(hook)(batch)
+            except Exception:
+                logger.exception("%s flush hook %s failed", self.model_label, hook)
+
+
+def shutdown_all(timeout=5.0):
+    """Stop every writer and flush its remaining rows (worker exit)."""
+    with _writers_lock:
+        writers = list(_writers)
+    for writer in writers:
+        try:
+            writer.stop(timeout)
+        except Exception:
+            logger.exception("Failed to flush %s log writer", writer.model_label)
+
+
+def all_stats():
+    with _writers_lock:
+        writers = list(_writers)
+    return {w.model_label: w.stats() for w in writers}
+
+
+atexit.register(shutdown_all)
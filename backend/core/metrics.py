@@ -0,0 +1,220 @@
+"""
+Prometheus metrics for the API, served on an internal-only /metrics.
+
+MetricsMiddleware sits first in MIDDLEWARE. It records per request:
+
+- `http_request_duration_seconds{route, method}`: latency histogram, by
+  resolved URL name (the route pattern for unnamed URLs, "unresolved" when
+  nothing matched or a middleware answered first),
+- `http_responses_total{route, method, status}`,
+- `db_queries_per_request{route}`: queries run while handling it,
+
+and keeps `log_writer_queue_depth{writer}` current for this worker's
+background writers (core.log_buffer). CountingCacheClient adds
+`cache_requests_total{namespace, result}` (Redis hit/miss per key prefix);
+with core.tiered_cache in front, that counts only local-tier misses, and
+`local_cache_requests_total{namespace, result}` and `local_cache_entries`
+cover the in-process tier. core.cache_fill counts cached producer calls in
+`cache_fills_total{name, result}`.
+
+Under gunicorn every worker has its own process, so metrics are written
+through prometheus_client's multiprocess mode: PROMETHEUS_MULTIPROC_DIR must
+be set before the workers start (gunicorn.conf.py clears it at startup) and
+/metrics, whichever worker serves it, aggregates all of them. Without the
+variable (runserver, tests) the in-process registry is used.
+
+/metrics is answered by the middleware itself, so it skips the ban check
+and traffic logging, and only to clients in METRICS_ALLOWED_NETWORKS that
+did not come through a proxy; everyone else gets a 404.
+"""
+import ipaddress
+import os
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.http import HttpResponse, HttpResponseNotFound
+from django_redis.client import DefaultClient
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram
+from prometheus_client import generate_latest, multiprocess
+
+from .log_buffer import all_stats
+
+REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "Time from the first middleware to the response, by route.",
+    ["route", "method"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+RESPONSES = Counter("http_responses", "Responses by route and status code.", ["route", "method", "status"])
+DB_QUERIES = Histogram(
+    "db_queries_per_request",
+    "Database queries run per request, by route.",
+    ["route"],
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 50, 100),
+)
+CACHE_REQUESTS = Counter("cache_requests", "Cache lookups by key namespace and hit/miss.", ["namespace", "result"])
+LOCAL_CACHE_REQUESTS = Counter(
+    "local_cache_requests", "In-process cache tier lookups by key namespace and hit/miss.", ["namespace", "result"]
+)
+CACHE_FILLS = Counter(
+    "cache_fills", "Calls to cached producers (core.cache_fill) by name and outcome.", ["name", "result"]
+)
+LOCAL_CACHE_ENTRIES = Gauge(
+    "local_cache_entries", "Values held in in-process cache tiers (summed over live workers).", ["channel"],
+    multiprocess_mode="livesum",
+)
+WRITER_QUEUE_DEPTH = Gauge(
+    "log_writer_queue_depth",
+    "Rows waiting in background log writers (summed over live workers).",
+    ["writer"],
+    multiprocess_mode="livesum",
+)
+
+_queries = ContextVar("request_queries", default=None)
+_MISSING = object()
+
+
+def _count_query(execute, sql, params, many, context):
+    counter = _queries.get()
+    if counter is not None:
+        counter[0] += 1
+    return execute(sql, params, many, context)
+
+
+def _install_query_counter(sender, connection, **kwargs):
+    if _count_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_count_query)
+
+
+def _route(request):
+    match = getattr(request, "resolver_match", None)
+    if match is None:
+        return "unresolved"
+    return match.view_name or match.route
+
+
+def _networks():
+    return [ipaddress.ip_network(n.strip(), strict=False) for n in settings.METRICS_ALLOWED_NETWORKS if n.strip()]
+
+
+def registry():
+    """The registry to expose: every worker's files in multiprocess mode, else this process."""
+    if "PROMETHEUS_MULTIPROC_DIR" not in os.environ:
+        return REGISTRY
+    collected = CollectorRegistry()
+    multiprocess.MultiProcessCollector(collected)
+    return collected
+
+
+def update_writer_gauges():
+    for label, stats in all_stats().items():
+        WRITER_QUEUE_DEPTH.labels(label).set(stats["queued"])
+
+
+def update_cache_gauges():
+    from .tiered_cache import all_tiers
+
+    for channel, tier in all_tiers().items():
+        LOCAL_CACHE_ENTRIES.labels(channel).set(len(tier))
+
+
+def render_metrics():
+    update_writer_gauges()
+    update_cache_gauges()
+    return HttpResponse(generate_latest(registry()), content_type=CONTENT_TYPE_LATEST)
+
+
+class MetricsMiddleware:
+    """Outermost middleware: records request metrics and serves METRICS_PATH."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.allowed_networks = _networks()
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+        connection_created.connect(_install_query_counter, dispatch_uid="core.metrics.query_counter")
+
+    def is_metrics_request(self, request):
+        return request.path == settings.METRICS_PATH
+
+    def allowed(self, request):
+        # Anything relayed by nginx is external, whatever REMOTE_ADDR says.
+        if "HTTP_X_FORWARDED_FOR" in request.META or "HTTP_X_REAL_IP" in request.META:
+            return False
+        try:
+            ip = ipaddress.ip_address(request.META.get("REMOTE_ADDR", ""))
+        except ValueError:
+            return False
+        return any(ip in network for network in self.allowed_networks)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if self.is_metrics_request(request):
+            return render_metrics() if self.allowed(request) else HttpResponseNotFound()
+        # Connections opened before the signal was connected (e.g. at startup).
+        for connection in connections.all(initialized_only=True):
+            _install_query_counter(None, connection)
+        started = time.perf_counter()
+        token = _queries.set([0])
+        try:
+            response = self.get_response(request)
+            self.observe(request, response, started)
+        finally:
+            _queries.reset(token)
+        return response
+
+    async def __acall__(self, request):
+        if self.is_metrics_request(request):
+            if not self.allowed(request):
+                return HttpResponseNotFound()
+            # Multiprocess mode reads one file per worker.
+            return await sync_to_async(render_metrics)()
+        started = time.perf_counter()
+        token = _queries.set([0])
+        try:
+            response = await self.get_response(request)
+            self.observe(request, response, started)
+        finally:
+            _queries.reset(token)
+        return response
+
+    def observe(self, request, response, started):
+        route = _route(request)
+        REQUEST_DURATION.labels(route, request.method).observe(time.perf_counter() - started)
+        RESPONSES.labels(route, request.method, str(response.status_code)).inc()
+        DB_QUERIES.labels(route).observe(_queries.get()[0])
+        update_writer_gauges()
+
+
+def cache_namespace(key):
+    key = str(key)
+    if key.startswith("django.contrib.sessions"):
+        return "session"
+    return key.split(":", 1)[0] if ":" in key else "other"
+
+
+class CountingCacheClient(DefaultClient):
+    """django-redis client that counts hits and misses per key namespace."""
+
+    def get(self, key, default=None, version=None, client=None):
+        value = super().get(key, default=_MISSING, version=version, client=client)
+        if value is _MISSING:
+            CACHE_REQUESTS.labels(cache_namespace(key), "miss").inc()
+            return default
+        CACHE_REQUESTS.labels(cache_namespace(key), "hit").inc()
+        return value
+
+    def get_many(self, keys, version=None, client=None):
+        keys = list(keys)
+        found = super().get_many(keys, version=version, client=client)
+        for key in keys:
+            CACHE_REQUESTS.labels(cache_namespace(key), "hit" if key in found else "miss").inc()
+        return found
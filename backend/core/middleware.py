@@ -1,10 +1,27 @@
+import ipaddress
 import logging
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.utils import timezone
 from django.utils.deprecation import MiddlewareMixin
+from django.utils.module_loading import import_string
 from django.http import HttpRequest, JsonResponse, HttpResponse
 from django.db import connection
 
+from .ip_bans import banned_ips
+from .log_buffer import BufferedLogWriter
+
 logger = logging.getLogger(__name__)
 
+traffic_log_writer = BufferedLogWriter(
+    "blog.TrafficLog",
+    max_queue=settings.TRAFFIC_LOG_QUEUE_SIZE,
+    batch_size=settings.TRAFFIC_LOG_BATCH_SIZE,
+    flush_interval=settings.TRAFFIC_LOG_FLUSH_INTERVAL,
+    on_flush=("blog.rollups.flush_hook", "blog.attacks.flush_hook", "blog.feed_hits.flush_hook"),
+)
+
 
 def get_client_ip(request: HttpRequest) -> str:
     x_forwarded_for = request.META.get("HTTP_X_FORWARDED_FOR")
@@ -13,23 +30,84 @@ def get_client_ip(request: HttpRequest) -> str:
     return request.META.get("REMOTE_ADDR", "")
 
 
-class BlockBannedIPMiddleware(MiddlewareMixin):
-    """Block requests from banned IPs before any other processing."""
+def get_proxy_ip(request: HttpRequest) -> str:
+    """
+    The client address as seen by our own nginx: its X-Real-IP, else the last
+    X-Forwarded-For hop (the one it appended), else REMOTE_ADDR. Unlike
+    get_client_ip, a client cannot choose this by sending its own headers.
+    """
+    real_ip = request.META.get("HTTP_X_REAL_IP", "").strip()
+    if real_ip:
+        return real_ip
+    x_forwarded_for = request.META.get("HTTP_X_FORWARDED_FOR")
+    if x_forwarded_for:
+        return x_forwarded_for.split(",")[-1].strip()
+    return request.META.get("REMOTE_ADDR", "")
+
+
+async def request_user(request):
+    """
+    `await request.auser()`, shared with request.user. Django caches the two
+    separately, so a request that used both would load the user twice.
+    """
+    if hasattr(request, "_cached_user"):
+        return request._cached_user
+    user = await request.auser()
+    request._cached_user = user
+    return user
+
+
+def _valid_ip_or_none(ip: str):
+    # A malformed X-Forwarded-For value must not fail a whole batched insert.
+    try:
+        return str(ipaddress.ip_address(ip))
+    except ValueError:
+        return None
+
+
+class NonBlockingMiddlewareMixin(MiddlewareMixin):
+    """
+    Under ASGI, MiddlewareMixin hands every process_request/process_response
+    call to a worker thread (sync_to_async). Subclasses whose hooks never do
+    I/O are called inline on the event loop instead.
+    """
+
+    async def __acall__(self, request):
+        response = None
+        if hasattr(self, "process_request"):
+            response = self.process_request(request)
+        response = response or await self.get_response(request)
+        if hasattr(self, "process_response"):
+            response = self.process_response(request, response)
+        return response
+
+
+class BlockBannedIPMiddleware(NonBlockingMiddlewareMixin):
+    """
+    Block requests from banned IPs before any other processing.
+    Checks an in-memory prefix table (core.ip_bans) so no DB query runs per request.
+    """
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        banned_ips.start()
 
     def process_request(self, request: HttpRequest):
-        ip = get_client_ip(request)
-        if not ip:
-            return None
-        try:
-            from blog.models import BannedIP
-            if BannedIP.objects.filter(ip_address=ip).exists():
-                return HttpResponse("Forbidden", status=403)
-        except Exception:
-            pass
+        # The proxy-set address: a leading X-Forwarded-For entry is the client's own.
+        ip = get_proxy_ip(request)
+        if ip and banned_ips.is_banned(ip):
+            return HttpResponse("Forbidden", status=403)
         return None
 
+    async def __acall__(self, request):
+        if banned_ips.loaded:
+            return await super().__acall__(request)
+        # Not loaded yet: is_banned() will query the DB, so leave the loop.
+        response = await sync_to_async(self.process_request)(request)
+        return response or await self.get_response(request)
+
 
-class CsrfExemptApiMiddleware(MiddlewareMixin):
+class CsrfExemptApiMiddleware(NonBlockingMiddlewareMixin):
     """
     CSRF middleware that exempts API endpoints from CSRF checks.
     This is safe for REST APIs that use session authentication.
@@ -60,55 +138,95 @@ class UnauthorizedAccessLoggingMiddleware(MiddlewareMixin):
         "/api/admin/login",
     ]
 
-    def process_request(self, request: HttpRequest):
-        if any(request.path.startswith(p) for p in self.ALLOWED_ANY_PATHS):
-            return None
-        if not any(request.path.startswith(path) for path in self.PROTECTED_API_PATHS):
-            return None
-        if request.user.is_authenticated:
-            return None
-        ip = get_client_ip(request)
-        logger.warning(
-            f"Unauthorized access attempt: {request.method} {request.path} "
-            f"from IP: {ip} User-Agent: {request.META.get('HTTP_USER_AGENT', 'Unknown')}"
-        )
+    def is_protected(self, path):
+        if any(path.startswith(p) for p in self.ALLOWED_ANY_PATHS):
+            return False
+        return any(path.startswith(p) for p in self.PROTECTED_API_PATHS)
+
+    def record_attempt(self, request):
+        from blog.attacks import record_attempt
+
+        ip = _valid_ip_or_none(get_proxy_ip(request))
+        user_agent = request.META.get("HTTP_USER_AGENT", "")
         try:
-            from blog.models import AuditLog
-            AuditLog.objects.create(
-                ip_address=ip,
-                path=request.path,
-                method=request.method,
-                action="unauthorized_attempt",
-                details={"user_agent": request.META.get("HTTP_USER_AGENT", "")[:500]},
-            )
+            hits = record_attempt(ip, request.method, request.path, user_agent)
         except Exception:
-            pass
+            logger.exception("Could not record unauthorized access attempt")
+            return
+        # One line per (ip, path, method) per flush, not per hit.
+        if hits == 1:
+            logger.warning(
+                "Unauthorized access attempt: %s %s from IP: %s User-Agent: %s",
+                request.method, request.path, ip, user_agent or "Unknown",
+            )
+
+    def process_request(self, request: HttpRequest):
+        if self.is_protected(request.path) and not request.user.is_authenticated:
+            self.record_attempt(request)
         # Do not return 401 here: let the view/DRF enforce auth (401/403)
         return None
 
+    async def __acall__(self, request):
+        if self.is_protected(request.path) and not (await request_user(request)).is_authenticated:
+            await sync_to_async(self.record_attempt)(request)
+        return await self.get_response(request)
+
 
 class TrafficLoggingMiddleware(MiddlewareMixin):
-    """Log API requests to TrafficLog for admin dashboard."""
+    """
+    Log API requests to TrafficLog for admin dashboard.
+    Rows are queued and bulk-inserted by a background writer (see
+    core.log_buffer) unless TRAFFIC_LOG_BUFFERED is off.
+    """
 
-    def process_response(self, request, response):
-        if not request.path.startswith("/api/"):
-            return response
-        ip = get_client_ip(request)
+    def entry(self, request, response):
+        return {
+            "ip_address": _valid_ip_or_none(get_proxy_ip(request)),
+            "path": request.path[:500],
+            "method": request.method[:10],
+            "status_code": response.status_code,
+            "user_agent": request.META.get("HTTP_USER_AGENT", "")[:500],
+            "created_at": timezone.now(),
+        }
+
+    def write(self, entry):
         try:
             from blog.models import TrafficLog
-            TrafficLog.objects.create(
-                ip_address=ip,
-                path=request.path,
-                method=request.method,
-                status_code=response.status_code,
-                user_agent=request.META.get("HTTP_USER_AGENT", "")[:500],
-            )
+            TrafficLog.objects.create(**entry)
         except Exception:
-            pass
+            return
+        # Same hooks as the buffered writer (rollup counters, attack log
+        # flushes), one row at a time.
+        for hook in traffic_log_writer.on_flush:
+            try:
+                import_string(hook)([entry])
+            except Exception:
+                logger.exception("TrafficLog flush hook %s failed", hook)
+
+    def process_response(self, request, response):
+        if not request.path.startswith("/api/"):
+            return response
+        entry = self.entry(request, response)
+        if settings.TRAFFIC_LOG_BUFFERED:
+            traffic_log_writer.enqueue(**entry)
+        else:
+            self.write(entry)
+        return response
+
+    async def __acall__(self, request):
+        response = await self.get_response(request)
+        if not request.path.startswith("/api/"):
+            return response
+        entry = self.entry(request, response)
+        if settings.TRAFFIC_LOG_BUFFERED:
+            # Queue insert only; the writer thread does the I/O.
+            traffic_log_writer.enqueue(**entry)
+        else:
+            await sync_to_async(self.write)(entry)
         return response
 
 
-class SecurityHeadersMiddleware(MiddlewareMixin):
+class SecurityHeadersMiddleware(NonBlockingMiddlewareMixin):
     """
     Add security headers to all responses and remove version information.
     """
@@ -0,0 +1,22 @@
+import orjson
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+
+from .renderers import ORJSONRenderer
+
+
+class ORJSONParser(JSONParser):
+    """JSONParser on orjson (REST_FRAMEWORK["DEFAULT_PARSER_CLASSES"])."""
+
+    renderer_class = ORJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        encoding = (parser_context or {}).get("encoding", settings.DEFAULT_CHARSET)
+        try:
+            body = stream.read()
+            if encoding.lower().replace("-", "") != "utf8":
+                body = body.decode(encoding)
+            return orjson.loads(body)
+        except (orjson.JSONDecodeError, UnicodeDecodeError) as exc:
+            raise ParseError("JSON parse error - %s" % str(exc))
@@ -0,0 +1,254 @@
+"""
+Opt-in request profiling, reported as a Server-Timing header.
+
+With SERVER_TIMING_SAMPLE_RATE > 0, settings puts ServerTimingMiddleware
+first in MIDDLEWARE and a TimingCheckpoint in front of every entry (see
+core.timing_chain). For a sampled request it records:
+
+- each middleware's own time (excluding everything it calls),
+- `view`: URL resolution, view middleware and the view itself,
+- `render`: response rendering (core.renderers.ORJSONRenderer),
+- `db` / `redis`: total time and number of queries / commands, via a
+  connection execute wrapper and the ProfiledRedis client class.
+
+The result goes out as `Server-Timing` (SERVER_TIMING_HEADER) and optionally
+as one INFO record on the `core.profiling` logger with the timings attached as
+`server_timing` (SERVER_TIMING_LOG). Unsampled requests only pay for a
+context variable lookup per middleware.
+"""
+import contextlib
+import contextvars
+import inspect
+import logging
+import random
+import time
+
+import redis
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+logger = logging.getLogger(__name__)
+
+_current = contextvars.ContextVar("request_profile", default=None)
+
+
+class Profile:
+    """Timings for one request: exclusive time per span plus DB/Redis totals."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.spans = {}
+        self.calls = {"db": [0, 0.0], "redis": [0, 0.0]}
+        # [label, started, time spent in nested spans]
+        self._stack = []
+
+    def push(self, label):
+        self.spans.setdefault(label, 0.0)
+        self._stack.append([label, time.perf_counter(), 0.0])
+
+    def pop(self):
+        label, started, nested = self._stack.pop()
+        elapsed = time.perf_counter() - started
+        self.spans[label] = self.spans.get(label, 0.0) + elapsed - nested
+        if self._stack:
+            self._stack[-1][2] += elapsed
+
+    def record(self, kind, seconds):
+        counter = self.calls[kind]
+        counter[0] += 1
+        counter[1] += seconds
+
+    def as_dict(self):
+        """{metric: {"ms": ..., "count": ...}} with `total` last."""
+        metrics = {label: {"ms": round(seconds * 1000, 3)} for label, seconds in self.spans.items()}
+        for kind, (count, seconds) in self.calls.items():
+            metrics[kind] = {"ms": round(seconds * 1000, 3), "count": count}
+        metrics["total"] = {"ms": round((time.perf_counter() - self.started) * 1000, 3)}
+        return metrics
+
+    def header(self, metrics=None):
+        parts = []
+        for name, metric in (metrics or self.as_dict()).items():
+            part = f"{name};dur={metric['ms']}"
+            if "count" in metric:
+                part += f';desc="{metric["count"]} {"queries" if name == "db" else "calls"}"'
+            parts.append(part)
+        return ", ".join(parts)
+
+
+def current():
+    """The sampled request's Profile, or None."""
+    return _current.get()
+
+
+@contextlib.contextmanager
+def span(label):
+    """Time a block as its own Server-Timing entry (no-op when not sampled)."""
+    profile = _current.get()
+    if profile is None:
+        yield
+        return
+    profile.push(label)
+    try:
+        yield
+    finally:
+        profile.pop()
+
+
+def _time_query(execute, sql, params, many, context):
+    profile = _current.get()
+    if profile is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        profile.record("db", time.perf_counter() - started)
+
+
+def _install_query_timer(sender, connection, **kwargs):
+    # Connections are per thread (and per request with the pool), so the
+    # wrapper is attached to each one as it connects.
+    if _time_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_time_query)
+
+
+def _install_on_open_connections():
+    # Connections opened before the signal was connected (e.g. at startup).
+    for connection in connections.all(initialized_only=True):
+        _install_query_timer(None, connection)
+
+
+class ProfiledRedis(redis.Redis):
+    """Redis client that counts commands (a pipeline counts once) for sampled requests."""
+
+    def execute_command(self, *args, **options):
+        profile = _current.get()
+        if profile is None:
+            return super().execute_command(*args, **options)
+        started = time.perf_counter()
+        try:
+            return super().execute_command(*args, **options)
+        finally:
+            profile.record("redis", time.perf_counter() - started)
+
+    def pipeline(self, transaction=True, shard_hint=None):
+        return ProfiledPipeline(self.connection_pool, self.response_callbacks, transaction, shard_hint)
+
+
+class ProfiledPipeline(redis.client.Pipeline):
+    def execute(self, raise_on_error=True):
+        profile = _current.get()
+        if profile is None:
+            return super().execute(raise_on_error)
+        started = time.perf_counter()
+        try:
+            return super().execute(raise_on_error)
+        finally:
+            profile.record("redis", time.perf_counter() - started)
+
+
+class ServerTimingMiddleware:
+    """Outermost middleware: samples requests and emits their timings."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+        connection_created.connect(_install_query_timer, dispatch_uid="core.profiling.query_timer")
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not self.sampled():
+            return self.get_response(request)
+        _install_on_open_connections()
+        profile = Profile()
+        token = _current.set(profile)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, profile)
+
+    async def __acall__(self, request):
+        if not self.sampled():
+            return await self.get_response(request)
+        profile = Profile()
+        token = _current.set(profile)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, profile)
+
+    def sampled(self):
+        rate = settings.SERVER_TIMING_SAMPLE_RATE
+        return rate >= 1 or (rate > 0 and random.random() < rate)
+
+    def finish(self, request, response, profile):
+        metrics = profile.as_dict()
+        if settings.SERVER_TIMING_HEADER:
+            response["Server-Timing"] = profile.header(metrics)
+        if settings.SERVER_TIMING_LOG:
+            logger.info(
+                "%s %s %s %.1fms", request.method, request.path, response.status_code, metrics["total"]["ms"],
+                extra={"server_timing": metrics},
+            )
+        return response
+
+
+class TimingCheckpoint:
+    """
+    Placed in front of every MIDDLEWARE entry and after the last one: times
+    whatever it calls (that middleware, or the view) as one span named after it.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.label = _label(get_response)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        profile = _current.get()
+        if profile is None:
+            return self.get_response(request)
+        profile.push(self.label)
+        try:
+            return self.get_response(request)
+        finally:
+            profile.pop()
+
+    async def __acall__(self, request):
+        profile = _current.get()
+        if profile is None:
+            return await self.get_response(request)
+        profile.push(self.label)
+        try:
+            return await self.get_response(request)
+        finally:
+            profile.pop()
+
+
+def _label(handler):
+    # Django hands each middleware the next one wrapped in exception handling
+    # (functools.wraps) and, across sync/async boundaries, in an adapter.
+    while True:
+        inner = getattr(handler, "__wrapped__", None) or getattr(handler, "func", None)
+        if inner is None:
+            break
+        handler = inner
+    if inspect.ismethod(handler):
+        return "view"  # BaseHandler._get_response(_async)
+    return type(handler).__name__
@@ -0,0 +1,101 @@
+"""
+Query budgets for tests: fail when a block runs too many queries or repeats
+one query shape (the N+1 pattern).
+
+    with QueryBudget(3):
+        client.get("/api/admin/audit/")
+
+    @QueryBudget(2, max_repeats=2)
+    def test_...
+
+Queries are recorded with an execute wrapper on the connection of the calling
+thread (so the sync test client, not AsyncClient requests). A query's shape is
+its SQL before parameters are bound, with IN lists collapsed, so the same
+lookup for different rows counts as one shape. On failure the error lists
+every query and, for each repeated shape, where in this project the second
+execution came from.
+"""
+import collections
+import os
+import re
+import traceback
+from contextlib import ContextDecorator
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+# Transaction bookkeeping repeats legitimately.
+IGNORED_SHAPES = re.compile(r"^(SAVEPOINT|RELEASE SAVEPOINT|ROLLBACK TO SAVEPOINT)\b")
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+def query_shape(sql):
+    sql = re.sub(r"\s+", " ", sql.strip())
+    return re.sub(r"%s(, %s)+", "%s, ...", sql)
+
+
+def _project_frames(stack):
+    root = str(settings.BASE_DIR)
+    return [
+        frame for frame in stack
+        if frame.filename.startswith(root) and frame.filename != __file__ and "site-packages" not in frame.filename
+    ]
+
+
+class QueryBudget(ContextDecorator):
+    """Allow at most `max_queries` queries, and each shape at most `max_repeats` times."""
+
+    def __init__(self, max_queries, max_repeats=1, using=DEFAULT_DB_ALIAS):
+        self.max_queries = max_queries
+        self.max_repeats = max_repeats
+        self.using = using
+        self.queries = []
+
+    def __enter__(self):
+        self.queries = []
+        connections[self.using].execute_wrappers.append(self._record)
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        # Removed by identity: Django's execute_wrapper() pops the last one,
+        # which is someone else's when a wrapper is installed on connect
+        # (metrics, profiling) inside the block.
+        connections[self.using].execute_wrappers.remove(self._record)
+        if exc_type is None:
+            self.check()
+        return False
+
+    def _record(self, execute, sql, params, many, context):
+        self.queries.append((sql, traceback.extract_stack()[:-1]))
+        return execute(sql, params, many, context)
+
+    def __len__(self):
+        return len(self.queries)
+
+    def repeated(self):
+        """{shape: [stacks]} for shapes run more than max_repeats times."""
+        stacks = collections.defaultdict(list)
+        for sql, stack in self.queries:
+            shape = query_shape(sql)
+            if not IGNORED_SHAPES.match(shape):
+                stacks[shape].append(stack)
+        return {shape: found for shape, found in stacks.items() if len(found) > self.max_repeats}
+
+    def check(self):
+        problems = []
+        if len(self.queries) > self.max_queries:
+            problems.append(f"{len(self.queries)} queries, budget is {self.max_queries}:")
+            problems.extend(f"  {n}. {query_shape(sql)}" for n, (sql, _) in enumerate(self.queries, 1))
+        for shape, stacks in self.repeated().items():
+            problems.append(f"Same query run {len(stacks)} times (N+1?): {shape}")
+            problems.append("  second run from:")
+            for frame in _project_frames(stacks[1]):
+                path = os.path.relpath(frame.filename, settings.BASE_DIR)
+                problems.append(f"    {path}:{frame.lineno} in {frame.name}")
+                if frame.line:
+                    problems.append(f"      {frame.line}")
+        if problems:
+            raise QueryBudgetExceeded("\n".join(problems))
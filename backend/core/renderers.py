@@ -0,0 +1,34 @@
+"""
+orjson-backed JSON rendering for DRF (REST_FRAMEWORK["DEFAULT_RENDERER_CLASSES"]).
+
+Compact UTF-8 output like DRF's JSONRenderer, several times faster, except
+that indentation is always 2 spaces and NaN/Infinity render as null.
+Datetimes, dates and UUIDs are encoded natively (UTC as "Z"), so fast-path
+list views can return raw values() rows.
+"""
+import orjson
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils import encoders
+
+from .profiling import span
+
+# Anything orjson does not know (Decimal, lazy strings, timedelta, ...) goes
+# through DRF's encoder, exactly as with JSONRenderer.
+_fallback = encoders.JSONEncoder().default
+
+
+class ORJSONRenderer(JSONRenderer):
+    options = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        option = self.options
+        if self.get_indent(accepted_media_type, renderer_context or {}):
+            option |= orjson.OPT_INDENT_2
+        with span("render"):
+            ret = orjson.dumps(data, default=_fallback, option=option)
+        # Keep JSONRenderer's guarantee that output is a strict JavaScript subset.
+        if b"\xe2\x80\xa8" in ret or b"\xe2\x80\xa9" in ret:
+            ret = ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(b"\xe2\x80\xa9", b"\\u2029")
+        return ret
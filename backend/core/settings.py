@@ -1,6 +1,8 @@
 import os
 from pathlib import Path
 
+from core.timing_chain import instrument_middleware
+
 BASE_DIR = Path(__file__).resolve().parent.parent
 
 SECRET_KEY = os.environ.get("DJANGO_SECRET_KEY", "dev-secret-key-change-me")
@@ -16,6 +18,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     "rest_framework",
     "blog",
 ]
@@ -54,6 +57,19 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = "core.wsgi.application"
+ASGI_APPLICATION = "core.asgi.application"
+
+# Database connections (DB_CONNECTIONS):
+#   "pool" (default) - per-process pool (core.db_backend / core.db_pool); works
+#       under both ASGI and WSGI workers. Size it per process: a sync worker
+#       serves one request at a time (plus the log writer and ban listener
+#       threads), an ASGI worker one per in-flight request. Keep
+#       gunicorn workers * DB_POOL_MAX_SIZE below Postgres max_connections.
+#   "persistent" - Django persistent connections (CONN_MAX_AGE) with health
+#       checks; SERVER_MODE=wsgi only, as ASGI runs each request in a new thread.
+#   "off" - a new connection per request.
+DB_CONNECTIONS = os.environ.get("DB_CONNECTIONS", "pool")
+SERVER_MODE = os.environ.get("SERVER_MODE", "asgi")
 
 DATABASES = {
     "default": {
@@ -63,8 +79,26 @@ DATABASES = {
         "PASSWORD": os.environ.get("POSTGRES_PASSWORD", "blogpassword"),
         "HOST": os.environ.get("POSTGRES_HOST", "internal_proxy"),
         "PORT": os.environ.get("POSTGRES_PORT", "5432"),
+        "OPTIONS": {
+            # Fail fast while internal_proxy restarts instead of hanging a worker.
+            "connect_timeout": int(os.environ.get("DB_CONNECT_TIMEOUT", "5")),
+        },
     }
 }
+if DB_CONNECTIONS == "pool":
+    DATABASES["default"]["ENGINE"] = "core.db_backend"
+    DATABASES["default"]["OPTIONS"]["pool"] = {
+        "max_size": int(os.environ.get("DB_POOL_MAX_SIZE", "4" if SERVER_MODE == "wsgi" else "20")),
+        # Seconds a request waits for a free connection before failing.
+        "timeout": float(os.environ.get("DB_POOL_TIMEOUT", "10")),
+        "max_idle": float(os.environ.get("DB_POOL_MAX_IDLE", "300")),
+        "max_lifetime": float(os.environ.get("DB_POOL_MAX_LIFETIME", "3600")),
+        # Connections idle longer than this get a SELECT 1 before reuse.
+        "check_idle": float(os.environ.get("DB_POOL_CHECK_IDLE", "30")),
+    }
+elif DB_CONNECTIONS == "persistent":
+    DATABASES["default"]["CONN_MAX_AGE"] = int(os.environ.get("DB_CONN_MAX_AGE", "60"))
+    DATABASES["default"]["CONN_HEALTH_CHECKS"] = True
 
 REDIS_HOST = os.environ.get("REDIS_HOST", "internal_proxy")
 REDIS_PORT = int(os.environ.get("REDIS_PORT", "6379"))
@@ -79,6 +113,109 @@ CACHES = {
     }
 }
 
+# Two-tier cache (core.tiered_cache): keys under CACHE_LOCAL_KEY_PREFIXES
+# (sessions and feed pages by default) are also kept in a per-worker LRU of
+# CACHE_LOCAL_MAX_ENTRIES values. Writes are broadcast over Redis pub/sub so
+# other workers drop their copy; none is served more than CACHE_LOCAL_TIMEOUT
+# seconds after being replaced, even if a notification is lost.
+CACHE_LOCAL_TIER = os.environ.get("CACHE_LOCAL_TIER", "1") == "1"
+if CACHE_LOCAL_TIER:
+    CACHES["default"]["BACKEND"] = "core.tiered_cache.TieredRedisCache"
+    CACHES["default"]["OPTIONS"].update({
+        "LOCAL_MAX_ENTRIES": int(os.environ.get("CACHE_LOCAL_MAX_ENTRIES", "10000")),
+        "LOCAL_TIMEOUT": float(os.environ.get("CACHE_LOCAL_TIMEOUT", "5")),
+        "LOCAL_KEY_PREFIXES": os.environ.get(
+            "CACHE_LOCAL_KEY_PREFIXES", "django.contrib.sessions.cache,feed:"
+        ).split(","),
+    })
+
+# Prometheus metrics (core.metrics): request latency, status and query-count
+# histograms per route, cache hit/miss counts and log writer queue depths.
+# METRICS_PATH is answered before any other middleware runs, and only to
+# direct (not proxied) clients in METRICS_ALLOWED_NETWORKS. Set
+# PROMETHEUS_MULTIPROC_DIR to aggregate across gunicorn workers.
+METRICS_ENABLED = os.environ.get("METRICS_ENABLED", "1") == "1"
+METRICS_PATH = os.environ.get("METRICS_PATH", "/metrics")
+METRICS_ALLOWED_NETWORKS = os.environ.get(
+    "METRICS_ALLOWED_NETWORKS", "127.0.0.0/8,::1/128,10.0.0.0/8,172.16.0.0/12,192.168.0.0/16"
+).split(",")
+if METRICS_ENABLED:
+    MIDDLEWARE.insert(0, "core.metrics.MetricsMiddleware")
+    CACHES["default"]["OPTIONS"]["CLIENT_CLASS"] = "core.metrics.CountingCacheClient"
+
+# Server-Timing instrumentation (core.profiling), off by default. A sampled
+# fraction of requests (0.0-1.0) gets per-middleware, view, render, DB and
+# Redis timings in a Server-Timing header and/or an INFO log record.
+SERVER_TIMING_SAMPLE_RATE = float(os.environ.get("SERVER_TIMING_SAMPLE_RATE", "0"))
+SERVER_TIMING_HEADER = os.environ.get("SERVER_TIMING_HEADER", "1") == "1"
+SERVER_TIMING_LOG = os.environ.get("SERVER_TIMING_LOG", "0") == "1"
+if SERVER_TIMING_SAMPLE_RATE > 0:
+    MIDDLEWARE = instrument_middleware(MIDDLEWARE)
+    CACHES["default"]["OPTIONS"]["REDIS_CLIENT_CLASS"] = "core.profiling.ProfiledRedis"
+
+# Traffic logging: rows are queued per worker and bulk-inserted by a background
+# thread. When the queue is full, entries are dropped (and counted) rather than
+# slowing requests down. Set TRAFFIC_LOG_BUFFERED=0 to insert synchronously.
+TRAFFIC_LOG_BUFFERED = os.environ.get("TRAFFIC_LOG_BUFFERED", "1") == "1"
+TRAFFIC_LOG_QUEUE_SIZE = int(os.environ.get("TRAFFIC_LOG_QUEUE_SIZE", "10000"))
+TRAFFIC_LOG_BATCH_SIZE = int(os.environ.get("TRAFFIC_LOG_BATCH_SIZE", "500"))
+TRAFFIC_LOG_FLUSH_INTERVAL = float(os.environ.get("TRAFFIC_LOG_FLUSH_INTERVAL", "1.0"))
+# Logged requests are also counted per minute in Redis (blog.rollups); the
+# background writer compacts closed minutes into TrafficRollup this often.
+TRAFFIC_ROLLUP_COMPACT_INTERVAL = int(os.environ.get("TRAFFIC_ROLLUP_COMPACT_INTERVAL", "60"))
+
+# created_at range partitioning for the log tables (blog.partitions). Run
+# `manage.py manage_log_partitions` at deploy and daily: it creates `premake`
+# intervals ahead and detaches partitions older than `retention_days`
+# (dropping them unless `archive` is set, in which case they stay as plain tables).
+LOG_PARTITIONS = {
+    "blog.TrafficLog": {
+        "interval": "day",
+        "retention_days": int(os.environ.get("TRAFFIC_LOG_RETENTION_DAYS", "30")),
+        "premake": 7,
+        "archive": os.environ.get("TRAFFIC_LOG_ARCHIVE", "0") == "1",
+    },
+    "blog.AuditLog": {
+        "interval": "week",
+        "retention_days": int(os.environ.get("AUDIT_LOG_RETENTION_DAYS", "365")),
+        "premake": 2,
+        "archive": os.environ.get("AUDIT_LOG_ARCHIVE", "1") == "1",
+    },
+}
+
+# Unauthorized attempts are counted in Redis per (ip, path, method) and
+# flushed into UnauthorizedAttempt rows (blog.attacks) every
+# ATTACK_LOG_FLUSH_INTERVAL seconds; hits less than ATTACK_LOG_WINDOW seconds
+# apart extend the same row.
+ATTACK_LOG_FLUSH_INTERVAL = int(os.environ.get("ATTACK_LOG_FLUSH_INTERVAL", "10"))
+ATTACK_LOG_WINDOW = int(os.environ.get("ATTACK_LOG_WINDOW", "600"))
+
+# Banned IPs are compiled into an in-memory table per worker; writes are
+# broadcast over Redis pub/sub so every worker reloads its copy.
+BANNED_IPS_PUBSUB = os.environ.get("BANNED_IPS_PUBSUB", "1") == "1"
+
+# Token buckets (core.throttling) in front of the endpoints that hash
+# passwords, as (burst, refill per minute). Logins are limited per client IP
+# and per username, registrations per IP.
+AUTH_THROTTLE_ENABLED = os.environ.get("AUTH_THROTTLE_ENABLED", "1") == "1"
+AUTH_THROTTLE_RATES = {
+    "login_ip": (
+        int(os.environ.get("LOGIN_THROTTLE_IP_BURST", "10")),
+        float(os.environ.get("LOGIN_THROTTLE_IP_PER_MINUTE", "5")),
+    ),
+    "login_username": (
+        int(os.environ.get("LOGIN_THROTTLE_USERNAME_BURST", "5")),
+        float(os.environ.get("LOGIN_THROTTLE_USERNAME_PER_MINUTE", "2")),
+    ),
+    "register_ip": (
+        int(os.environ.get("REGISTER_THROTTLE_IP_BURST", "5")),
+        float(os.environ.get("REGISTER_THROTTLE_IP_PER_MINUTE", "1")),
+    ),
+}
+
+# Largest list (or CSV row count) the admin bulk endpoints accept per request.
+ADMIN_BULK_MAX_ITEMS = int(os.environ.get("ADMIN_BULK_MAX_ITEMS", "5000"))
+
 # Use Redis for sessions
 SESSION_ENGINE = "django.contrib.sessions.backends.cache"
 SESSION_CACHE_ALIAS = "default"
@@ -131,11 +268,52 @@ REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [
         "rest_framework.authentication.SessionAuthentication",
     ],
+    # orjson in place of the stdlib json module; swap back to
+    # rest_framework.renderers.JSONRenderer / parsers.JSONParser if needed.
+    "DEFAULT_RENDERER_CLASSES": [
+        "core.renderers.ORJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+    "DEFAULT_PARSER_CLASSES": [
+        "core.parsers.ORJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ],
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.IsAuthenticatedOrReadOnly",
     ],
 }
 
+# Keyset pagination for post lists (blog.pagination.KeysetPagination)
+POSTS_PAGE_SIZE = int(os.environ.get("POSTS_PAGE_SIZE", "20"))
+POSTS_MAX_PAGE_SIZE = int(os.environ.get("POSTS_MAX_PAGE_SIZE", "100"))
+
+# Public feed pages are cached under a version key bumped on every Post write
+# (blog.feed_cache); the timeout only bounds how long orphaned pages linger.
+FEED_CACHE_TIMEOUT = int(os.environ.get("FEED_CACHE_TIMEOUT", "300"))
+# Scheme and host of the feed's `next` links (cached pages and snapshots are
+# shared by every request, so the request's own Host is not used).
+FEED_BASE_URL = os.environ.get("FEED_BASE_URL", "http://localhost")
+
+# Static snapshots of the first FEED_SNAPSHOT_PAGES pages of /api/posts/
+# (blog.snapshots), rewritten after each commit that changes a published post.
+# nginx serves them from FEED_SNAPSHOT_DIR, a volume shared with it; unset
+# disables them.
+FEED_SNAPSHOT_DIR = os.environ.get("FEED_SNAPSHOT_DIR", "")
+FEED_SNAPSHOT_PAGES = int(os.environ.get("FEED_SNAPSHOT_PAGES", "5"))
+# nginx logs the requests it answers from a snapshot to FEED_HITS_LOG; workers
+# read them into the traffic log, rollups and metrics (blog.feed_hits) every
+# FEED_HITS_INGEST_INTERVAL seconds. Unset leaves snapshot hits uncounted.
+FEED_HITS_LOG = os.environ.get("FEED_HITS_LOG", "")
+FEED_HITS_INGEST_INTERVAL = int(os.environ.get("FEED_HITS_INGEST_INTERVAL", "30"))
+
+# Rows fetched per round trip by the streaming log exports (blog.exports).
+EXPORT_CHUNK_SIZE = int(os.environ.get("EXPORT_CHUNK_SIZE", "2000"))
+
+# Traffic stats responses are cached per query (core.cache_fill): refreshed by
+# one request at a time while the others get the previous result. 0 disables.
+TRAFFIC_STATS_CACHE_TIMEOUT = int(os.environ.get("TRAFFIC_STATS_CACHE_TIMEOUT", "30"))
+
 # Security: Disable server header
 # This hides the Django/Gunicorn version from HTTP responses
 DISABLE_SERVER_HEADER = True
@@ -0,0 +1,171 @@
+"""
+Token-bucket throttling for the endpoints that hash passwords.
+
+`authenticate()` and `set_password()` run PBKDF2 on purpose, so a burst of
+login or registration attempts can tie up every worker. DRF checks throttles
+before the view runs, so a rejected request is answered with 429 before any
+hashing happens.
+
+Buckets live in Redis and are updated by a single Lua script, so all workers
+share them and a request is either admitted by every bucket (per client IP
+and, for logins, per username) or by none. The IP is the one our nginx saw
+(`get_proxy_ip`), not the client-supplied start of X-Forwarded-For. Each
+worker also remembers IPs that Redis has already locked out and turns them
+away without a Redis round trip until their bucket refills.
+"""
+import logging
+import threading
+import time
+
+from django.conf import settings
+from rest_framework.throttling import BaseThrottle
+
+from .middleware import get_proxy_ip
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "throttle:"
+
+# KEYS: one bucket per key. ARGV: capacity, refill rate (tokens/s) per key.
+# Takes one token from every bucket if all have one, otherwise takes nothing.
+# Returns {admitted (0/1), seconds until admitted (string), index of the
+# first empty bucket (1-based, 0 if admitted)}.
+TOKEN_BUCKET_LUA = """
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local tokens = {}
+local wait, blocked = 0, 0
+for i, key in ipairs(KEYS) do
+    local capacity = tonumber(ARGV[2 * i - 1])
+    local rate = tonumber(ARGV[2 * i])
+    local state = redis.call('HMGET', key, 'tokens', 'ts')
+    local level = tonumber(state[1]) or capacity
+    local since = tonumber(state[2]) or now
+    level = math.min(capacity, level + math.max(0, now - since) * rate)
+    tokens[i] = level
+    if level < 1 then
+        local needed = (1 - level) / rate
+        if needed > wait then
+            wait = needed
+        end
+        if blocked == 0 then
+            blocked = i
+        end
+    end
+end
+if blocked > 0 then
+    return {0, tostring(wait), blocked}
+end
+for i, key in ipairs(KEYS) do
+    local capacity = tonumber(ARGV[2 * i - 1])
+    local rate = tonumber(ARGV[2 * i])
+    redis.call('HSET', key, 'tokens', tokens[i] - 1, 'ts', now)
+    redis.call('PEXPIRE', key, math.ceil(capacity / rate * 1000))
+end
+return {1, '0', 0}
+"""
+
+
+def _redis():
+    from django_redis import get_redis_connection
+    return get_redis_connection("default")
+
+
+class LocalLockouts:
+    """Per-worker memory of IPs Redis has rejected, until their bucket refills."""
+
+    MAX_ENTRIES = 10000
+
+    def __init__(self):
+        self._until = {}
+        self._lock = threading.Lock()
+
+    def remaining(self, key):
+        until = self._until.get(key)
+        if until is None:
+            return 0.0
+        left = until - time.monotonic()
+        if left <= 0:
+            with self._lock:
+                self._until.pop(key, None)
+            return 0.0
+        return left
+
+    def lock(self, key, seconds):
+        now = time.monotonic()
+        with self._lock:
+            if len(self._until) >= self.MAX_ENTRIES:
+                self._until = {k: t for k, t in self._until.items() if t > now}
+                if len(self._until) >= self.MAX_ENTRIES:
+                    self._until.clear()
+            self._until[key] = now + seconds
+
+    def clear(self):
+        with self._lock:
+            self._until.clear()
+
+
+local_lockouts = LocalLockouts()
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """
+    Throttle `scope` using settings.AUTH_THROTTLE_RATES["<scope>_ip"] and,
+    when `username_field` is set, ["<scope>_username"]: (burst, per minute).
+    """
+
+    scope = None
+    username_field = None
+
+    def __init__(self):
+        self._wait = None
+
+    def buckets(self, request):
+        rates = settings.AUTH_THROTTLE_RATES
+        buckets = [(f"{KEY_PREFIX}{self.scope}:ip:{get_proxy_ip(request)}", rates[f"{self.scope}_ip"])]
+        if self.username_field:
+            username = str(request.data.get(self.username_field) or "").strip().lower()[:150]
+            if username:
+                buckets.append((f"{KEY_PREFIX}{self.scope}:user:{username}", rates[f"{self.scope}_username"]))
+        return buckets
+
+    def allow_request(self, request, view):
+        if not settings.AUTH_THROTTLE_ENABLED:
+            return True
+        ip_key = f"{self.scope}:{get_proxy_ip(request)}"
+        remaining = local_lockouts.remaining(ip_key)
+        if remaining:
+            self._wait = remaining
+            return False
+        buckets = self.buckets(request)
+        args = []
+        for _, (burst, per_minute) in buckets:
+            args.extend([burst, per_minute / 60.0])
+        try:
+            admitted, wait, blocked = _redis().eval(
+                TOKEN_BUCKET_LUA, len(buckets), *[key for key, _ in buckets], *args
+            )
+        except Exception:
+            # Failing closed would lock everyone out whenever Redis blips.
+            logger.warning("Auth throttle unavailable; admitting %s request", self.scope)
+            return True
+        if admitted:
+            return True
+        self._wait = float(wait)
+        if blocked == 1:
+            local_lockouts.lock(ip_key, self._wait)
+        return False
+
+    def wait(self):
+        return self._wait
+
+
+class LoginThrottle(TokenBucketThrottle):
+    """User and admin logins share one budget per IP and per username."""
+
+    scope = "login"
+    username_field = "username"
+
+
+class RegisterThrottle(TokenBucketThrottle):
+    scope = "register"
@@ -0,0 +1,299 @@
+"""
+Two-tier cache backend: a bounded per-worker LRU in front of django-redis.
+
+    CACHES = {"default": {
+        "BACKEND": "core.tiered_cache.TieredRedisCache",
+        "LOCATION": "redis://...",
+        "OPTIONS": {"LOCAL_MAX_ENTRIES": 10000, "LOCAL_TIMEOUT": 5},
+    }}
+
+Reads try the worker's own copy first and fall back to Redis, keeping what
+they found for LOCAL_TIMEOUT seconds; a copy may outlive the key's remaining
+Redis TTL by up to that long. Every write through this backend (set, add,
+delete, incr, clear, ...) drops the local copy, including the writer's own
+(the next read refills it), and publishes the key on a Redis channel; a
+listener thread in each worker drops its copy on receipt. While a
+worker's listener is not subscribed (starting up, Redis restarting) its local
+tier is bypassed, and it is emptied on every (re)subscribe. So no worker
+serves a value more than LOCAL_TIMEOUT seconds after it was replaced, even if
+a notification is lost; normally it is a few milliseconds.
+
+Values are kept pickled (immutable scalars as they are), so a caller that
+mutates what it got back, as the session store does, never changes the copy
+other requests see. LOCAL_KEY_PREFIXES restricts the local tier to matching
+keys; everything else goes straight to Redis and its writes are not
+broadcast. Writes made around this backend (raw Redis clients, other
+applications) are only picked up when the local copy expires.
+"""
+import collections
+import logging
+import pickle
+import threading
+import time
+import uuid
+
+import orjson
+from asgiref.sync import sync_to_async
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django_redis.cache import RedisCache
+
+from .metrics import LOCAL_CACHE_REQUESTS, cache_namespace
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+# Returned as they are; anything else is unpickled afresh for every caller.
+_IMMUTABLE = (str, bytes, int, float, bool, type(None))
+
+
+class LocalTier:
+    """One worker's LRU for one Redis location, kept honest by a pub/sub listener."""
+
+    def __init__(self, channel, max_entries, timeout):
+        self.channel = channel
+        self.max_entries = max_entries
+        self.timeout = timeout
+        self.origin = uuid.uuid4().hex
+        # Bumped on every invalidation; a read that raced one is not cached.
+        self.generation = 0
+        self.subscribed = threading.Event()
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0, "invalidations": 0}
+        self._entries = collections.OrderedDict()  # key: (expires, value, pickled)
+        self._lock = threading.Lock()
+        self._listener = None
+
+    def __len__(self):
+        return len(self._entries)
+
+    def start(self, redis_client):
+        """Start the invalidation listener once per process; `redis_client()` returns a client."""
+        if self._listener is not None:
+            return
+        with self._lock:
+            if self._listener is None:
+                self._listener = threading.Thread(
+                    target=self._listen, args=(redis_client,), name="tiered-cache-listener", daemon=True
+                )
+                self._listener.start()
+
+    def get(self, key):
+        if not self.subscribed.is_set():
+            return _MISSING
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= time.monotonic():
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.stats["misses"] += 1
+                return _MISSING
+            self._entries.move_to_end(key)
+            self.stats["hits"] += 1
+        _, value, pickled = entry
+        return pickle.loads(value) if pickled else value
+
+    def put(self, key, value, generation):
+        """Keep `value` unless an invalidation arrived since `generation` was read."""
+        if not self.subscribed.is_set() or generation != self.generation:
+            return
+        expires = time.monotonic() + self.timeout
+        pickled = not isinstance(value, _IMMUTABLE)
+        entry = (expires, pickle.dumps(value, pickle.HIGHEST_PROTOCOL) if pickled else value, pickled)
+        with self._lock:
+            if generation != self.generation:
+                return
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats["evictions"] += 1
+
+    def invalidate(self, keys=None):
+        """Drop `keys`, or everything when None."""
+        with self._lock:
+            self.generation += 1
+            self.stats["invalidations"] += 1
+            if keys is None:
+                self._entries.clear()
+            else:
+                for key in keys:
+                    self._entries.pop(key, None)
+
+    def publish(self, client, keys=None):
+        try:
+            client.publish(self.channel, orjson.dumps({"origin": self.origin, "keys": keys}))
+        except Exception:
+            logger.warning("Could not publish cache invalidation; other workers expire their copies")
+
+    def _listen(self, redis_client):
+        backoff = 1.0
+        while True:
+            try:
+                pubsub = redis_client().pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self.channel)
+                # Anything published while unsubscribed was missed.
+                self.invalidate()
+                self.subscribed.set()
+                backoff = 1.0
+                for message in pubsub.listen():
+                    notice = orjson.loads(message["data"])
+                    if notice["origin"] != self.origin:
+                        self.invalidate(notice["keys"])
+            except Exception:
+                self.subscribed.clear()
+                logger.warning("Cache invalidation listener disconnected; retrying in %.0fs", backoff)
+                time.sleep(backoff)
+                backoff = min(backoff * 2, 30.0)
+
+
+_tiers = {}
+_tiers_lock = threading.Lock()
+
+
+def local_tier(channel, max_entries, timeout):
+    """The process-wide tier for `channel` (backend instances are per thread)."""
+    with _tiers_lock:
+        if channel not in _tiers:
+            _tiers[channel] = LocalTier(channel, max_entries, timeout)
+        return _tiers[channel]
+
+
+def all_tiers():
+    return dict(_tiers)
+
+
+class TieredRedisCache(RedisCache):
+    """django-redis cache with a per-worker local tier (see module docstring)."""
+
+    def __init__(self, server, params):
+        super().__init__(server, params)
+        options = params.get("OPTIONS", {})
+        self.local_prefixes = tuple(options.get("LOCAL_KEY_PREFIXES", ()))
+        # Pub/sub ignores database numbers, so the channel names the location.
+        self.local = local_tier(
+            options.get("LOCAL_CHANNEL", f"cache:invalidate:{server}"),
+            int(options.get("LOCAL_MAX_ENTRIES", 10000)),
+            float(options.get("LOCAL_TIMEOUT", 5)),
+        )
+        self.local.start(lambda: self.client.get_client(write=True))
+
+    def _tiered(self, key):
+        return not self.local_prefixes or str(key).startswith(self.local_prefixes)
+
+    def _lookup(self, key, version):
+        value = self.local.get(self.make_key(key, version))
+        LOCAL_CACHE_REQUESTS.labels(cache_namespace(key), "miss" if value is _MISSING else "hit").inc()
+        return value
+
+    def _fetch(self, key, default, version):
+        generation = self.local.generation
+        value = super().get(key, _MISSING, version)
+        if value is _MISSING:
+            return default
+        self.local.put(self.make_key(key, version), value, generation)
+        return value
+
+    def _written(self, keys, version=None):
+        keys = [key for key in keys if self._tiered(key)]
+        if keys:
+            keys = [self.make_key(key, version) for key in keys]
+            self.local.invalidate(keys)
+            self.local.publish(self.client.get_client(write=True), keys)
+
+    def get(self, key, default=None, version=None, client=None):
+        if client is not None or not self._tiered(key):
+            return super().get(key, default, version, client)
+        value = self._lookup(key, version)
+        return self._fetch(key, default, version) if value is _MISSING else value
+
+    async def aget(self, key, default=None, version=None):
+        # A local hit is answered without the hop to a sync thread.
+        if not self._tiered(key):
+            return await super().aget(key, default, version)
+        value = self._lookup(key, version)
+        if value is _MISSING:
+            return await sync_to_async(self._fetch)(key, default, version)
+        return value
+
+    def get_many(self, keys, version=None, client=None):
+        found, remote = {}, []
+        for key in keys:
+            value = self._lookup(key, version) if client is None and self._tiered(key) else _MISSING
+            if value is _MISSING:
+                remote.append(key)
+            else:
+                found[key] = value
+        if remote:
+            generation = self.local.generation
+            fetched = super().get_many(remote, version=version, client=client)
+            for key, value in fetched.items():
+                if self._tiered(key):
+                    self.local.put(self.make_key(key, version), value, generation)
+            found.update(fetched)
+        return found
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None, client=None, nx=False, xx=False):
+        # Not kept locally: another worker's invalidation for the key could
+        # arrive between this write and the put, leaving an older value here.
+        result = super().set(key, value, timeout, version, client, nx, xx)
+        self._written([key], version)
+        return result
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None, client=None):
+        result = super().add(key, value, timeout, version, client)
+        if result:
+            self._written([key], version)
+        return result
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None, client=None):
+        result = super().set_many(data, timeout, version, client)
+        self._written(list(data), version)
+        return result
+
+    def delete(self, key, version=None, prefix=None, client=None):
+        result = super().delete(key, version=version, prefix=prefix, client=client)
+        self._written([key], version)
+        return result
+
+    def delete_many(self, keys, version=None, client=None):
+        keys = list(keys)
+        result = super().delete_many(keys, version=version, client=client)
+        self._written(keys, version)
+        return result
+
+    def incr(self, key, delta=1, version=None, client=None, ignore_key_check=False):
+        result = super().incr(key, delta, version, client, ignore_key_check)
+        self._written([key], version)
+        return result
+
+    def decr(self, key, delta=1, version=None, client=None):
+        result = super().decr(key, delta, version, client)
+        self._written([key], version)
+        return result
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None, client=None):
+        result = super().touch(key, timeout, version, client)
+        self._written([key], version)
+        return result
+
+    def expire(self, key, timeout, version=None, client=None):
+        result = super().expire(key, timeout, version, client)
+        self._written([key], version)
+        return result
+
+    def persist(self, key, version=None, client=None):
+        result = super().persist(key, version, client)
+        self._written([key], version)
+        return result
+
+    def delete_pattern(self, *args, **kwargs):
+        result = super().delete_pattern(*args, **kwargs)
+        self.local.invalidate()
+        self.local.publish(self.client.get_client(write=True))
+        return result
+
+    def clear(self):
+        result = super().clear()
+        self.local.invalidate()
+        self.local.publish(self.client.get_client(write=True))
+        return result
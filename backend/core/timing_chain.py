@@ -0,0 +1,14 @@
+"""
+The instrumented MIDDLEWARE list for core.profiling.
+
+Kept free of Django imports so settings can build it when
+SERVER_TIMING_SAMPLE_RATE is set.
+"""
+
+
+def instrument_middleware(paths):
+    """MIDDLEWARE with ServerTimingMiddleware first and a TimingCheckpoint around every entry."""
+    timed = []
+    for path in paths:
+        timed += ["core.profiling.TimingCheckpoint", path]
+    return ["core.profiling.ServerTimingMiddleware", *timed, "core.profiling.TimingCheckpoint"]
@@ -0,0 +1,7 @@
+from uvicorn.workers import UvicornWorker
+
+
+class HardenedUvicornWorker(UvicornWorker):
+    """Uvicorn worker for gunicorn without the `Server: uvicorn` header."""
+
+    CONFIG_KWARGS = {**UvicornWorker.CONFIG_KWARGS, "server_header": False}
@@ -1,8 +1,18 @@
 # Gunicorn configuration file - security hardening
+import os
 
 bind = "0.0.0.0:8000"
 workers = 2
-worker_class = "sync"
+
+# ASGI by default: uvicorn workers serve the async views (core.async_api) on
+# an event loop, so a slow DB/Redis round trip no longer holds a whole
+# worker. SERVER_MODE=wsgi restores the classic sync workers.
+if os.environ.get("SERVER_MODE", "asgi") == "wsgi":
+    wsgi_app = "core.wsgi:application"
+    worker_class = "sync"
+else:
+    wsgi_app = "core.asgi:application"
+    worker_class = "core.workers.HardenedUvicornWorker"
 timeout = 30
 keepalive = 65
 accesslog = "/dev/null"
@@ -14,3 +24,28 @@ import gunicorn
 gunicorn.SERVER_SOFTWARE = ""
 
 # Remove Server header (Django SecurityHeadersMiddleware also strips it from response)
+
+
+# Metrics (core.metrics) are shared between workers through files here.
+# Clear them on startup so counters begin at zero with the new master.
+os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", "/tmp/prometheus_multiproc")
+
+
+def on_starting(server):
+    import shutil
+
+    path = os.environ["PROMETHEUS_MULTIPROC_DIR"]
+    shutil.rmtree(path, ignore_errors=True)
+    os.makedirs(path, exist_ok=True)
+
+
+def child_exit(server, worker):
+    # Drop the dead worker's live gauges (queue depths) from /metrics.
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead(worker.pid)
+
+
+def worker_exit(server, worker):
+    # Flush buffered TrafficLog rows before the worker goes away.
+    from core.log_buffer import shutdown_all
+    shutdown_all()
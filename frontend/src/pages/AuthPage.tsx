@@ -63,6 +63,10 @@ export const AuthPage = ({ apiBase, onAuthSuccess }: Props) => {
         }),
         credentials: "include",
       });
+      if (res.status === 429) {
+        setError("Too many login attempts. Please wait a moment and try again.");
+        return;
+      }
       if (!res.ok) {
         setError("Invalid credentials");
         return;
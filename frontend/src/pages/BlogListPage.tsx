@@ -3,26 +3,42 @@ import { useEffect, useState } from "react";
 interface BlogPost {
   id: number;
   title: string;
-  content: string;
+  excerpt: string;
+  word_count: number;
   author_username: string;
   created_at: string;
 }
 
+interface PostPage {
+  next: string | null;
+  results: BlogPost[];
+}
+
 interface Props {
   apiBase: string;
 }
 
+// The API returns an absolute `next` URL; only its query (the cursor) is
+// reused so requests keep going through apiBase.
+const nextQuery = (next: string | null) =>
+  next ? new URL(next, window.location.origin).search : null;
+
 export const BlogListPage = ({ apiBase }: Props) => {
   const [posts, setPosts] = useState<BlogPost[]>([]);
+  const [next, setNext] = useState<string | null>(null);
   const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
+  // Full text is only fetched from /posts/<id>/ when a reader expands a post.
+  const [expanded, setExpanded] = useState<Record<number, string>>({});
 
   useEffect(() => {
     const load = async () => {
       try {
         const res = await fetch(`${apiBase}/posts/`);
         if (res.ok) {
-          const data = await res.json();
-          setPosts(data);
+          const data: PostPage = await res.json();
+          setPosts(data.results);
+          setNext(nextQuery(data.next));
         }
       } finally {
         setLoading(false);
@@ -31,6 +47,29 @@ export const BlogListPage = ({ apiBase }: Props) => {
     load();
   }, [apiBase]);
 
+  const loadMore = async () => {
+    if (!next) return;
+    setLoadingMore(true);
+    try {
+      const res = await fetch(`${apiBase}/posts/${next}`);
+      if (res.ok) {
+        const data: PostPage = await res.json();
+        setPosts((current) => [...current, ...data.results]);
+        setNext(nextQuery(data.next));
+      }
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
+  const readMore = async (id: number) => {
+    const res = await fetch(`${apiBase}/posts/${id}/`);
+    if (res.ok) {
+      const data = await res.json();
+      setExpanded((current) => ({ ...current, [id]: data.content }));
+    }
+  };
+
   return (
     <section>
       <h1 className="page-title">Latest published blogs</h1>
@@ -49,11 +88,12 @@ export const BlogListPage = ({ apiBase }: Props) => {
             <article key={post.id} className="card blog-card">
               <h2>{post.title}</h2>
               <p className="muted">by {post.author_username}</p>
-              <p className="snippet">
-                {post.content.length > 200
-                  ? post.content.slice(0, 200) + "..."
-                  : post.content}
-              </p>
+              <p className="snippet">{expanded[post.id] ?? post.excerpt}</p>
+              {expanded[post.id] === undefined && post.excerpt.endsWith("…") && (
+                <button className="btn-small" onClick={() => readMore(post.id)}>
+                  Read more ({post.word_count} words)
+                </button>
+              )}
               <p className="meta">
                 {new Date(post.created_at).toLocaleString(undefined, {
                   dateStyle: "medium",
@@ -64,6 +104,13 @@ export const BlogListPage = ({ apiBase }: Props) => {
           ))}
         </div>
       )}
+      {next && (
+        <div className="centered">
+          <button className="btn-outline" onClick={loadMore} disabled={loadingMore}>
+            {loadingMore ? "Loading..." : "Load more"}
+          </button>
+        </div>
+      )}
     </section>
   );
 };
@@ -7,14 +7,29 @@ interface Post {
   published: boolean;
 }
 
+// List rows carry an excerpt only; full content comes from the detail endpoint.
+type PostSummary = Omit<Post, "content">;
+
+interface PostPage {
+  next: string | null;
+  results: PostSummary[];
+}
+
 interface Props {
   apiBase: string;
 }
 
+const nextQuery = (next: string | null) =>
+  next ? new URL(next, window.location.origin).search : null;
+
 export const DashboardPage = ({ apiBase }: Props) => {
   const [profile, setProfile] = useState<{ display_name?: string; bio?: string }>({});
-  const [posts, setPosts] = useState<Post[]>([]);
+  const [posts, setPosts] = useState<PostSummary[]>([]);
+  const [nextPosts, setNextPosts] = useState<string | null>(null);
   const [editing, setEditing] = useState<Post | null>(null);
+  // ETag of the post being edited; sent as If-Match so a stale edit is refused.
+  const [editingEtag, setEditingEtag] = useState<string | null>(null);
+  const [postError, setPostError] = useState<string | null>(null);
   const [form, setForm] = useState({ title: "", content: "", published: true });
   const [saving, setSaving] = useState(false);
 
@@ -27,7 +42,19 @@ export const DashboardPage = ({ apiBase }: Props) => {
       setProfile(await meRes.json());
     }
     if (postsRes.ok) {
-      setPosts(await postsRes.json());
+      const data: PostPage = await postsRes.json();
+      setPosts(data.results);
+      setNextPosts(nextQuery(data.next));
+    }
+  };
+
+  const loadMorePosts = async () => {
+    if (!nextPosts) return;
+    const res = await fetch(`${apiBase}/my-posts/${nextPosts}`, { credentials: "include" });
+    if (res.ok) {
+      const data: PostPage = await res.json();
+      setPosts((current) => [...current, ...data.results]);
+      setNextPosts(nextQuery(data.next));
     }
   };
 
@@ -37,11 +64,18 @@ export const DashboardPage = ({ apiBase }: Props) => {
 
   const startCreate = () => {
     setEditing(null);
+    setEditingEtag(null);
+    setPostError(null);
     setForm({ title: "", content: "", published: true });
   };
 
-  const startEdit = (post: Post) => {
+  const startEdit = async (summary: PostSummary) => {
+    const res = await fetch(`${apiBase}/my-posts/${summary.id}/`, { credentials: "include" });
+    if (!res.ok) return;
+    const post: Post = await res.json();
     setEditing(post);
+    setEditingEtag(res.headers.get("ETag"));
+    setPostError(null);
     setForm({
       title: post.title,
       content: post.content,
@@ -62,15 +96,19 @@ export const DashboardPage = ({ apiBase }: Props) => {
         ? `${apiBase}/my-posts/${editing.id}/`
         : `${apiBase}/my-posts/`;
       const method = editing ? "PUT" : "POST";
+      const headers: Record<string, string> = { "Content-Type": "application/json" };
+      if (editing && editingEtag) headers["If-Match"] = editingEtag;
       const res = await fetch(url, {
         method,
-        headers: { "Content-Type": "application/json" },
+        headers,
         body: JSON.stringify(payload),
         credentials: "include",
       });
       if (res.ok) {
         await loadProfileAndPosts();
         startCreate();
+      } else if (res.status === 412) {
+        setPostError("This post was changed elsewhere since you opened it. Reopen it to get the latest version.");
       }
     } finally {
       setSaving(false);
@@ -149,6 +187,7 @@ export const DashboardPage = ({ apiBase }: Props) => {
               />
               <span>Publish immediately</span>
             </label>
+            {postError && <div className="error">{postError}</div>}
             <button className="btn-primary" type="submit" disabled={saving}>
               {saving ? "Saving..." : editing ? "Update blog" : "Publish blog"}
             </button>
@@ -177,6 +216,11 @@ export const DashboardPage = ({ apiBase }: Props) => {
             ))}
           </ul>
         )}
+        {nextPosts && (
+          <button className="btn-small" onClick={loadMorePosts}>
+            Load more
+          </button>
+        )}
       </div>
     </section>
   );
@@ -2,26 +2,56 @@ import { useState, useEffect } from "react";
 
 const API_BASE = import.meta.env.VITE_API_BASE || "/api";
 
-interface Log {
+interface Attempt {
   id: number;
   ip_address: string | null;
   path: string;
   method: string;
-  details: Record<string, unknown>;
-  created_at: string | null;
+  hits: number;
+  first_seen: string;
+  last_seen: string;
+  user_agents: string[];
+}
+
+interface AttemptPage {
+  next: string | null;
+  results: Attempt[];
 }
 
 export const AdminAttacks = () => {
-  const [logs, setLogs] = useState<Log[]>([]);
+  const [logs, setLogs] = useState<Attempt[]>([]);
+  const [next, setNext] = useState<string | null>(null);
   const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
+
+  const fetchPage = async (query: string): Promise<AttemptPage | null> => {
+    const res = await fetch(`${API_BASE}/admin/attacks/${query}`, { credentials: "include" });
+    return res.ok ? res.json() : null;
+  };
 
   useEffect(() => {
-    fetch(`${API_BASE}/admin/attacks/?limit=100`, { credentials: "include" })
-      .then((r) => r.ok ? r.json() : [])
-      .then(setLogs)
+    fetchPage("?limit=100")
+      .then((data) => {
+        setLogs(data ? data.results : []);
+        setNext(data ? data.next : null);
+      })
       .finally(() => setLoading(false));
   }, []);
 
+  const loadMore = async () => {
+    if (!next) return;
+    setLoadingMore(true);
+    try {
+      const data = await fetchPage(new URL(next, window.location.origin).search);
+      if (data) {
+        setLogs((current) => [...current, ...data.results]);
+        setNext(data.next);
+      }
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   if (loading) return <div className="admin-loading"><div className="spinner" /></div>;
 
   return (
@@ -30,21 +60,30 @@ export const AdminAttacks = () => {
       <div className="admin-table-wrap">
         <table className="admin-table">
           <thead>
-            <tr><th>Time</th><th>IP</th><th>Method</th><th>Path</th><th>Details</th></tr>
+            <tr><th>Last seen</th><th>First seen</th><th>Hits</th><th>IP</th><th>Method</th><th>Path</th><th>User agents</th></tr>
           </thead>
           <tbody>
             {logs.map((l) => (
               <tr key={l.id}>
-                <td>{l.created_at ? new Date(l.created_at).toLocaleString() : "—"}</td>
+                <td>{new Date(l.last_seen).toLocaleString()}</td>
+                <td>{new Date(l.first_seen).toLocaleString()}</td>
+                <td>{l.hits}</td>
                 <td>{l.ip_address ?? "—"}</td>
                 <td>{l.method}</td>
                 <td><code>{l.path}</code></td>
-                <td className="muted">{l.details && (l.details as { user_agent?: string }).user_agent ? String((l.details as { user_agent?: string }).user_agent).slice(0, 60) + "…" : "—"}</td>
+                <td className="muted">{l.user_agents.length ? l.user_agents.map((ua) => ua.slice(0, 60)).join(", ") : "—"}</td>
               </tr>
             ))}
           </tbody>
         </table>
       </div>
+      {next && (
+        <div className="centered">
+          <button className="btn-outline" onClick={loadMore} disabled={loadingMore}>
+            {loadingMore ? "Loading..." : "Load more"}
+          </button>
+        </div>
+      )}
     </div>
   );
 };
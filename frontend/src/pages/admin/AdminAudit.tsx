@@ -14,22 +14,84 @@ interface Log {
   created_at: string | null;
 }
 
+interface LogPage {
+  next: string | null;
+  results: Log[];
+}
+
+const emptyFilters = { action: "", user: "", ip: "" };
+
 export const AdminAudit = () => {
   const [logs, setLogs] = useState<Log[]>([]);
+  const [next, setNext] = useState<string | null>(null);
+  const [filters, setFilters] = useState(emptyFilters);
+  const [applied, setApplied] = useState(emptyFilters);
   const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
+
+  const fetchPage = async (url: string): Promise<LogPage | null> => {
+    const res = await fetch(url, { credentials: "include" });
+    return res.ok ? res.json() : null;
+  };
 
   useEffect(() => {
-    fetch(`${API_BASE}/admin/audit/?limit=100`, { credentials: "include" })
-      .then((r) => r.ok ? r.json() : [])
-      .then(setLogs)
+    const params = new URLSearchParams({ limit: "100" });
+    Object.entries(applied).forEach(([key, value]) => value && params.set(key, value));
+    setLoading(true);
+    fetchPage(`${API_BASE}/admin/audit/?${params}`)
+      .then((data) => {
+        setLogs(data ? data.results : []);
+        setNext(data ? data.next : null);
+      })
       .finally(() => setLoading(false));
-  }, []);
+  }, [applied]);
+
+  const loadMore = async () => {
+    if (!next) return;
+    setLoadingMore(true);
+    try {
+      // `next` is absolute; keep only the path and query so API_BASE proxies apply.
+      const url = new URL(next, window.location.origin);
+      const data = await fetchPage(`${API_BASE}/admin/audit/${url.search}`);
+      if (data) {
+        setLogs((current) => [...current, ...data.results]);
+        setNext(data.next);
+      }
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
+  // Streams the whole filtered log; the browser saves it as a file.
+  const exportUrl = (format: string) => {
+    const params = new URLSearchParams({ format, gzip: "1" });
+    Object.entries(applied).forEach(([key, value]) => value && params.set(key, value));
+    return `${API_BASE}/admin/audit/export/?${params}`;
+  };
 
   if (loading) return <div className="admin-loading"><div className="spinner" /></div>;
 
   return (
     <div className="admin-section">
-      <h2>Audit log (user actions &amp; events)</h2>
+      <div className="admin-section-header">
+        <h2>Audit log (user actions &amp; events)</h2>
+        <div className="admin-form-actions">
+          <a className="btn-outline btn-small" href={exportUrl("csv")}>Export CSV</a>
+          <a className="btn-outline btn-small" href={exportUrl("ndjson")}>Export NDJSON</a>
+        </div>
+      </div>
+      <form
+        className="admin-form-actions"
+        onSubmit={(e) => {
+          e.preventDefault();
+          setApplied(filters);
+        }}
+      >
+        <input placeholder="Action" value={filters.action} onChange={(e) => setFilters({ ...filters, action: e.target.value })} />
+        <input placeholder="User (id or username)" value={filters.user} onChange={(e) => setFilters({ ...filters, user: e.target.value })} />
+        <input placeholder="IP" value={filters.ip} onChange={(e) => setFilters({ ...filters, ip: e.target.value })} />
+        <button type="submit" className="btn-outline">Filter</button>
+      </form>
       <div className="admin-table-wrap">
         <table className="admin-table">
           <thead>
@@ -49,6 +111,13 @@ export const AdminAudit = () => {
           </tbody>
         </table>
       </div>
+      {next && (
+        <div className="centered">
+          <button className="btn-outline" onClick={loadMore} disabled={loadingMore}>
+            {loadingMore ? "Loading..." : "Load more"}
+          </button>
+        </div>
+      )}
     </div>
   );
 };
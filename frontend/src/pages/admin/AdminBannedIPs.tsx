@@ -15,6 +15,9 @@ export const AdminBannedIPs = () => {
   const [ip, setIp] = useState("");
   const [reason, setReason] = useState("");
   const [error, setError] = useState<string | null>(null);
+  const [bulkText, setBulkText] = useState("");
+  const [bulkFile, setBulkFile] = useState<File | null>(null);
+  const [bulkResult, setBulkResult] = useState<string | null>(null);
 
   const fetchList = async () => {
     const res = await fetch(`${API_BASE}/admin/banned-ips/`, { credentials: "include" });
@@ -45,6 +48,34 @@ export const AdminBannedIPs = () => {
     fetchList();
   };
 
+  const handleBulk = async (action: "ban" | "unban") => {
+    setError(null);
+    setBulkResult(null);
+    let body: FormData | string;
+    const headers: Record<string, string> = {};
+    if (bulkFile) {
+      body = new FormData();
+      body.append("action", action);
+      body.append("reason", reason.trim());
+      body.append("file", bulkFile);
+    } else {
+      const entries = bulkText.split(/[\s,]+/).filter(Boolean);
+      if (!entries.length) return;
+      body = JSON.stringify({ action, reason: reason.trim(), ip_addresses: entries });
+      headers["Content-Type"] = "application/json";
+    }
+    const res = await fetch(`${API_BASE}/admin/banned-ips/bulk/`, { method: "POST", headers, credentials: "include", body });
+    const data = await res.json().catch(() => ({}));
+    if (!res.ok) {
+      setError(data.detail || "Failed");
+      return;
+    }
+    setBulkResult(Object.entries(data.counts as Record<string, number>).map(([k, n]) => `${n} ${k.replace("_", " ")}`).join(", "));
+    setBulkText("");
+    setBulkFile(null);
+    fetchList();
+  };
+
   const handleRemove = async (id: number) => {
     await fetch(`${API_BASE}/admin/banned-ips/${id}/`, { method: "DELETE", credentials: "include" });
     fetchList();
@@ -57,12 +88,24 @@ export const AdminBannedIPs = () => {
       <h2>Banned IPs</h2>
       <div className="card admin-form-card">
         <form className="stack" onSubmit={handleAdd}>
-          <label className="field"><span>IP address</span><input required value={ip} onChange={(e) => setIp(e.target.value)} placeholder="e.g. 192.168.1.1" /></label>
+          <label className="field"><span>IP address or CIDR range</span><input required value={ip} onChange={(e) => setIp(e.target.value)} placeholder="e.g. 192.168.1.1 or 10.0.0.0/8" /></label>
           <label className="field"><span>Reason (optional)</span><input value={reason} onChange={(e) => setReason(e.target.value)} /></label>
           {error && <div className="error">{error}</div>}
           <button type="submit" className="btn-primary">Block IP</button>
         </form>
       </div>
+      <div className="card admin-form-card">
+        <h3>Bulk block / unblock</h3>
+        <div className="stack">
+          <label className="field"><span>Addresses or ranges, one per line</span><textarea rows={4} value={bulkText} onChange={(e) => setBulkText(e.target.value)} /></label>
+          <label className="field"><span>…or a CSV file (ip_address[,reason] per row)</span><input type="file" accept=".csv,text/csv" onChange={(e) => setBulkFile(e.target.files?.[0] ?? null)} /></label>
+          {bulkResult && <p className="muted">{bulkResult}</p>}
+          <div className="admin-form-actions">
+            <button type="button" className="btn-primary" onClick={() => handleBulk("ban")}>Block all</button>
+            <button type="button" className="btn-outline" onClick={() => handleBulk("unban")}>Unblock all</button>
+          </div>
+        </div>
+      </div>
       <div className="admin-table-wrap">
         <table className="admin-table">
           <thead>
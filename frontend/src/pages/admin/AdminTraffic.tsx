@@ -27,7 +27,13 @@ export const AdminTraffic = () => {
 
   return (
     <div className="admin-section">
-      <h2>Traffic (API requests)</h2>
+      <div className="admin-section-header">
+        <h2>Traffic (API requests)</h2>
+        <div className="admin-form-actions">
+          <a className="btn-outline btn-small" href={`${API_BASE}/admin/traffic/export/?format=csv&gzip=1`}>Export CSV</a>
+          <a className="btn-outline btn-small" href={`${API_BASE}/admin/traffic/export/?format=ndjson&gzip=1`}>Export NDJSON</a>
+        </div>
+      </div>
       <div className="admin-table-wrap">
         <table className="admin-table">
           <thead>
@@ -10,24 +10,60 @@ interface User {
   date_joined: string | null;
 }
 
+interface UserPage {
+  next: string | null;
+  results: User[];
+}
+
+const emptyFilters = { q: "", is_active: "" };
+
 export const AdminUsers = () => {
   const [users, setUsers] = useState<User[]>([]);
+  const [next, setNext] = useState<string | null>(null);
+  const [filters, setFilters] = useState(emptyFilters);
+  const [applied, setApplied] = useState(emptyFilters);
   const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [editing, setEditing] = useState<User | null>(null);
   const [form, setForm] = useState({ username: "", email: "", password: "" });
   const [createMode, setCreateMode] = useState(false);
   const [editForm, setEditForm] = useState({ email: "", password: "", is_active: true });
   const [error, setError] = useState<string | null>(null);
+  const [selected, setSelected] = useState<Set<number>>(new Set());
+
+  const fetchPage = async (search: string): Promise<UserPage | null> => {
+    const res = await fetch(`${API_BASE}/admin/users/${search}`, { credentials: "include" });
+    return res.ok ? res.json() : null;
+  };
 
+  // Reloads the first page; earlier "Load more" pages are dropped.
   const fetchUsers = async () => {
-    const res = await fetch(`${API_BASE}/admin/users/`, { credentials: "include" });
-    if (res.ok) setUsers(await res.json());
+    const params = new URLSearchParams({ limit: "50" });
+    Object.entries(applied).forEach(([key, value]) => value && params.set(key, value));
+    const data = await fetchPage(`?${params}`);
+    setUsers(data ? data.results : []);
+    setNext(data ? data.next : null);
     setLoading(false);
   };
 
   useEffect(() => {
     fetchUsers();
-  }, []);
+  }, [applied]);
+
+  const loadMore = async () => {
+    if (!next) return;
+    setLoadingMore(true);
+    try {
+      // `next` is absolute; keep only the query so API_BASE proxies apply.
+      const data = await fetchPage(new URL(next, window.location.origin).search);
+      if (data) {
+        setUsers((current) => [...current, ...data.results]);
+        setNext(data.next);
+      }
+    } finally {
+      setLoadingMore(false);
+    }
+  };
 
   const handleCreate = async (e: React.FormEvent) => {
     e.preventDefault();
@@ -84,16 +120,62 @@ export const AdminUsers = () => {
     fetchUsers();
   };
 
+  const toggle = (id: number) => {
+    const next = new Set(selected);
+    if (next.has(id)) next.delete(id);
+    else next.add(id);
+    setSelected(next);
+  };
+  const handleBulk = async (action: "ban" | "unban" | "delete") => {
+    if (!selected.size) return;
+    if (action === "delete" && !confirm(`Remove ${selected.size} users?`)) return;
+    const res = await fetch(`${API_BASE}/admin/users/bulk/`, {
+      method: "POST",
+      headers: { "Content-Type": "application/json" },
+      credentials: "include",
+      body: JSON.stringify({ action, ids: [...selected] }),
+    });
+    const data = await res.json().catch(() => ({}));
+    setError(res.ok ? null : data.detail || "Failed");
+    setSelected(new Set());
+    fetchUsers();
+  };
+
   if (loading) return <div className="admin-loading"><div className="spinner" /></div>;
 
   return (
     <div className="admin-section">
       <div className="admin-section-header">
         <h2>Users</h2>
-        <button className="btn-primary btn-small" onClick={() => { setCreateMode(true); setError(null); }}>
-          Add user
-        </button>
+        <div className="admin-form-actions">
+          {selected.size > 0 && (
+            <>
+              <button className="btn-small" onClick={() => handleBulk("ban")}>Ban {selected.size}</button>
+              <button className="btn-small" onClick={() => handleBulk("unban")}>Unban {selected.size}</button>
+              <button className="btn-small" style={{ color: "#f87171" }} onClick={() => handleBulk("delete")}>Remove {selected.size}</button>
+            </>
+          )}
+          <button className="btn-primary btn-small" onClick={() => { setCreateMode(true); setError(null); }}>
+            Add user
+          </button>
+        </div>
       </div>
+      <form
+        className="admin-form-actions"
+        onSubmit={(e) => {
+          e.preventDefault();
+          setApplied(filters);
+        }}
+      >
+        <input placeholder="Username or email" value={filters.q} onChange={(e) => setFilters({ ...filters, q: e.target.value })} />
+        <select value={filters.is_active} onChange={(e) => setFilters({ ...filters, is_active: e.target.value })}>
+          <option value="">All</option>
+          <option value="true">Active</option>
+          <option value="false">Banned</option>
+        </select>
+        <button type="submit" className="btn-outline">Search</button>
+      </form>
+      {error && !createMode && !editing && <div className="error">{error}</div>}
       {createMode && (
         <div className="card admin-form-card">
           <h3>Create user</h3>
@@ -128,11 +210,12 @@ export const AdminUsers = () => {
       <div className="admin-table-wrap">
         <table className="admin-table">
           <thead>
-            <tr><th>ID</th><th>Username</th><th>Email</th><th>Active</th><th>Joined</th><th>Actions</th></tr>
+            <tr><th></th><th>ID</th><th>Username</th><th>Email</th><th>Active</th><th>Joined</th><th>Actions</th></tr>
           </thead>
           <tbody>
             {users.map((u) => (
               <tr key={u.id}>
+                <td><input type="checkbox" checked={selected.has(u.id)} onChange={() => toggle(u.id)} /></td>
                 <td>{u.id}</td>
                 <td>{u.username}</td>
                 <td>{u.email || "—"}</td>
@@ -147,6 +230,13 @@ export const AdminUsers = () => {
           </tbody>
         </table>
       </div>
+      {next && (
+        <div className="centered">
+          <button className="btn-outline" onClick={loadMore} disabled={loadingMore}>
+            {loadingMore ? "Loading..." : "Load more"}
+          </button>
+        </div>
+      )}
     </div>
   );
 };
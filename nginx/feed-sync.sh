@@ -0,0 +1,42 @@
+#!/bin/sh
+# Keeps nginx in step with the backend for the feed snapshots it serves:
+#  - copies the ban list the backend exports into /etc/nginx/feed-bans.conf
+#    and reloads nginx when it changes (a broken list is rolled back);
+#  - rotates the snapshot hit log once it is large (the backend reads the
+#    rotated file to the end before starting on the new one).
+SNAPSHOTS=/srv/feed-snapshots
+BANS=/etc/nginx/feed-bans.conf
+HITS=/var/log/nginx/feed-hits/hits.log
+INTERVAL=${FEED_SYNC_INTERVAL:-5}
+MAX_HITS_BYTES=${FEED_HITS_MAX_BYTES:-52428800}
+
+sync_bans() {
+    [ -f "$SNAPSHOTS/banned-ips.conf" ] || return 0
+    cmp -s "$SNAPSHOTS/banned-ips.conf" "$BANS" && return 0
+    cp "$BANS" "$BANS.previous"
+    cp "$SNAPSHOTS/banned-ips.conf" "$BANS"
+    if nginx -t -q; then
+        [ "$1" = "--no-reload" ] || nginx -s reload
+    else
+        echo "feed-sync: rejected banned-ips.conf, keeping the previous list" >&2
+        cp "$BANS.previous" "$BANS"
+    fi
+}
+
+rotate_hits() {
+    [ -f "$HITS" ] || return 0
+    [ "$(wc -c < "$HITS")" -ge "$MAX_HITS_BYTES" ] || return 0
+    mv "$HITS" "$HITS.1"
+    nginx -s reopen
+}
+
+if [ "$1" = "--once" ]; then
+    : > "$BANS"
+    sync_bans --no-reload
+    exit 0
+fi
+
+while sleep "$INTERVAL"; do
+    sync_bans
+    rotate_hits
+done
@@ -156,7 +156,7 @@ class TestRunner:
         """Test 10: List user's own posts"""
         response = self.session.get(f"{API_URL}/my-posts/", timeout=5)
         assert response.status_code == 200, f"Expected 200, got {response.status_code}"
-        posts = response.json()
+        posts = response.json()["results"]
         assert isinstance(posts, list)
         assert len(posts) > 0
 
@@ -177,7 +177,7 @@ class TestRunner:
         """Test 12: Public posts list shows published posts"""
         response = requests.get(f"{API_URL}/posts/", timeout=5)
         assert response.status_code == 200, f"Expected 200, got {response.status_code}"
-        posts = response.json()
+        posts = response.json()["results"]
         assert isinstance(posts, list)
         # Check that our published post is in the list (before we make it a draft)
         post_ids = [p["id"] for p in posts]
@@ -187,7 +187,7 @@ class TestRunner:
         """Test 13: Draft posts don't appear in public list"""
         response = requests.get(f"{API_URL}/posts/", timeout=5)
         assert response.status_code == 200
-        posts = response.json()
+        posts = response.json()["results"]
         post_ids = [p["id"] for p in posts]
         # The post we updated to draft should not be in public list
         assert post_id not in post_ids, "Draft post should not appear in public list"